@@ -0,0 +1,307 @@
+"""
+End-to-end throughput benchmark for truck_activity_simulator.py.
+
+Runs fixed scenarios (9, 100 and 1,000 synthetic trucks, each with a
+GPS-heavy and a ticket-heavy profile) against mock_truckit_server.py and
+writes a machine-readable JSON report with requests/sec, documents/sec,
+p50/p95/p99 request latency (as seen by the stand-in, including its
+injected latency), the simulator's peak RSS and total wall time.
+
+Usage:
+    python benchmark.py                                  # all scenarios -> benchmark-results.json
+    python benchmark.py --sizes 9,100 --profiles gps     # a subset
+    python benchmark.py --baseline baseline.json         # run, then fail on regressions
+    python benchmark.py --compare current.json --baseline baseline.json   # compare only
+
+A scenario fails when the simulator exits non-zero, creates no tickets, or
+sees backend errors although none were injected (--error-rate 0); the
+benchmark then exits with status 1. Comparison also exits with status 1
+when any metric is worse than the baseline by more than --tolerance
+(default 10%).
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import mock_truckit_server
+
+REPO_DIR = Path(__file__).parent
+SIMULATOR = REPO_DIR / "truck_activity_simulator.py"
+TEMPLATE_SCENARIO = REPO_DIR / "scenarios" / "synthetic_fleet.json"
+
+SIZES = [9, 100, 1000]
+
+# Workload shape per profile: trips per truck and GPS points per trip leg
+PROFILES = {
+    "gps": {
+        "description": "few trips with dense GPS trails",
+        "trips": {"num_trips": [1, 2], "final_state": "at_dropoff", "truck_offset_minutes": [0, 60]},
+        "env": {"TRUCKSIM_TRIP_ENROUTE_GPS_POINTS": "300", "TRUCKSIM_TRIP_RETURN_GPS_POINTS": "200"},
+    },
+    "tickets": {
+        "description": "many short trips with sparse GPS trails",
+        "trips": {"num_trips": [6, 8], "final_state": "at_dropoff", "truck_offset_minutes": [0, 60]},
+        "env": {"TRUCKSIM_TRIP_ENROUTE_GPS_POINTS": "6", "TRUCKSIM_TRIP_RETURN_GPS_POINTS": "4"},
+    },
+}
+
+# Report metrics compared against a baseline: (key, higher is better)
+COMPARED_METRICS = [
+    ("tickets", True),
+    ("errors", False),
+    ("requests_per_sec", True),
+    ("documents_per_sec", True),
+    ("latency_p50_ms", False),
+    ("latency_p95_ms", False),
+    ("latency_p99_ms", False),
+    ("peak_rss_mb", False),
+    ("wall_seconds", False),
+]
+
+
+def build_scenario(size, profile):
+    """Scenario dict for `size` synthetic trucks with the profile's trip shape"""
+    scenario = json.loads(TEMPLATE_SCENARIO.read_text())
+    scenario["fleet"] = {
+        "source": "synthetic",
+        "size": size,
+        "seed": f"benchmark-{size}",
+        "trucks_per_job": max(3, size // 20),
+    }
+    for job in scenario["jobs"]:
+        job["trips"] = PROFILES[profile]["trips"]
+    return scenario
+
+
+def start_mock(args):
+    """Start the stand-in backend on a free local port in a background thread"""
+    config = mock_truckit_server.parse_args([
+        "--port", "0",
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--seed", str(args.seed),
+    ])
+    server = mock_truckit_server.MockServer(config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def simulator_env(server, work_dir, profile):
+    host, port = server.server_address[:2]
+    env = dict(os.environ)
+    env.update({
+        "TRUCKSIM_API_BASE_URL": f"http://{host}:{port}",
+        "TRUCKSIM_OCR_UPLOAD_URL": f"http://{host}:{port}/uploadImage",
+        "TRUCKSIM_ES_HOST": host,
+        "TRUCKSIM_ES_PORT": str(port),
+        "TRUCKSIM_ES_USE_SSL": "0",
+        "TRUCKSIM_CACHE_DIR": str(work_dir / "cache"),
+        "TRUCKSIM_CACHE_TTL": "0",
+        "TRUCKSIM_CHECKPOINT_FILE": "",
+        "TRUCKSIM_FLEET_LINK_RATE": "0",  # the local backend needs no pacing
+        "TRUCKSIM_CLOSE_JOBS_RATE": "0",
+        "PYTHONUNBUFFERED": "1",
+    })
+    env.update(PROFILES[profile]["env"])
+    return env
+
+
+def failure_reasons(result, error_rate):
+    """Why a scenario result counts as failed (empty if it passed)"""
+    reasons = []
+    if result.get("exit_code") != 0:
+        reasons.append(f"exited with {result.get('exit_code')}")
+    if not result.get("tickets"):
+        reasons.append("no tickets created")
+    if result.get("errors") and not error_rate:
+        reasons.append(f"{result['errors']} backend error(s)")
+    return reasons
+
+
+def run_scenario(server, size, profile, args, work_dir):
+    """Run one scenario in a child process and collect its metrics"""
+    name = f"{size}-{profile}"
+    scenario_path = work_dir / f"{name}.json"
+    scenario_path.write_text(json.dumps(build_scenario(size, profile), indent=2))
+    log_path = work_dir / f"{name}.log"
+
+    command = [sys.executable, str(SIMULATOR), "--scenario", str(scenario_path)]
+    if args.concurrency > 1:
+        command += ["--async", "--concurrency", str(args.concurrency)]
+
+    server.state.reset()
+    print(f"🏁 {name}: {size} trucks, {PROFILES[profile]['description']}...", flush=True)
+    started = time.perf_counter()
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(command, cwd=REPO_DIR, env=simulator_env(server, work_dir, profile),
+                                   stdout=log, stderr=subprocess.STDOUT)
+        timer = threading.Timer(args.timeout, process.kill) if args.timeout else None
+        if timer:
+            timer.start()
+        # wait4 reports the child's own resource usage (peak RSS) rather than all children's
+        _, status, usage = os.wait4(process.pid, 0)
+        if timer:
+            timer.cancel()
+    wall = time.perf_counter() - started
+    exit_code = process.returncode = os.waitstatus_to_exitcode(status)
+
+    stats = server.state.stats()
+    documents = sum(stats["totals"]["documents"].values())
+    result = {
+        "trucks": size,
+        "profile": profile,
+        "exit_code": exit_code,
+        "wall_seconds": round(wall, 3),
+        "requests": stats["requests"],
+        "errors": stats["errors"],
+        "requests_per_sec": round(stats["requests"] / wall, 2),
+        "documents": documents,
+        "documents_per_sec": round(documents / wall, 2),
+        "gps_points": stats["totals"]["gps_points"],
+        "tickets": stats["totals"]["tickets"],
+        "latency_p50_ms": stats["latency_ms"]["p50"],
+        "latency_p95_ms": stats["latency_ms"]["p95"],
+        "latency_p99_ms": stats["latency_ms"]["p99"],
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # ru_maxrss is in KiB on Linux
+        "routes": {route: {"requests": r["requests"], "p95_ms": r["latency_ms"]["p95"]}
+                   for route, r in stats["routes"].items()},
+    }
+    reasons = failure_reasons(result, args.error_rate)
+    if reasons:
+        result["failed"] = reasons
+        result["log_tail"] = log_path.read_text(errors="replace").splitlines()[-20:]
+        print(f"  ❌ {', '.join(reasons)} after {wall:.1f}s")
+    else:
+        print(f"  ✅ {wall:.1f}s, {result['requests_per_sec']} req/s, {result['documents_per_sec']} docs/s, "
+              f"p95 {result['latency_p95_ms']}ms, peak RSS {result['peak_rss_mb']} MB")
+    return name, result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args):
+    server = start_mock(args)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    try:
+        with tempfile.TemporaryDirectory(prefix="trucksim-bench-") as tmp:
+            for size in args.sizes:
+                for profile in args.profiles:
+                    name, result = run_scenario(server, size, profile, args, Path(tmp))
+                    report["scenarios"][name] = result
+    finally:
+        server.shutdown()
+        server.server_close()
+    return report
+
+
+def compare(current, baseline, tolerance):
+    """Print per-metric deltas against the baseline; returns the list of regressions"""
+    regressions = []
+    print(f"\n📊 Comparison against baseline (tolerance {tolerance:.0%})")
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            print(f"  {name}: not in baseline, skipped")
+            continue
+        print(f"  {name}")
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if old:
+                change = (new - old) / old
+            else:
+                change = 0.0 if new == old else math.copysign(math.inf, new)  # e.g. errors 0 -> n
+            worse = -change if higher_is_better else change
+            regressed = worse > tolerance
+            marker = "❌" if regressed else ("✅" if worse < -tolerance else "  ")
+            print(f"    {marker} {metric:<18} {old:>12} -> {new:<12} ({change:+.1%})")
+            if regressed:
+                regressions.append(f"{name}.{metric}")
+        if failure_reasons(result, current.get("settings", {}).get("error_rate")):
+            regressions.append(f"{name}.failed")
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+    else:
+        print("\n✅ No regressions")
+    return regressions
+
+
+def parse_args(argv=None):
+    csv = lambda value: [part.strip() for part in value.split(",") if part.strip()]
+    parser = argparse.ArgumentParser(description="Benchmark the truck activity simulator against a local mock backend")
+    parser.add_argument("--sizes", type=lambda v: [int(s) for s in csv(v)], default=SIZES,
+                        help="comma-separated fleet sizes (default: 9,100,1000)")
+    parser.add_argument("--profiles", type=csv, default=list(PROFILES),
+                        help=f"comma-separated workload profiles (default: {','.join(PROFILES)})")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="async truck workflows in flight; 1 runs the sequential engine")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="mock backend latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="mock backend latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock backend injected error rate")
+    parser.add_argument("--seed", type=int, default=0, help="mock backend jitter/error seed")
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds before a scenario is killed (0 = none)")
+    parser.add_argument("--output", default="benchmark-results.json", help="where to write the JSON report")
+    parser.add_argument("--baseline", help="baseline report to compare against")
+    parser.add_argument("--compare", metavar="REPORT", help="compare an existing report with --baseline instead of running")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression per metric")
+    args = parser.parse_args(argv)
+    unknown = [p for p in args.profiles if p not in PROFILES]
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(unknown)}")
+    if args.compare and not args.baseline:
+        parser.error("--compare needs --baseline")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        report = json.loads(Path(args.compare).read_text())
+    else:
+        report = run_benchmarks(args)
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\n💾 Report written to {args.output}")
+
+    error_rate = report.get("settings", {}).get("error_rate")
+    failed = [name for name, result in report["scenarios"].items() if failure_reasons(result, error_rate)]
+    if failed:
+        print(f"\n❌ {len(failed)} scenario(s) failed: {', '.join(failed)}")
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        return 1 if regressions or failed else 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
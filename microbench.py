@@ -0,0 +1,222 @@
+"""
+Micro-benchmarks for the pure-CPU GPS and sensor generation kernels.
+
+Times each kernel of truck_activity_simulator.py at point counts from 10
+to 1,000,000 and reports ns/point plus memory/point, so scalar helpers
+can be weighed against their vectorized replacements:
+
+    generate_route_coordinates  ->  generate_route_arrays
+    generate_varied_gps_path    ->  generate_varied_path_arrays
+    generate_sensor_data        ->  generate_sensor_batch
+    calculate_bearing           ->  bearing_array
+    calculate_distance          ->  haversine_distance_array
+                                    track_kinematics (distance, bearing and speed at once)
+
+Timing is the best of repeated runs (at least --min-time seconds per
+size). Memory is measured in a separate run under tracemalloc:
+"retained blocks/pt" counts the memory blocks allocated by the call and
+still alive when it returns (the result), not every allocation made on
+the way - temporaries freed before the call returns do not show up there.
+"peak B/pt" is the peak traced memory during the call, so it does include
+those temporaries. NumPy buffers are traced too.
+
+Usage:
+    python microbench.py
+    python microbench.py --sizes 10,1000,100000 --kernels bearing --json microbench.json
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import truck_activity_simulator as sim
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+START = {"lat": 33.7490, "lng": -84.3880}
+END = {"lat": 33.9526, "lng": -84.4681}
+
+
+def _coordinate_pairs(n, rng):
+    """n random start/end coordinate pairs around the Atlanta demo sites"""
+    lat1, lat2 = rng.uniform(33.6, 34.0, (2, n))
+    lng1, lng2 = rng.uniform(-84.6, -84.2, (2, n))
+    return lat1, lng1, lat2, lng2
+
+
+def _coordinate_dicts(n, rng):
+    lat1, lng1, lat2, lng2 = _coordinate_pairs(n, rng)
+    starts = [{"lat": lat, "lng": lng} for lat, lng in zip(lat1.tolist(), lng1.tolist())]
+    ends = [{"lat": lat, "lng": lng} for lat, lng in zip(lat2.tolist(), lng2.tolist())]
+    return starts, ends
+
+
+def prepare_calculate_bearing(n, rng):
+    starts, ends = _coordinate_dicts(n, rng)
+    return lambda: [sim.calculate_bearing(a, b) for a, b in zip(starts, ends)]
+
+
+def prepare_bearing_array(n, rng):
+    pairs = _coordinate_pairs(n, rng)
+    return lambda: sim.bearing_array(*pairs)
+
+
+def prepare_calculate_distance(n, rng):
+    starts, ends = _coordinate_dicts(n, rng)
+    return lambda: [sim.calculate_distance(a, b) for a, b in zip(starts, ends)]
+
+
+def prepare_haversine_distance_array(n, rng):
+    pairs = _coordinate_pairs(n, rng)
+    return lambda: sim.haversine_distance_array(*pairs)
+
+
+def prepare_track_kinematics(n, rng):
+    route = sim.generate_route_arrays(START, END, num_points=n + 1, rng=rng)
+    return lambda: sim.track_kinematics(route["lat"][0], route["lng"][0], route["timestamp"][0])
+
+
+# (kernel, scalar helper it replaces or None, prepare(n, rng) -> zero-argument callable doing n points of work)
+KERNELS = [
+    ("generate_route_coordinates", None,
+     lambda n, rng: lambda: sim.generate_route_coordinates(START, END, num_points=n, rng=rng)),
+    ("generate_route_arrays", "generate_route_coordinates",
+     lambda n, rng: lambda: sim.generate_route_arrays(START, END, num_points=n, rng=rng)),
+    ("generate_varied_gps_path", None,
+     lambda n, rng: lambda: sim.generate_varied_gps_path(START, END, num_points=n, variation_index=5, rng=rng)),
+    ("generate_varied_path_arrays", "generate_varied_gps_path",
+     lambda n, rng: lambda: sim.generate_varied_path_arrays(START, END, num_points=n, variation_index=5, rng=rng)),
+    ("generate_sensor_data", None,
+     lambda n, rng: lambda: [sim.generate_sensor_data(rng=rng) for _ in range(n)]),
+    ("generate_sensor_batch", "generate_sensor_data",
+     lambda n, rng: lambda: sim.generate_sensor_batch(n, rng=rng)),
+    ("calculate_bearing", None, prepare_calculate_bearing),
+    ("bearing_array", "calculate_bearing", prepare_bearing_array),
+    ("calculate_distance", None, prepare_calculate_distance),
+    ("haversine_distance_array", "calculate_distance", prepare_haversine_distance_array),
+    ("track_kinematics", "calculate_distance", prepare_track_kinematics),
+]
+
+
+def time_kernel(func, n, min_time):
+    """
+    Best-of-runs nanoseconds per point: at least three runs and min_time seconds,
+    or a single run when one call alone takes longer than min_time
+    """
+    best = float("inf")
+    spent = 0.0
+    runs = 0
+    while True:
+        gc.disable()
+        started = time.perf_counter_ns()
+        func()
+        elapsed = time.perf_counter_ns() - started
+        gc.enable()
+        best = min(best, elapsed)
+        spent += elapsed / 1e9
+        runs += 1
+        if spent >= min_time and (runs >= 3 or elapsed / 1e9 >= min_time):
+            return best / n, runs
+
+
+def measure_memory(func, n):
+    """Blocks allocated by the call and still alive after it, and peak traced bytes, both per point"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    del result
+    return blocks / n, peak / n
+
+
+def run(args):
+    kernels = [k for k in KERNELS if not args.kernels or any(f in k[0] for f in args.kernels)]
+    results = {}
+    for name, replaces, prepare in kernels:
+        results[name] = {"replaces": replaces, "sizes": {}}
+        for n in args.sizes:
+            if replaces is None and n > args.max_scalar_points:
+                continue
+            func = prepare(n, np.random.default_rng(args.seed))
+            func()  # warm up caches and lazily imported code paths
+            ns_per_point, runs = time_kernel(func, n, args.min_time)
+            retained_per_point, peak_bytes_per_point = measure_memory(func, n)
+            results[name]["sizes"][n] = {
+                "ns_per_point": round(ns_per_point, 2),
+                "retained_blocks_per_point": round(retained_per_point, 3),
+                "peak_bytes_per_point": round(peak_bytes_per_point, 1),
+                "runs": runs,
+            }
+            print(f"  {name:<28} n={n:<9,} {ns_per_point:>12,.1f} ns/pt  {retained_per_point:>8.3f} retained blocks/pt  "
+                  f"{peak_bytes_per_point:>10,.1f} peak B/pt", file=sys.stderr, flush=True)
+    return results
+
+
+def print_table(results, sizes, metric, title, fmt):
+    print(f"\n{title}")
+    print(f"  {'kernel':<28}" + "".join(f"{n:>14,}" for n in sizes))
+    for name, result in results.items():
+        cells = [result["sizes"].get(n, {}).get(metric) for n in sizes]
+        print(f"  {name:<28}" + "".join(f"{'-' if c is None else format(c, fmt):>14}" for c in cells))
+
+
+def print_speedups(results, sizes):
+    """ns/point of each scalar helper divided by its vectorized replacement's"""
+    print("\nSpeed-up of vectorized kernels over the helpers they replace")
+    print(f"  {'kernel':<56}" + "".join(f"{n:>14,}" for n in sizes))
+    for name, result in results.items():
+        scalar = results.get(result["replaces"])
+        if scalar is None:
+            continue
+        cells = []
+        for n in sizes:
+            old, new = scalar["sizes"].get(n), result["sizes"].get(n)
+            cells.append(f"{old['ns_per_point'] / new['ns_per_point']:.1f}x" if old and new else "-")
+        print(f"  {name + ' vs ' + result['replaces']:<56}" + "".join(f"{c:>14}" for c in cells))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark the GPS and sensor generation kernels")
+    parser.add_argument("--sizes", type=lambda v: [int(float(s)) for s in v.split(",") if s.strip()], default=SIZES,
+                        help="comma-separated point counts (default: 10 to 1e6 in decades)")
+    parser.add_argument("--kernels", type=lambda v: [s.strip() for s in v.split(",") if s.strip()], default=[],
+                        help="only run kernels whose name contains one of these substrings")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds of timed runs per size")
+    parser.add_argument("--max-scalar-points", type=int, default=1_000_000,
+                        help="skip the per-point helpers above this many points")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for inputs and generators")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"⏱️ Micro-benchmarking {len(args.sizes)} size(s), numpy {np.__version__}", file=sys.stderr)
+    results = run(args)
+    print_table(results, args.sizes, "ns_per_point", "ns/point (best run)", ",.1f")
+    print_table(results, args.sizes, "retained_blocks_per_point", "retained blocks/point (allocated and still alive after the call)", ".3f")
+    print_table(results, args.sizes, "peak_bytes_per_point", "peak traced bytes/point", ",.1f")
+    print_speedups(results, args.sizes)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"numpy": np.__version__, "python": sys.version.split()[0], "seed": args.seed,
+                       "kernels": results}, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
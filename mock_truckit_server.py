@@ -0,0 +1,638 @@
+"""
+Local stand-in for the TruckIt API, the OCR upload service and OpenSearch.
+
+Implements the endpoints truck_activity_simulator.py calls with in-memory
+state, so simulator throughput can be measured offline (laptop, CI box)
+without touching the demo backend. Latency and error injection are
+configurable so runs are reproducible.
+
+Usage:
+    python mock_truckit_server.py --port 8099 --latency-ms 20 --jitter-ms 10 --error-rate 0.01
+
+    TRUCKSIM_API_BASE_URL=http://127.0.0.1:8099 \\
+    TRUCKSIM_OCR_UPLOAD_URL=http://127.0.0.1:8099/uploadImage \\
+    TRUCKSIM_ES_HOST=127.0.0.1 TRUCKSIM_ES_PORT=8099 TRUCKSIM_ES_USE_SSL=0 \\
+    python truck_activity_simulator.py
+
+Every flag can also be set from the environment (MOCK_PORT, MOCK_LATENCY_MS, ...).
+GET /_mock/stats returns per-route request counts, latency percentiles and
+state totals,
+POST /_mock/reset clears all state and counters.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Trucks the simulator's static fleet expects to exist (ids 575187-575195)
+DEFAULT_TRUCKS = [
+    {"id": 575187 + i, "name": "DEMO Truck" if i == 0 else f"Demo Truck {i + 1}"}
+    for i in range(9)
+]
+
+
+class MockState:
+    """In-memory TruckIt/OpenSearch state shared by all handler threads"""
+
+    def __init__(self, company_id):
+        self.company_id = company_id
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.ids = itertools.count(1000)
+            self.trucks = {t["id"]: dict(t, truck_region_id=None) for t in DEFAULT_TRUCKS}
+            self.truck_regions = {}
+            self.projects = {}
+            self.sites = {}
+            self.regions = {}
+            self.purchase_orders = {}
+            self.job_orders = {}
+            self.line_items = {}
+            self.tickets = {}
+            self.air_tickets = {}
+            self.notes = 0
+            self.sync_actions = 0
+            self.gps_points = 0
+            self.documents = {}
+            self.uploads = 0
+            self.routes = {}
+            self.started = time.time()
+
+    def next_id(self):
+        with self.lock:
+            return next(self.ids)
+
+    def truck(self, truck_id):
+        """Look up a truck, registering unknown ids (synthetic fleets) on first use"""
+        truck_id = int(truck_id)
+        with self.lock:
+            if truck_id not in self.trucks:
+                self.trucks[truck_id] = {"id": truck_id, "name": f"Truck {truck_id}", "truck_region_id": None}
+            return self.trucks[truck_id]
+
+    def count(self, route, status, elapsed):
+        with self.lock:
+            entry = self.routes.setdefault(route, {"requests": 0, "errors": 0, "samples": []})
+            entry["requests"] += 1
+            entry["errors"] += status >= 400
+            entry["samples"].append(elapsed)
+
+    def stats(self):
+        with self.lock:
+            routes = {
+                route: {"requests": entry["requests"], "errors": entry["errors"],
+                        "seconds": round(sum(entry["samples"]), 3), "latency_ms": latency_summary(entry["samples"])}
+                for route, entry in sorted(self.routes.items())
+            }
+            samples = [s for entry in self.routes.values() for s in entry["samples"]]
+            return {
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "requests": sum(e["requests"] for e in routes.values()),
+                "errors": sum(e["errors"] for e in routes.values()),
+                "latency_ms": latency_summary(samples),
+                "routes": routes,
+                "totals": {
+                    "trucks": len(self.trucks),
+                    "projects": len(self.projects),
+                    "sites": len(self.sites),
+                    "regions": len(self.regions),
+                    "purchase_orders": len(self.purchase_orders),
+                    "job_orders": len(self.job_orders),
+                    "tickets": len(self.tickets),
+                    "air_tickets": len(self.air_tickets),
+                    "notes": self.notes,
+                    "sync_actions": self.sync_actions,
+                    "gps_points": self.gps_points,
+                    "uploads": self.uploads,
+                    "documents": {index: len(docs) for index, docs in self.documents.items()},
+                },
+            }
+
+
+def latency_summary(samples):
+    """p50/p95/p99/max (nearest rank) of request durations in seconds, as milliseconds"""
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    summary = {}
+    for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)):
+        summary[name] = round(ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000, 3)
+    return summary
+
+
+def now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+# ---------------------------------------------------------------------------
+# Route handlers: each takes (state, request) and returns (status, body)
+# ---------------------------------------------------------------------------
+
+def signin(state, req):
+    return 200, {"authToken": f"mock-{state.next_id()}", "user": {"username": req.json.get("username")}}
+
+
+def force_link(state, req):
+    state.truck(req.json.get("truckId", 0))
+    return 200, {"data": {"linked": True}}
+
+
+def device_sync(state, req):
+    """Apply offline device actions; ticketOpened actions get ticket ids back"""
+    opened = []
+    actions = req.json.get("actions", [])
+    for action in actions:
+        if action.get("actionType") == "ticketOpened":
+            ticket_id = state.next_id()
+            with state.lock:
+                state.tickets[ticket_id] = {"id": ticket_id, "status": "open", "source": "sync"}
+            opened.append({"localId": action.get("localId"), "ticketId": ticket_id})
+    with state.lock:
+        state.sync_actions += len(actions)
+        state.gps_points += len(req.json.get("coordinates", []))
+    return 200, {"data": opened}
+
+
+def list_trucks(state, req):
+    with state.lock:
+        return 200, {"data": list(state.trucks.values())}
+
+
+def list_truck_regions(state, req):
+    truck_id = req.query.get("truck")
+    with state.lock:
+        regions = list(state.truck_regions.values())
+        if truck_id:
+            region_id = state.trucks.get(int(truck_id), {}).get("truck_region_id")
+            regions = [r for r in regions if r["id"] == region_id]
+    return 200, {"data": regions}
+
+
+def list_truck_types(state, req):
+    return 200, {"data": [{"id": 1, "name": "Tri-Axle"}, {"id": 2, "name": "Quad"}]}
+
+
+def list_projects(state, req):
+    keywords = (req.query.get("keywords") or "").lower()
+    with state.lock:
+        projects = [p for p in state.projects.values() if keywords in p["name"].lower()]
+    return 200, {"data": projects}
+
+
+def create_project(state, req):
+    project_id = state.next_id()
+    project = dict(req.json, id=project_id, status=1)
+    project.setdefault("name", f"Project {project_id}")
+    with state.lock:
+        state.projects[project_id] = project
+    return 201, {"data": project}
+
+
+def project_po_items(state, req, project_id):
+    with state.lock:
+        items = [item for po in state.purchase_orders.values()
+                 if str(po.get("project")) == project_id for item in po["items"]]
+    return 200, {"data": items}
+
+
+def list_sites(state, req):
+    keywords = (req.query.get("keywords") or "").lower()
+    region_id = req.query.get("region_id")
+    with state.lock:
+        sites = [s for s in state.sites.values() if keywords in s["name"].lower()]
+        if region_id:
+            sites = [s for s in sites if str(s.get("regionId")) == region_id]
+    return 200, {"data": sites}
+
+
+def create_site(state, req):
+    site_id = state.next_id()
+    site = dict(req.json, id=site_id)
+    site.setdefault("name", f"Site {site_id}")
+    with state.lock:
+        state.sites[site_id] = site
+    return 201, {"data": site}
+
+
+def get_site(state, req, site_id):
+    with state.lock:
+        site = state.sites.get(int(site_id))
+    if site is None:
+        return 404, {"message": "Site not found"}
+    return 200, dict(site, data=site)
+
+
+def list_regions(state, req):
+    site_id = req.query.get("siteId")
+    with state.lock:
+        regions = [r for r in state.regions.values() if str(r.get("siteId")) == site_id]
+    return 200, {"data": regions}
+
+
+def create_region(state, req):
+    region_id = state.next_id()
+    with state.lock:
+        state.regions[region_id] = dict(req.json, id=region_id)
+        site = state.sites.get(req.json.get("siteId"))
+        if site is not None:
+            site["regionId"] = region_id
+    return 201, {"data": region_id}
+
+
+def update_region(state, req, region_id):
+    with state.lock:
+        region = state.regions.get(int(region_id))
+        if region is None:
+            return 404, {"message": "Region not found"}
+        region.update(req.json)
+    return 200, {"data": region}
+
+
+def list_purchase_orders(state, req):
+    project = req.query.get("projects") or req.query.get("project")
+    with state.lock:
+        pos = [po for po in state.purchase_orders.values() if not project or str(po.get("project")) == project]
+    return 200, paginate(pos, req.query.get("page"), req.query.get("per_page"))
+
+
+def create_purchase_order(state, req):
+    po_id = state.next_id()
+    items = []
+    for item in req.json.get("items", []):
+        items.append(dict(item, id=state.next_id(), purchaseOrder=po_id))
+    po = dict(req.json, id=po_id, items=items)
+    with state.lock:
+        state.purchase_orders[po_id] = po
+        for item in items:
+            state.line_items[item["id"]] = item
+    return 201, {"data": po}
+
+
+def purchase_order_items(state, req, po_id):
+    with state.lock:
+        po = state.purchase_orders.get(int(po_id))
+    if po is None:
+        return 404, {"message": "Purchase order not found"}
+    return 200, {"data": po["items"]}
+
+
+def create_job_order(state, req):
+    job_id = state.next_id()
+    body = req.json
+    po_item = state.line_items.get(body.get("poLineItemId"), {})
+    items = []
+    for item in body.get("items") or [{}]:
+        trucks = [state.truck(t)["id"] for t in item.get("trucks", [])]
+        items.append(dict(item, id=state.next_id(), jobOrder=job_id, trucks=[{"truckId": t} for t in trucks]))
+    job = dict(body, id=job_id, status="open", closed=False, items=items,
+               unitOfMeasure=body.get("unitOfMeasure", po_item.get("unitOfMeasure", 1)),
+               startDate=body.get("startDate") or now_iso())
+    job.setdefault("name", f"Job {job_id}")
+    with state.lock:
+        state.job_orders[job_id] = job
+    return 201, {"data": job}
+
+
+def list_job_orders(state, req):
+    with state.lock:
+        jobs = [dict(j, items=None) for j in state.job_orders.values()]
+    per_page = req.query.get("perPage") or req.query.get("per_page")
+    return 200, paginate(jobs, req.query.get("page"), per_page)
+
+
+def get_job_order(state, req, job_id):
+    with state.lock:
+        job = state.job_orders.get(int(job_id))
+    if job is None:
+        return 404, {"message": "Job order not found"}
+    return 200, {"data": job}
+
+
+def job_order_items(state, req, job_id):
+    with state.lock:
+        job = state.job_orders.get(int(job_id))
+    if job is None:
+        return 404, {"message": "Job order not found"}
+    return 200, {"data": job["items"]}
+
+
+def close_job_order(state, req, job_id):
+    with state.lock:
+        job = state.job_orders.get(int(job_id))
+        if job is None:
+            return 404, {"message": "Job order not found"}
+        job.update(status="closed", closed=True)
+    return 200, {"data": {"id": job["id"], "status": "closed"}}
+
+
+def accept_job(state, req, line_item_id, truck_id):
+    state.truck(truck_id)
+    with state.lock:
+        item = next((i for j in state.job_orders.values() for i in j["items"] if i["id"] == int(line_item_id)), None)
+        if item is not None and all(t["truckId"] != int(truck_id) for t in item["trucks"]):
+            item["trucks"].append({"truckId": int(truck_id)})
+    return 200, {"data": {"accepted": True}}
+
+
+def create_ticket(state, req):
+    ticket_id = state.next_id()
+    ticket = dict(req.json, id=ticket_id, status="open", createdAt=now_iso())
+    with state.lock:
+        state.tickets[ticket_id] = ticket
+    return 201, {"data": ticket}
+
+
+def ticket_action(state, req, ticket_id, action):
+    with state.lock:
+        ticket = state.tickets.setdefault(int(ticket_id), {"id": int(ticket_id)})
+        ticket["status"] = {"close": "closed", "start": "started", "pause": "paused"}[action]
+    return 200, {"data": ticket}
+
+
+def add_note(state, req, ticket_id):
+    with state.lock:
+        state.notes += 1
+    return 201, {"data": {"id": state.next_id(), "ticket": int(ticket_id)}}
+
+
+def create_air_ticket(state, req, company_id):
+    air_ticket_id = state.next_id()
+    with state.lock:
+        state.air_tickets[air_ticket_id] = {"id": air_ticket_id, "company": int(company_id), "fields": req.form_fields()}
+    return 201, {"data": {"id": air_ticket_id}}
+
+
+def update_air_ticket(state, req, air_ticket_id):
+    with state.lock:
+        air_ticket = state.air_tickets.setdefault(int(air_ticket_id), {"id": int(air_ticket_id)})
+        air_ticket.update(req.json if req.is_json else {"fields": req.form_fields()})
+    return 200, {"data": air_ticket}
+
+
+def upload_image(state, req):
+    with state.lock:
+        state.uploads += 1
+        upload_id = state.uploads
+    return 200, {"ticket_num": f"T{upload_id:06d}", "payload": "57 Stone", "supplier": "Mock Quarry", "signature": True}
+
+
+def opensearch_info(state, req):
+    return 200, {"name": "mock-truckit", "cluster_name": "mock", "version": {"number": "7.10.2", "distribution": "opensearch"}, "tagline": "mock"}
+
+
+def opensearch_bulk(state, req, index=None):
+    """Index newline-delimited bulk actions, answering in the _bulk item format"""
+    lines = [line for line in req.body.decode().splitlines() if line.strip()]
+    items = []
+    with state.lock:
+        for action_line, source_line in zip(lines[0::2], lines[1::2]):
+            action, meta = next(iter(json.loads(action_line).items()))
+            target = meta.get("_index") or index
+            doc_id = meta.get("_id") or str(next(state.ids))
+            state.documents.setdefault(target, {})[doc_id] = json.loads(source_line)
+            items.append({action: {"_index": target, "_id": doc_id, "status": 201, "result": "created"}})
+    return 200, {"took": 1, "errors": False, "items": items}
+
+
+def opensearch_doc(state, req, index, doc_id=None):
+    with state.lock:
+        doc_id = doc_id or str(next(state.ids))
+        state.documents.setdefault(index, {})[doc_id] = req.json
+    return 201, {"_index": index, "_id": doc_id, "result": "created", "_version": 1}
+
+
+def mock_stats(state, req):
+    return 200, state.stats()
+
+
+def mock_reset(state, req):
+    state.reset()
+    return 200, {"reset": True}
+
+
+def paginate(rows, page, per_page):
+    page = int(page or 1)
+    per_page = int(per_page or 0) or len(rows) or 1
+    start = (page - 1) * per_page
+    return {"data": rows[start:start + per_page], "total": len(rows), "page": page, "perPage": per_page}
+
+
+# (method, pattern, handler); patterns are matched against the path without the query string
+ROUTES = [
+    ("POST", r"/api/2/signin", signin),
+    ("POST", r"/api/2/device/force-link", force_link),
+    ("POST", r"/api/2/device/sync", device_sync),
+    ("GET", r"/api/2/trucks", list_trucks),
+    ("GET", r"/api/1/trucks/truck-regions", list_truck_regions),
+    ("GET", r"/api/1/truck-types", list_truck_types),
+    ("GET", r"/api/2/projects", list_projects),
+    ("POST", r"/api/2/projects", create_project),
+    ("GET", r"/api/2/projects/(\d+)/po-items", project_po_items),
+    ("GET", r"/api/[12]/sites", list_sites),
+    ("POST", r"/api/1/sites", create_site),
+    ("GET", r"/api/2/sites/(\d+)", get_site),
+    ("GET", r"/api/1/regions", list_regions),
+    ("POST", r"/api/1/regions", create_region),
+    ("PUT", r"/api/2/regions/(\d+)", update_region),
+    ("GET", r"/api/2/purchase-orders", list_purchase_orders),
+    ("POST", r"/api/1/purchase-orders", create_purchase_order),
+    ("GET", r"/api/1/purchase-orders/(\d+)/items", purchase_order_items),
+    ("GET", r"/api/2/job-orders", list_job_orders),
+    ("POST", r"/api/2/job-orders", create_job_order),
+    ("GET", r"/api/2/job-orders/(\d+)", get_job_order),
+    ("GET", r"/api/2/job-orders/(\d+)/items", job_order_items),
+    ("POST", r"/api/1/job-orders/(\d+)/close", close_job_order),
+    ("POST", r"/api/2/job-orders/(\d+)/accept/(\d+)", accept_job),
+    ("POST", r"/api/2/tickets", create_ticket),
+    ("POST", r"/api/2/tickets/(\d+)/(close)", ticket_action),
+    ("POST", r"/api/1/tickets/(\d+)/(start|pause)", ticket_action),
+    ("POST", r"/api/2/tickets/(\d+)/notes", add_note),
+    ("POST", r"/api/2/air-ticket-lite/(\d+)/notes", add_note),
+    ("POST", r"/api/2/companies/(\d+)/atp-air-tickets-lite", create_air_ticket),
+    ("PATCH", r"/api/2/atp-air-tickets-lite/(\d+)", update_air_ticket),
+    ("POST", r"/uploadImage", upload_image),
+    ("GET", r"/_mock/stats", mock_stats),
+    ("POST", r"/_mock/reset", mock_reset),
+    ("GET", r"/", opensearch_info),
+    ("HEAD", r"/", opensearch_info),
+    ("POST", r"/_bulk", opensearch_bulk),
+    ("PUT", r"/_bulk", opensearch_bulk),
+    ("POST", r"/([^/_][^/]*)/_bulk", opensearch_bulk),
+    ("POST", r"/([^/_][^/]*)/_doc", opensearch_doc),
+    ("POST", r"/([^/_][^/]*)/_doc/([^/]+)", opensearch_doc),
+    ("PUT", r"/([^/_][^/]*)/_doc/([^/]+)", opensearch_doc),
+]
+COMPILED_ROUTES = [(method, re.compile(pattern + r"/?$"), pattern, handler) for method, pattern, handler in ROUTES]
+
+# The mock's own controls are left out of the stats; they and signin never get
+# injected errors or latency
+MOCK_CONTROL_ROUTES = {r"/_mock/stats", r"/_mock/reset"}
+EXEMPT_ROUTES = {r"/api/2/signin"} | MOCK_CONTROL_ROUTES
+
+
+class MockRequest:
+    """Parsed view of an incoming request handed to route handlers"""
+
+    def __init__(self, handler, body):
+        parts = urlsplit(handler.path)
+        self.path = parts.path
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        self.body = body
+        self.content_type = handler.headers.get("Content-Type", "")
+        self.is_json = "json" in self.content_type
+        self._json = None
+
+    @property
+    def json(self):
+        if self._json is None:
+            try:
+                self._json = json.loads(self.body or b"{}") if self.is_json else {}
+            except ValueError:
+                self._json = {}
+        return self._json
+
+    def form_fields(self):
+        """Names of the multipart form fields (file contents are discarded)"""
+        return sorted({name.decode() for name in re.findall(rb'name="([^"]+)"', self.body)})
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real backends behind the simulator's pooled sessions
+    server_version = "MockTruckIt/1.0"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; without TCP_NODELAY, Nagle's
+        # algorithm and delayed ACKs stall keep-alive responses by ~40ms
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, fmt, *args):
+        if self.server.config.verbose:
+            super().log_message(fmt, *args)
+
+    def _dispatch(self):
+        started = time.perf_counter()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        req = MockRequest(self, body)
+        config, state = self.server.config, self.server.state
+
+        for method, regex, pattern, handler in COMPILED_ROUTES:
+            match = regex.match(req.path)
+            if method == self.command and match:
+                break
+        else:
+            pattern = "unmatched"
+            status, payload = 404, {"message": f"No mock route for {self.command} {req.path}"}
+            match = handler = None
+
+        if handler is not None:
+            exempt = pattern in EXEMPT_ROUTES
+            if not exempt:
+                time.sleep(self.server.delay(pattern))
+            if not exempt and self.server.inject_error():
+                status, payload = config.error_status, {"message": "Injected mock error"}
+            else:
+                try:
+                    status, payload = handler(state, req, *match.groups())
+                except Exception as e:  # surface handler bugs as 500s instead of dropping the connection
+                    status, payload = 500, {"message": f"Mock handler error: {e}"}
+
+        data = b"" if self.command == "HEAD" else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        if pattern not in MOCK_CONTROL_ROUTES:
+            state.count(f"{self.command} {pattern}", status, time.perf_counter() - started)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _dispatch
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, config):
+        super().__init__((config.host, config.port), MockHandler)
+        self.config = config
+        self.state = MockState(config.company_id)
+        self.rng = random.Random(config.seed)
+        self.rng_lock = threading.Lock()
+        self.route_latency = parse_route_latency(config.route_latency)
+
+    def delay(self, pattern):
+        """Seconds to stall a request: base (or per-route) latency plus uniform jitter"""
+        latency = next((ms for key, ms in self.route_latency if key in pattern), self.config.latency_ms)
+        with self.rng_lock:
+            jitter = self.rng.uniform(0, self.config.jitter_ms) if self.config.jitter_ms else 0.0
+        return max(0.0, latency + jitter) / 1000.0
+
+    def inject_error(self):
+        if self.config.error_rate <= 0:
+            return False
+        with self.rng_lock:
+            return self.rng.random() < self.config.error_rate
+
+
+def parse_route_latency(spec):
+    """Parse "device/sync=50,_bulk=5" into [(path fragment, ms)]"""
+    pairs = []
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        fragment, _, ms = part.partition("=")
+        pairs.append((fragment.strip(), float(ms)))
+    return pairs
+
+
+def parse_args(argv=None):
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Local mock TruckIt API / OCR / OpenSearch server")
+    parser.add_argument("--host", default=env("MOCK_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(env("MOCK_PORT", "8099")))
+    parser.add_argument("--latency-ms", type=float, default=float(env("MOCK_LATENCY_MS", "0")),
+                        help="Base latency added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=float(env("MOCK_JITTER_MS", "0")),
+                        help="Uniform random latency added on top of the base latency")
+    parser.add_argument("--route-latency", default=env("MOCK_ROUTE_LATENCY", ""),
+                        help='Per-route base latency overrides, e.g. "device/sync=50,_bulk=5"')
+    parser.add_argument("--error-rate", type=float, default=float(env("MOCK_ERROR_RATE", "0")),
+                        help="Fraction of requests (0-1) answered with --error-status (signin is exempt)")
+    parser.add_argument("--error-status", type=int, default=int(env("MOCK_ERROR_STATUS", "503")))
+    parser.add_argument("--seed", type=int, default=int(env("MOCK_SEED", "0")),
+                        help="Seed for jitter and error injection so runs are reproducible")
+    parser.add_argument("--company-id", type=int, default=int(env("MOCK_COMPANY_ID", "2879")))
+    parser.add_argument("--verbose", action="store_true", default=env("MOCK_VERBOSE", "0") == "1",
+                        help="Log every request")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    config = parse_args(argv)
+    server = MockServer(config)
+    host, port = server.server_address[:2]
+    print(f"🧪 Mock TruckIt server listening on http://{host}:{port} "
+          f"(latency {config.latency_ms}±{config.jitter_ms}ms, error rate {config.error_rate:.1%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.state.stats()["totals"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
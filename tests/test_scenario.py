@@ -0,0 +1,147 @@
+import copy
+
+import pytest
+
+import truck_activity_simulator as sim
+
+
+def site(name, latitude=33.75, longitude=-84.39, **extra):
+    return {"name": name, "address": f"{name} address", "latitude": latitude, "longitude": longitude, **extra}
+
+
+def scenario(**overrides):
+    base = {
+        "project": "Test Project",
+        "sites": {
+            "pickup": site("Pickup"),
+            "dropoff": site("Dropoff", site_type="dump"),
+        },
+        "purchase_orders": {
+            "hourly": {"uom": "hour", "pickup": "pickup", "dropoff": "dropoff"},
+        },
+        "jobs": [{"key": "active", "po": "hourly", "quantity": 10}],
+    }
+    base.update(overrides)
+    return base
+
+
+def compile_errors(raw):
+    with pytest.raises(ValueError) as excinfo:
+        sim.compile_scenario(raw)
+    return str(excinfo.value)
+
+
+def test_default_scenario_compiles():
+    plan = sim.compile_scenario(sim.load_scenario())
+
+    assert [job["key"] for job in plan["jobs"]] == ["active", "closed", "pending"]
+    assert set(plan["purchase_orders"]) == {"hourly", "tonnage", "load"}
+    assert len(plan["sites"]) == 4
+    assert [job["key"] for job in plan["repeat_jobs"]] == ["active", "closed"]
+    assert plan["warnings"] == []
+
+
+def test_project_string_shorthand():
+    plan = sim.compile_scenario(scenario())
+
+    assert plan["project"] == {"name": "Test Project"}
+
+
+def test_identical_sites_are_folded_and_aliases_resolve():
+    raw = scenario()
+    raw["sites"]["pickup_again"] = copy.deepcopy(raw["sites"]["pickup"])
+    raw["jobs"][0]["pickup"] = "pickup_again"
+
+    plan = sim.compile_scenario(raw)
+
+    assert set(plan["sites"]) == {"pickup", "dropoff"}
+    assert plan["jobs"][0]["pickup"] == "pickup"
+    assert any("sites.pickup_again" in warning for warning in plan["warnings"])
+
+
+def test_same_site_name_with_different_details_is_an_error():
+    raw = scenario()
+    raw["sites"]["pickup_moved"] = site("Pickup", latitude=34.0)
+
+    assert "name 'Pickup' is already used by sites.pickup" in compile_errors(raw)
+
+
+def test_purchase_orders_with_same_uom_are_folded():
+    raw = scenario()
+    raw["purchase_orders"]["hourly_again"] = {"uom": 1, "pickup": "pickup", "dropoff": "dropoff"}
+    raw["jobs"].append({"key": "second", "po": "hourly_again", "quantity": 5})
+
+    plan = sim.compile_scenario(raw)
+
+    assert set(plan["purchase_orders"]) == {"hourly"}
+    assert [job["po"] for job in plan["jobs"]] == ["hourly", "hourly"]
+    assert any("purchase_orders.hourly_again" in warning for warning in plan["warnings"])
+
+
+def test_purchase_order_sites_resolve_through_site_aliases():
+    raw = scenario()
+    raw["sites"]["dropoff_alias"] = copy.deepcopy(raw["sites"]["dropoff"])
+    raw["purchase_orders"]["hourly"]["dropoff"] = "dropoff_alias"
+
+    plan = sim.compile_scenario(raw)
+
+    assert plan["purchase_orders"]["hourly"]["dropoff"] == "dropoff"
+    assert plan["jobs"][0]["dropoff"] == "dropoff"
+
+
+def test_unused_sites_and_purchase_orders_are_not_provisioned():
+    raw = scenario()
+    raw["sites"]["spare"] = site("Spare")
+    raw["purchase_orders"]["tonnage"] = {"uom": "ton", "pickup": "spare", "dropoff": "dropoff"}
+
+    plan = sim.compile_scenario(raw)
+
+    assert set(plan["purchase_orders"]) == {"hourly"}
+    assert set(plan["sites"]) == {"pickup", "dropoff"}
+
+
+def test_every_problem_is_reported_at_once():
+    raw = scenario(fleet={"source": "nowhere", "colour": "red"})
+    raw["sites"]["bad"] = site("Bad", latitude=120)
+    raw["jobs"] = [
+        {"key": "active", "po": "missing", "quantity": 10},
+        {"key": "active", "po": "hourly", "quantity": 10},
+        {"key": "active", "po": "hourly", "quantity": 10},
+        {"po": "hourly", "quantity": 10},
+    ]
+    raw["repeat_jobs"] = ["ghost"]
+
+    message = compile_errors(raw)
+
+    for expected in (
+        "fleet: unknown field 'colour'",
+        "fleet.source: unknown source 'nowhere'",
+        "sites.bad: coordinates out of range",
+        "jobs.active: po must name a purchase order",
+        "jobs.active: duplicate job key",
+        "jobs[3]: a key is required",
+        "repeat_jobs: 'ghost' is not a job key",
+    ):
+        assert expected in message
+
+
+def test_load_jobs_need_a_single_truck():
+    raw = scenario()
+    raw["purchase_orders"]["load"] = {"uom": "load", "pickup": "pickup", "dropoff": "dropoff"}
+    raw["jobs"].append({"key": "pending", "po": "load", "quantity": 5})
+
+    assert "jobs.pending: load-based jobs can only have 0 or 1 truck" in compile_errors(raw)
+
+    raw["jobs"][-1]["trucks"] = 1
+    assert sim.compile_scenario(raw)["jobs"][-1]["trucks"] == 1
+
+
+def test_trips_overrides_are_validated():
+    raw = scenario()
+    raw["jobs"][0]["trips"] = {"num_trips": [3, 1], "final_state": "parked", "speed": 5}
+
+    message = compile_errors(raw)
+
+    assert "jobs.active: unknown trips field 'speed'" in message
+    assert "jobs.active: trips.num_trips must be an integer >= 1 or a [low, high] range" in message
+    assert "jobs.active: trips.final_state must be one or more of" in message
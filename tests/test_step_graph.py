@@ -0,0 +1,164 @@
+import threading
+
+import pytest
+
+import truck_activity_simulator as sim
+
+
+def step(calls, name, result=True, error=None):
+    """Step func that records its name and returns result (or raises error)"""
+    def func():
+        calls.append(name)
+        if error:
+            raise error
+        return result
+    return func
+
+
+def test_steps_run_in_dependency_order_with_one_worker():
+    calls = []
+    graph = sim.StepGraph(workers=1)
+    graph.add("c", step(calls, "c"), deps=["b"])
+    graph.add("a", step(calls, "a"))
+    graph.add("b", step(calls, "b"), deps=["a"])
+
+    results = graph.run()
+
+    assert calls == ["a", "b", "c"]
+    assert results == {"a": True, "b": True, "c": True}
+    assert all(graph.ok(name) for name in "abc")
+
+
+def test_failed_dep_skips_dependents_transitively():
+    calls = []
+    graph = sim.StepGraph(workers=1)
+    graph.add("a", step(calls, "a", error=RuntimeError("boom")))
+    graph.add("b", step(calls, "b"), deps=["a"])
+    graph.add("c", step(calls, "c"), deps=["b"])
+
+    results = graph.run()
+
+    assert calls == ["a"]
+    assert graph.status == {"a": "failed", "b": "skipped", "c": "skipped"}
+    assert results == {"a": None, "b": None, "c": None}
+
+
+def test_after_waits_but_runs_whatever_the_outcome():
+    calls = []
+    graph = sim.StepGraph(workers=1)
+    graph.add("a", step(calls, "a", error=RuntimeError("boom")))
+    graph.add("b", step(calls, "b"), deps=["a"])
+    graph.add("cleanup", step(calls, "cleanup"), after=["a", "b"])
+
+    graph.run()
+
+    assert calls == ["a", "cleanup"]
+    assert graph.status["b"] == "skipped"
+    assert graph.ok("cleanup")
+
+
+def test_check_false_fails_the_step_and_skips_deps():
+    calls = []
+    graph = sim.StepGraph(workers=1)
+    graph.add("link", step(calls, "link", result=[42]), check=lambda failed: not failed)
+    graph.add("use", step(calls, "use"), deps=["link"])
+
+    results = graph.run()
+
+    assert graph.status == {"link": "failed", "use": "skipped"}
+    assert results["link"] == [42]
+
+
+def test_independent_steps_overlap_on_a_pool():
+    both_started = threading.Barrier(2, timeout=5)
+    graph = sim.StepGraph(workers=2)
+    graph.add("a", lambda: both_started.wait() is not None)
+    graph.add("b", lambda: both_started.wait() is not None)
+
+    graph.run()
+
+    assert graph.ok("a") and graph.ok("b")
+
+
+def test_unknown_dependency_is_rejected_before_running():
+    calls = []
+    graph = sim.StepGraph(workers=1)
+    graph.add("a", step(calls, "a"), deps=["missing"])
+
+    with pytest.raises(ValueError, match="step a waits for unknown step\\(s\\): missing"):
+        graph.run()
+    assert calls == []
+
+
+def test_cycle_is_rejected_before_running():
+    calls = []
+    graph = sim.StepGraph(workers=1)
+    graph.add("root", step(calls, "root"))
+    graph.add("a", step(calls, "a"), deps=["root", "b"])
+    graph.add("b", step(calls, "b"), after=["a"])
+
+    with pytest.raises(ValueError, match="dependency cycle among: a, b"):
+        graph.run()
+    assert calls == []
+
+
+def test_duplicate_step_name_is_rejected():
+    graph = sim.StepGraph(workers=1)
+    graph.add("a", lambda: None)
+
+    with pytest.raises(ValueError, match="duplicate step: a"):
+        graph.add("a", lambda: None)
+
+
+def test_critical_path_follows_the_last_finishing_dependency():
+    graph = sim.StepGraph(workers=1)
+    for name in ("a", "b", "c", "d"):
+        graph.add(name, lambda: True)
+    graph.steps["c"]["deps"] = ["a", "b"]
+    graph.steps["d"]["after"] = ["c"]
+    graph.status = dict.fromkeys("abcd", "ok")
+    graph.timings = {"a": (0.0, 1.0), "b": (0.0, 3.0), "c": (3.0, 4.0), "d": (4.0, 6.0)}
+
+    assert graph.critical_path() == ["b", "c", "d"]
+
+
+def test_critical_path_leaves_out_skipped_steps():
+    graph = sim.StepGraph(workers=1)
+    graph.add("setup", lambda: True)
+    graph.add("optional", lambda: None, deps=["setup"], check=bool)
+    graph.add("needs_optional", lambda: True, deps=["optional"])
+    graph.add("report", lambda: True, after=["needs_optional"])
+
+    graph.run()
+
+    assert graph.status["needs_optional"] == "skipped"
+    assert graph.critical_path() == ["setup", "optional", "report"]
+
+
+def test_critical_path_is_empty_before_running():
+    assert sim.StepGraph(workers=1).critical_path() == []
+
+
+def test_resume_reuses_journaled_results(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    calls = []
+
+    journal = sim.CheckpointJournal(path)
+    journal.open("run", resume=False)
+    graph = sim.StepGraph(workers=1, journal=journal)
+    graph.add("fleet", step(calls, "fleet", result=[1, 2]), resume=True)
+    graph.add("flaky", step(calls, "flaky", result=None), check=bool, resume=True)
+    graph.run()
+    journal.close()
+
+    journal = sim.CheckpointJournal(path)
+    journal.open("run", resume=True)
+    graph = sim.StepGraph(workers=1, journal=journal)
+    graph.add("fleet", step(calls, "fleet", result=[1, 2]), resume=True)
+    graph.add("flaky", step(calls, "flaky", result=None), check=bool, resume=True)
+    results = graph.run()
+    journal.close()
+
+    # Only successful steps are journaled; the failed one runs again
+    assert calls == ["fleet", "flaky", "flaky"]
+    assert results["fleet"] == [1, 2]
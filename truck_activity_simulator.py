@@ -1,4 +1,6 @@
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
 from datetime import datetime, timedelta, timezone
 from opensearchpy import OpenSearch
 import json
@@ -6,29 +8,55 @@ import random
 import time
 import math
 import os
+import atexit
+import argparse
+import asyncio
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-
-# API Configuration
-API_BASE_URL = "https://api.demo.truckit.com"
+import hashlib
+import io
+import re
+import itertools
+import contextlib
+import contextvars
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; photos are uploaded at full size without it
+    Image = None
+
+# API Configuration (the hosts are overridable, e.g. to point at mock_truckit_server.py)
+API_BASE_URL = os.environ.get("TRUCKSIM_API_BASE_URL", "https://api.demo.truckit.com").rstrip("/")
 USERNAME = "support_sales_demos"
 PASSWORD = "welcome"
+OCR_UPLOAD_URL = os.environ.get("TRUCKSIM_OCR_UPLOAD_URL", "https://tptest.truckit.com/uploadImage")
 
 # OpenSearch Configuration
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
-ES_HOST = 'vpc-stack-truckit-es7-r55zgy5aqm24i6tabwb6zcejcu.us-east-1.es.amazonaws.com'
+ES_HOST = os.environ.get("TRUCKSIM_ES_HOST", 'vpc-stack-truckit-es7-r55zgy5aqm24i6tabwb6zcejcu.us-east-1.es.amazonaws.com')
+ES_PORT = int(os.environ.get("TRUCKSIM_ES_PORT", "443"))
+ES_USE_SSL = os.environ.get("TRUCKSIM_ES_USE_SSL", "1") == "1"
 ES_AUTH = ('master', 'C=BU42NWyUW2IjQsK0eCU95')
 
 # Truck definitions - must match trucks that exist in the system
 # Using 9 different trucks (3 per job) to avoid state conflicts
+# Trip params per truck: num_trips, final_state and truck_offset_minutes drive
+# its timeline (trucks without them get generated params, see assign_truck_params)
 TRUCKS = [
     # Job 1 (Hourly) - DEMO trucks 575187-575189
-    {"id": 575187, "device_name": "DEMO Truck", "idle_threshold": 20.0},
-    {"id": 575188, "device_name": "Demo Truck 2", "idle_threshold": 22.0},
-    {"id": 575189, "device_name": "Demo Truck 3", "idle_threshold": 0.0},
+    # Truck 1: 3 trips at dropoff, Truck 2: 4 trips at pickup (+45 min), Truck 3: 2 trips en route (+90 min)
+    {"id": 575187, "device_name": "DEMO Truck", "idle_threshold": 20.0, "num_trips": 3, "final_state": "at_dropoff", "truck_offset_minutes": 0},
+    {"id": 575188, "device_name": "Demo Truck 2", "idle_threshold": 22.0, "num_trips": 4, "final_state": "at_pickup", "truck_offset_minutes": 45},
+    {"id": 575189, "device_name": "Demo Truck 3", "idle_threshold": 0.0, "num_trips": 2, "final_state": "en_route", "truck_offset_minutes": 90},
     # Job 2 (Tonnage) - DEMO trucks 575190-575192
-    {"id": 575190, "device_name": "Demo Truck 4", "idle_threshold": 18.0},
-    {"id": 575191, "device_name": "Demo Truck 5", "idle_threshold": 21.0},
-    {"id": 575192, "device_name": "Demo Truck 6", "idle_threshold": 19.0},
+    # Truck 4: 5 trips at dropoff, Truck 5: 3 trips at pickup (+30 min), Truck 6: 4 trips en route (+60 min)
+    {"id": 575190, "device_name": "Demo Truck 4", "idle_threshold": 18.0, "num_trips": 5, "final_state": "at_dropoff", "truck_offset_minutes": 0},
+    {"id": 575191, "device_name": "Demo Truck 5", "idle_threshold": 21.0, "num_trips": 3, "final_state": "at_pickup", "truck_offset_minutes": 30},
+    {"id": 575192, "device_name": "Demo Truck 6", "idle_threshold": 19.0, "num_trips": 4, "final_state": "en_route", "truck_offset_minutes": 60},
     # Job 3 (Load) - DEMO trucks 575193-575195
     {"id": 575193, "device_name": "Demo Truck 7", "idle_threshold": 23.0},
     {"id": 575194, "device_name": "Demo Truck 8", "idle_threshold": 20.0},
@@ -49,6 +77,698 @@ DROPOFF_COORDS = {"lat": 32.854622, "lng": -79.974808}  # 1981 Harley St, North
 # Global variable to store auth token
 AUTH_TOKEN = None
 
+# HTTP connection pool configuration (overridable from the task environment)
+HTTP_POOL_SIZE = int(os.environ.get("TRUCKSIM_HTTP_POOL_SIZE", "20"))
+HTTP_TIMEOUT = float(os.environ.get("TRUCKSIM_HTTP_TIMEOUT", "30"))
+
+# Execution mode: run jobs and trucks concurrently on an asyncio engine
+SIM_ASYNC = os.environ.get("TRUCKSIM_ASYNC", "0") == "1"
+SIM_CONCURRENCY = int(os.environ.get("TRUCKSIM_CONCURRENCY", "8"))
+
+
+# Request metrics: per-endpoint counts, errors, bytes and latency histograms
+METRICS_FILE = os.environ.get("TRUCKSIM_METRICS_FILE")  # JSON summary written at the end of main()
+METRICS_PORT = int(os.environ.get("TRUCKSIM_METRICS_PORT", "0"))  # Prometheus /metrics port (0 = off)
+# Latency histogram bucket upper bounds in seconds (Prometheus "le" labels)
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestMetrics:
+    """
+    Thread-safe per-endpoint metrics for outbound calls.
+
+    Endpoints are "METHOD /path" with numeric path segments (other than the
+    API version) folded into {id}, e.g. "POST /api/2/tickets/{id}/close". Each keeps a request
+    count, an error count (exceptions and HTTP status >= 400), bytes sent
+    and a cumulative latency histogram over METRICS_BUCKETS.
+    """
+
+    def __init__(self, json_path=METRICS_FILE, port=METRICS_PORT, buckets=METRICS_BUCKETS):
+        self.json_path = json_path
+        self.port = port
+        self.buckets = tuple(buckets)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @staticmethod
+    def endpoint(method, url):
+        """Endpoint label for a request: method plus the URL path with ids folded"""
+        path = re.sub(r"(?<!/api)/\d+(?=/|$)", "/{id}", urlsplit(url).path or "/")
+        return f"{method.upper()} {path}"
+
+    def observe(self, endpoint, seconds, bytes_sent=0, error=False):
+        """Record one call to endpoint"""
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    "count": 0, "errors": 0, "bytes_sent": 0, "seconds": 0.0, "max_seconds": 0.0,
+                    "buckets": [0] * (len(self.buckets) + 1),  # last slot is +Inf
+                }
+            entry["count"] += 1
+            entry["errors"] += bool(error)
+            entry["bytes_sent"] += bytes_sent
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            slot = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+            entry["buckets"][slot] += 1
+
+    def quantile(self, entry, q):
+        """Latency quantile in seconds, interpolated inside its histogram bucket"""
+        rank = q * entry["count"]
+        seen = 0
+        for i, count in enumerate(entry["buckets"]):
+            if count and seen + count >= rank:
+                upper = min(self.buckets[i], entry["max_seconds"]) if i < len(self.buckets) else entry["max_seconds"]
+                lower = min(self.buckets[i - 1], upper) if i else 0.0
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return 0.0
+
+    def snapshot(self):
+        """Per-endpoint metrics sorted by total time spent, busiest first"""
+        with self._lock:
+            endpoints = {name: dict(entry, buckets=list(entry["buckets"])) for name, entry in self._endpoints.items()}
+        summary = {}
+        for name, entry in sorted(endpoints.items(), key=lambda item: -item[1]["seconds"]):
+            summary[name] = {
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "bytes_sent": entry["bytes_sent"],
+                "total_seconds": round(entry["seconds"], 3),
+                "avg_ms": round(entry["seconds"] * 1000 / entry["count"], 2),
+                "p50_ms": round(self.quantile(entry, 0.50) * 1000, 2),
+                "p95_ms": round(self.quantile(entry, 0.95) * 1000, 2),
+                "p99_ms": round(self.quantile(entry, 0.99) * 1000, 2),
+                "max_ms": round(entry["max_seconds"] * 1000, 2),
+                "histogram": {"le": list(self.buckets) + ["+Inf"], "counts": entry["buckets"]},
+            }
+        return summary
+
+    def print_summary(self, top=25):
+        """Print the busiest endpoints by total time"""
+        summary = self.snapshot()
+        if not summary:
+            return
+        total_seconds = sum(entry["total_seconds"] for entry in summary.values()) or 1.0
+        print(f"\n📈 Requests: {sum(e['count'] for e in summary.values())} call(s) to {len(summary)} endpoint(s)")
+        print(f"    {'endpoint':<52} {'calls':>7} {'errors':>6} {'sent MB':>8} {'total s':>8} {'share':>6}"
+              f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, entry in list(summary.items())[:top]:
+            print(f"    {name[:52]:<52} {entry['count']:>7} {entry['errors']:>6} {entry['bytes_sent'] / 1e6:>8.2f}"
+                  f" {entry['total_seconds']:>8.2f} {entry['total_seconds'] / total_seconds:>6.1%}"
+                  f" {entry['p50_ms']:>8.1f} {entry['p95_ms']:>8.1f} {entry['p99_ms']:>8.1f}")
+        if len(summary) > top:
+            print(f"    ... {len(summary) - top} more endpoint(s)")
+
+    def write_json(self, path=None):
+        """Write the per-endpoint snapshot as JSON to path (default: json_path)"""
+        path = path or self.json_path
+        if not path:
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps({
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "endpoints": self.snapshot(),
+        }, indent=2) + "\n")
+        print(f"📈 Request metrics written to {path}")
+
+    def prometheus_text(self):
+        """Metrics in the Prometheus text exposition format"""
+        with self._lock:
+            endpoints = {name: dict(entry, buckets=list(entry["buckets"])) for name, entry in sorted(self._endpoints.items())}
+        lines = [
+            "# HELP trucksim_requests_total Outbound requests by endpoint",
+            "# TYPE trucksim_requests_total counter",
+        ]
+        lines += [f'trucksim_requests_total{{endpoint="{name}"}} {e["count"]}' for name, e in endpoints.items()]
+        lines += ["# HELP trucksim_request_errors_total Failed outbound requests (exception or HTTP >= 400)",
+                  "# TYPE trucksim_request_errors_total counter"]
+        lines += [f'trucksim_request_errors_total{{endpoint="{name}"}} {e["errors"]}' for name, e in endpoints.items()]
+        lines += ["# HELP trucksim_request_bytes_sent_total Request body bytes sent",
+                  "# TYPE trucksim_request_bytes_sent_total counter"]
+        lines += [f'trucksim_request_bytes_sent_total{{endpoint="{name}"}} {e["bytes_sent"]}' for name, e in endpoints.items()]
+        lines += ["# HELP trucksim_request_duration_seconds Outbound request latency",
+                  "# TYPE trucksim_request_duration_seconds histogram"]
+        for name, entry in endpoints.items():
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], entry["buckets"]):
+                cumulative += count
+                lines.append(f'trucksim_request_duration_seconds_bucket{{endpoint="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'trucksim_request_duration_seconds_sum{{endpoint="{name}"}} {entry["seconds"]:.6f}')
+            lines.append(f'trucksim_request_duration_seconds_count{{endpoint="{name}"}} {entry["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def start_server(self, port=None):
+        """Serve prometheus_text() on http://0.0.0.0:port/metrics from a daemon thread (port 0 = off)"""
+        port = port or self.port
+        if not port or self._server is not None:
+            return
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus_text().encode()
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+        print(f"📈 Prometheus metrics on http://0.0.0.0:{port}/metrics")
+
+
+# Shared metrics for every outbound call (TruckItClient and the OpenSearch bulk writer)
+request_metrics = RequestMetrics()
+
+
+def _body_size(body):
+    """Bytes in a prepared request body (streamed bodies count as 0)"""
+    if isinstance(body, bytes):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode())
+    return 0
+
+
+# Tracing: nested spans for workflow steps, jobs, trucks, trips and HTTP calls,
+# exported as a Chrome trace (open in ui.perfetto.dev or chrome://tracing)
+TRACE_FILE = os.environ.get("TRUCKSIM_TRACE_FILE")  # unset = tracing off
+
+_current_span = contextvars.ContextVar("trucksim_current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation.
+
+    Its parent is the span current in the contextvars context it was started
+    in. Starting a span makes it current until end() is called. Ending a span
+    also ends its children on the same track that are still open (e.g. a trip
+    cut short by an exception).
+    """
+
+    def __init__(self, tracer, name, category, track, attributes):
+        self.tracer = tracer
+        self.span_id = next(tracer._ids)
+        self.parent = _current_span.get()
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.tid = tracer._track(track)
+        self.start = time.perf_counter()
+        self.end_time = None
+        self._open = []
+        if self.parent is not None and self.parent.end_time is None:
+            self.parent._open.append(self)
+        self._token = _current_span.set(self)
+
+    def set(self, **attributes):
+        """Add attributes shown with the span in the trace viewer"""
+        self.attributes.update(attributes)
+
+    def end(self, error=None):
+        """Finish the span (idempotent); error marks it failed"""
+        if self.end_time is not None:
+            return
+        for child in list(self._open):
+            if child.tid == self.tid:  # left open by an exception; work on other tracks may outlive its parent
+                child.end(error="unfinished when its parent ended")
+        self.end_time = time.perf_counter()
+        if error is not None:
+            self.attributes["error"] = str(error)
+        try:
+            _current_span.reset(self._token)
+        except ValueError:  # ended from another context (e.g. by its parent on another thread)
+            pass
+        if self.parent is not None and self in self.parent._open:
+            self.parent._open.remove(self)
+        with self.tracer._lock:
+            self.tracer.spans.append(self)
+
+
+class SpanSequence:
+    """Consecutive sibling spans, such as a truck's trips: next() ends the previous span and starts another"""
+
+    def __init__(self, tracer, category):
+        self.tracer = tracer
+        self.category = category
+        self.current = None
+
+    def next(self, name, **attributes):
+        self.end()
+        self.current = self.tracer.start_span(name, self.category, **attributes)
+        return self.current
+
+    def end(self, error=None):
+        if self.current is not None:
+            self.current.end(error)
+            self.current = None
+
+
+class Tracer:
+    """
+    Collects spans and writes them as Chrome trace JSON.
+
+    Spans go on the track (trace viewer row) of the thread that ran them, or
+    on a named virtual track for operations that are not tied to one thread,
+    like an async job. A child on another track than its parent is linked to
+    it with a flow arrow. Context propagates through asyncio tasks and
+    asyncio.to_thread by itself; work handed to other thread pools is wrapped
+    with bind(). With no path set, spans are not recorded at all.
+    """
+
+    def __init__(self, path=TRACE_FILE):
+        self.path = path
+        self.spans = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._tracks = {}
+        self._epoch = time.perf_counter()
+
+    def _track(self, track):
+        key = ("track", track) if track else ("thread", threading.get_ident(), threading.current_thread().name)
+        with self._lock:
+            if key not in self._tracks:
+                self._tracks[key] = (len(self._tracks) + 1, track or threading.current_thread().name)
+            return self._tracks[key][0]
+
+    def start_span(self, name, category="sim", track=None, **attributes):
+        """Start a span and make it current; None when tracing is off"""
+        if not self.path:
+            return None
+        return Span(self, name, category, track, attributes)
+
+    @contextlib.contextmanager
+    def span(self, name, category="sim", track=None, **attributes):
+        """Context manager around start_span(); an escaping exception marks the span failed"""
+        span = self.start_span(name, category, track, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            if span is not None:
+                span.end(error=repr(e))
+            raise
+        finally:
+            if span is not None:
+                span.end()
+
+    def sequence(self, category="sim"):
+        """A SpanSequence; end() it after the last span (its parent ends it otherwise)"""
+        return SpanSequence(self, category)
+
+    def bind(self, func):
+        """Wrap func to run in a copy of the caller's context, so spans it opens on a pool thread keep their parent"""
+        context = contextvars.copy_context()
+
+        def run_in_context(*args, **kwargs):
+            return context.copy().run(func, *args, **kwargs)
+        return run_in_context
+
+    def chrome_trace(self):
+        """Finished spans as a Chrome trace event dict"""
+        pid = os.getpid()
+
+        def micros(t):
+            return round((t - self._epoch) * 1e6, 3)
+
+        with self._lock:
+            spans = list(self.spans)
+            tracks = list(self._tracks.values())
+
+        events = [{"ph": "M", "name": "process_name", "pid": pid, "args": {"name": "truck_activity_simulator"}}]
+        events += [{"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}}
+                   for tid, name in tracks]
+        for span in sorted(spans, key=lambda span: span.start):
+            args = dict(span.attributes, span_id=span.span_id)
+            if span.parent is not None:
+                args["parent_id"] = span.parent.span_id
+            events.append({"ph": "X", "name": span.name, "cat": span.category, "pid": pid, "tid": span.tid,
+                           "ts": micros(span.start), "dur": micros(span.end_time) - micros(span.start), "args": args})
+            parent = span.parent
+            if parent is not None and parent.tid != span.tid:
+                # Flow arrow from the parent's track to the child; it must start inside the parent's slice
+                flow_start = min(span.start, parent.end_time or span.start)
+                events.append({"ph": "s", "name": "child", "cat": "flow", "id": span.span_id, "pid": pid,
+                               "tid": parent.tid, "ts": micros(max(flow_start, parent.start))})
+                events.append({"ph": "f", "bp": "e", "name": "child", "cat": "flow", "id": span.span_id,
+                               "pid": pid, "tid": span.tid, "ts": micros(span.start)})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path=None):
+        """Write finished spans as Chrome trace JSON to path (default: self.path)"""
+        path = path or self.path
+        if not path or not self.spans:
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.chrome_trace()))
+        print(f"🧵 Trace with {len(self.spans)} span(s) written to {path} (open in ui.perfetto.dev or chrome://tracing)")
+
+
+# Shared tracer for the whole run
+tracer = Tracer()
+
+
+class TruckItClient:
+    """
+    Shared HTTP client for every TruckIt API call.
+
+    Owns a single requests.Session so all calls reuse keep-alive connections
+    instead of paying a new TCP+TLS handshake per request. Adds the
+    `Authorization: Token` header and a default timeout to every request.
+    """
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.token = None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def set_token(self, token):
+        """Set the auth token sent with subsequent requests"""
+        self.token = token
+
+    def request(self, method, url, headers=None, authenticate=True, **kwargs):
+        """
+        Send a request through the pooled session.
+
+        Args:
+            method: HTTP method ("GET", "POST", ...)
+            url: Full request URL
+            headers: Optional per-request headers (take precedence over defaults)
+            authenticate: Add the Authorization header when a token is set (default True)
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            requests.Response
+        """
+        request_headers = dict(headers or {})
+        if authenticate and self.token and "Authorization" not in request_headers:
+            request_headers["Authorization"] = f"Token {self.token}"
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint = RequestMetrics.endpoint(method, url)
+        started = time.perf_counter()
+        with tracer.span(endpoint, "http") as span:
+            try:
+                response = self.session.request(method, url, headers=request_headers, **kwargs)
+            except Exception:
+                request_metrics.observe(endpoint, time.perf_counter() - started, error=True)
+                raise
+            if span is not None:
+                span.set(status=response.status_code)
+        request_metrics.observe(endpoint, time.perf_counter() - started,
+                                bytes_sent=_body_size(response.request.body), error=response.status_code >= 400)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+# Shared client used by all API helpers
+api_client = TruckItClient()
+
+# Simulation clock: waits that only spread event timestamps advance virtual
+# time instead of sleeping
+
+
+class SimulationClock:
+    """
+    Clock that supplies event timestamps for a simulated timeline.
+
+    now() is the wall clock plus the virtual time accumulated by sleep(), so
+    timestamps keep the same spacing real sleeps would have produced while
+    the run itself does not block. now() never runs ahead of the wall clock:
+    events are backdated, never stamped in the future.
+    """
+
+    def __init__(self):
+        self.offset = timedelta(0)
+
+    def now(self):
+        """Current simulated time (timezone-aware UTC datetime), clamped to the wall clock"""
+        wall_now = datetime.now(timezone.utc)
+        return min(wall_now + self.offset, wall_now)
+
+    def sleep(self, seconds):
+        """Advance simulated time by `seconds` without blocking"""
+        self.offset += timedelta(seconds=seconds)
+
+
+def set_auth_token(token):
+    """Store the auth token globally and on the shared API client"""
+    global AUTH_TOKEN
+    AUTH_TOKEN = token
+    api_client.set_token(token)
+    return token
+
+
+# Persistent cache for entity lookups (sites, projects, POs, truck types, regions)
+# that rarely change between runs. TTL is in seconds; 0 disables the cache.
+LOOKUP_CACHE_DIR = os.environ.get("TRUCKSIM_CACHE_DIR", str(Path.home() / ".cache" / "trucksim"))
+LOOKUP_CACHE_TTL = float(os.environ.get("TRUCKSIM_CACHE_TTL", str(24 * 60 * 60)))
+# Fleet and truck region lookups change whenever trucks are linked or regions
+# are edited, so they only live a few minutes (capped by LOOKUP_CACHE_TTL)
+FLEET_CACHE_TTL = float(os.environ.get("TRUCKSIM_FLEET_CACHE_TTL", str(5 * 60)))
+
+
+class LookupCache:
+    """
+    On-disk TTL cache of API lookups, one JSON file per API host and company.
+
+    Values must be JSON-serialisable. Keys are namespaced ("sites:<name>",
+    "po:<project>:<uom>", ...) so a successful create can drop a whole family
+    with invalidate("sites:").
+    """
+
+    def __init__(self, cache_dir=LOOKUP_CACHE_DIR, ttl=LOOKUP_CACHE_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._loaded_path = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def path(self):
+        """Cache file for the current API host and company"""
+        host = API_BASE_URL.split("://")[-1].split("/")[0].replace(":", "_")
+        return self.cache_dir / f"{host}_company_{COMPANY_ID}.json"
+
+    def _load(self):
+        path = self.path()
+        if path == self._loaded_path:
+            return
+        self._loaded_path = path
+        self._entries = {}
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable lookup cache {path}: {e}")
+
+    def _save(self):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._loaded_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self._loaded_path)
+        except OSError as e:
+            print(f"⚠️ Could not write lookup cache {self._loaded_path}: {e}")
+
+    def get(self, key, ttl=None):
+        """Return the cached value for key, or None if missing or older than ttl (capped by self.ttl)"""
+        if not self.enabled:
+            return None
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry and time.time() - entry["stored_at"] < ttl:
+                self.hits += 1
+                return entry["value"]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """Store value under key (None is not cached)"""
+        if not self.enabled or value is None:
+            return
+        with self._lock:
+            self._load()
+            self._entries[key] = {"stored_at": time.time(), "value": value}
+            self._save()
+
+    def set_many(self, items):
+        """Store several key -> value pairs with a single save (None values are not cached)"""
+        items = {key: value for key, value in items.items() if value is not None}
+        if not self.enabled or not items:
+            return
+        with self._lock:
+            self._load()
+            stored_at = time.time()
+            for key, value in items.items():
+                self._entries[key] = {"stored_at": stored_at, "value": value}
+            self._save()
+
+    def invalidate(self, prefix):
+        """Drop every key starting with prefix"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._load()
+            stale = [key for key in self._entries if key.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._save()
+
+    def get_or_fetch(self, key, fetch, ttl=None):
+        """Return the cached value for key, calling fetch() and caching its result on a miss"""
+        value = self.get(key, ttl)
+        if value is None:
+            value = fetch()
+            self.set(key, value)
+        return value
+
+
+lookup_cache = LookupCache()
+
+
+# Checkpoint journal so an interrupted run can be resumed without redoing (and
+# duplicating) the work it already finished. Point it at persistent storage
+# (e.g. an EFS mount on Fargate); an empty value disables it.
+CHECKPOINT_FILE = os.environ.get("TRUCKSIM_CHECKPOINT_FILE", str(Path(LOOKUP_CACHE_DIR) / "checkpoint.jsonl"))
+CHECKPOINT_RESUME = os.environ.get("TRUCKSIM_RESUME", "0") == "1"
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of completed work.
+
+    Each line records fields for a (kind, key) entry: a workflow step, a job,
+    a truck or a single trip. Entries are merged in order on load, so a
+    later line only needs the fields that changed. The first line names the
+    run (scenario, fleet and day); a journal from another run, or from a run
+    that completed, is started over instead of resumed.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = Path(path) if path else None
+        self._entries = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self._file is not None
+
+    def _read(self, run_key):
+        """Entries of the journal on disk if it belongs to an unfinished run_key, else None"""
+        entries = {}
+        try:
+            with open(self.path) as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable checkpoint journal {self.path}: {e}")
+            return None
+
+        if not lines or lines[0].get("kind") != "run" or lines[0].get("key") != run_key:
+            print(f"⚠️ Checkpoint journal {self.path} is from a different run; starting over")
+            return None
+        for line in lines[1:]:
+            entries.setdefault((line["kind"], line["key"]), {}).update(line.get("data") or {})
+        if entries.get(("run", "complete")):
+            print("ℹ️ Previous run completed; starting over")
+            return None
+        return entries
+
+    def open(self, run_key, resume=False):
+        """
+        Start journaling for a run, loading the existing journal when resuming
+
+        Returns:
+            int: Number of entries available to resume from
+        """
+        if not self.path:
+            return 0
+        entries = self._read(run_key) if resume else None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if entries is None:
+                self._file = open(self.path, "w")
+                self._file.write(json.dumps({"kind": "run", "key": run_key, "data": {"started": datetime.now(timezone.utc).isoformat()}}) + "\n")
+                self._file.flush()
+                entries = {}
+            else:
+                self._file = open(self.path, "a")
+        except OSError as e:
+            print(f"⚠️ Could not open checkpoint journal {self.path}: {e}")
+            self._file = None
+            return 0
+        self._entries = entries
+        return len(entries)
+
+    def get(self, kind, key):
+        """Recorded fields of an entry (empty dict if nothing was recorded)"""
+        with self._lock:
+            return dict(self._entries.get((kind, key), {}))
+
+    def record(self, kind, key, **data):
+        """Merge fields into an entry and append them to the journal (values must be JSON-serialisable)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries.setdefault((kind, key), {}).update(data)
+            try:
+                self._file.write(json.dumps({"kind": kind, "key": key, "data": data}) + "\n")
+                self._file.flush()
+            except (OSError, TypeError, ValueError) as e:
+                print(f"⚠️ Could not write checkpoint {kind}:{key}: {e}")
+
+    def complete(self):
+        """Mark the run complete (the next --resume starts over) and close the journal"""
+        self.record("run", "complete", at=datetime.now(timezone.utc).isoformat())
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+checkpoint_journal = CheckpointJournal()
+
 # Counter for generating unique ticket numbers
 _ticket_number_counter = 1
 
@@ -74,162 +794,350 @@ _tonnage_ticket_index = 0
 _atp_net_tonnages = [21.42, 20.49, 20.89, 21.10, 20.47, 21.17, 21.07, 21.13, 24.31]
 _atp_index = 0
 
+# Guards the counters above when trucks are simulated concurrently
+_counter_lock = threading.Lock()
+
 def get_next_hourly_tonnage():
     """Get next hourly sub-ticket tonnage value (cycling through photo values)"""
     global _hourly_tonnage_index, _hourly_tonnage_values
-    value = _hourly_tonnage_values[_hourly_tonnage_index % len(_hourly_tonnage_values)]
-    _hourly_tonnage_index += 1
+    with _counter_lock:
+        value = _hourly_tonnage_values[_hourly_tonnage_index % len(_hourly_tonnage_values)]
+        _hourly_tonnage_index += 1
     return value
 
 def get_next_timesheet_hours():
     """Get next timesheet hours value (cycling through photo values)"""
     global _timesheet_hours_index, _timesheet_hours
-    value = _timesheet_hours[_timesheet_hours_index % len(_timesheet_hours)]
-    _timesheet_hours_index += 1
+    with _counter_lock:
+        value = _timesheet_hours[_timesheet_hours_index % len(_timesheet_hours)]
+        _timesheet_hours_index += 1
     return value
 
 def get_next_tonnage_value():
     """Get next tonnage ticket value (cycling through photo values)"""
     global _tonnage_ticket_index, _tonnage_ticket_values
-    value = _tonnage_ticket_values[_tonnage_ticket_index % len(_tonnage_ticket_values)]
-    _tonnage_ticket_index += 1
+    with _counter_lock:
+        value = _tonnage_ticket_values[_tonnage_ticket_index % len(_tonnage_ticket_values)]
+        _tonnage_ticket_index += 1
     return value
 
 def get_next_atp_tonnage():
     """Get next ATP net tonnage value (cycling through 9 photo values)"""
     global _atp_index, _atp_net_tonnages
-    value = _atp_net_tonnages[_atp_index % len(_atp_net_tonnages)]
-    _atp_index += 1
+    with _counter_lock:
+        value = _atp_net_tonnages[_atp_index % len(_atp_net_tonnages)]
+        _atp_index += 1
     return value
 
 
 def generate_ticket_number():
     """Generate a unique ticket number for demo purposes"""
     global _ticket_number_counter
-    ticket_num = f"TKT-{datetime.now().strftime('%Y%m%d')}-{_ticket_number_counter:04d}"
-    _ticket_number_counter += 1
+    with _counter_lock:
+        ticket_num = f"TKT-{datetime.now().strftime('%Y%m%d')}-{_ticket_number_counter:04d}"
+        _ticket_number_counter += 1
     return ticket_num
 
 
-def get_photos_from_folder(photo_type):
+PHOTO_TYPES = ["atp", "tonnage", "hourly", "timesheets"]
+PHOTO_ROOT = Path(__file__).parent / "ticket_photos"
+
+
+def get_photos_from_folder(photo_type, photo_root=PHOTO_ROOT):
     """
     Get all photo files from a specific folder.
 
     Args:
         photo_type: "atp", "tonnage", "hourly", or "timesheets"
+        photo_root: Folder containing one sub-folder per photo type
 
     Returns:
         list: List of photo file paths
     """
-    script_dir = Path(__file__).parent
-    photo_dir = script_dir / "ticket_photos" / photo_type
+    photo_dir = Path(photo_root) / photo_type
 
     if not photo_dir.exists():
         print(f"⚠️ Warning: Photo directory not found: {photo_dir}")
         return []
 
-    # Get all image files (jpg, jpeg, png)
-    photos = []
+    # Get all image files (jpg, jpeg, png); a set avoids duplicates on case-insensitive filesystems
+    photos = set()
     for ext in ['*.jpg', '*.jpeg', '*.png', '*.JPG', '*.JPEG', '*.PNG']:
-        photos.extend(photo_dir.glob(ext))
+        photos.update(photo_dir.glob(ext))
 
     return [str(p) for p in sorted(photos)]
 
 
-def get_next_photo(photo_type):
+# Optional upload variants: with Pillow installed and a max dimension set, photos
+# are downscaled/recompressed once and cached on disk by content hash
+PHOTO_MAX_DIMENSION = int(os.environ.get("TRUCKSIM_PHOTO_MAX_DIMENSION", "0"))  # 0 = upload originals
+PHOTO_QUALITY = int(os.environ.get("TRUCKSIM_PHOTO_QUALITY", "75"))
+PHOTO_VARIANT_DIR = os.environ.get("TRUCKSIM_PHOTO_VARIANT_DIR", str(Path(LOOKUP_CACHE_DIR) / "photo_variants"))
+
+
+def prepare_photo_variant(data, filename, max_dimension=PHOTO_MAX_DIMENSION, quality=PHOTO_QUALITY,
+                          variant_dir=PHOTO_VARIANT_DIR):
     """
-    Get the next photo from the folder, cycling through available photos.
+    Downscale and recompress a photo for upload, caching the result on disk.
+
+    The variant is keyed by the SHA-256 of the original bytes plus the size and
+    quality settings, so each photo is only processed once across runs. If the
+    variant would not be smaller, the original is used.
 
     Args:
-        photo_type: "atp", "tonnage", "hourly", or "timesheets"
+        data (bytes): Original image bytes
+        filename (str): Original filename (its extension picks JPEG or PNG output)
+        max_dimension (int): Longest allowed side in pixels (0 disables resizing)
+        quality (int): JPEG quality for the variant
+        variant_dir (str): Folder holding cached variants
 
     Returns:
-        str: Path to photo file, or None if no photos available
+        bytes: Variant bytes, or the original bytes if resizing is disabled or unavailable
     """
-    global _photo_counters
+    if not max_dimension or Image is None:
+        return data
 
-    photos = get_photos_from_folder(photo_type)
+    is_png = os.path.splitext(filename)[1].lower() == ".png"
+    digest = hashlib.sha256(data).hexdigest()
+    variant_path = Path(variant_dir) / f"{digest}_{max_dimension}_q{quality}{'.png' if is_png else '.jpg'}"
 
-    if not photos:
-        return None
+    try:
+        return variant_path.read_bytes()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️ Could not read photo variant {variant_path}: {e}")
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_dimension, max_dimension))
+            output = io.BytesIO()
+            if is_png:
+                image.save(output, format="PNG", optimize=True)
+            else:
+                image.convert("RGB").save(output, format="JPEG", quality=quality, optimize=True)
+        variant = output.getvalue()
+    except Exception as e:
+        print(f"⚠️ Could not resize {filename}, uploading original: {e}")
+        return data
+
+    if len(variant) >= len(data):
+        variant = data
 
-    # Get current photo and increment counter
-    photo_path = photos[_photo_counters[photo_type] % len(photos)]
-    _photo_counters[photo_type] += 1
+    try:
+        variant_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = variant_path.with_suffix(".tmp")
+        tmp_path.write_bytes(variant)
+        os.replace(tmp_path, variant_path)
+    except OSError as e:
+        print(f"⚠️ Could not cache photo variant {variant_path}: {e}")
+    return variant
+
+
+class CatalogPhoto:
+    """A photo held in memory with its upload metadata"""
+
+    __slots__ = ("path", "filename", "mime_type", "content_length", "original_length", "data")
+
+    def __init__(self, path, data, original_length=None):
+        self.path = path
+        self.filename = os.path.basename(path)
+        ext = os.path.splitext(self.filename)[1].lower()
+        self.mime_type = 'image/jpeg' if ext in ['.jpg', '.jpeg'] else 'image/png'
+        self.content_length = len(data)
+        self.original_length = original_length if original_length is not None else len(data)
+        # Read-only view so no upload can alter the shared bytes. requests' multipart
+        # encoder still copies them into each request body, once per upload.
+        self.data = memoryview(data).toreadonly()
+
+    @classmethod
+    def from_file(cls, path, max_dimension=PHOTO_MAX_DIMENSION, quality=PHOTO_QUALITY):
+        """Read a photo from disk, preparing its upload variant"""
+        with open(path, 'rb') as f:
+            original = f.read()
+        data = prepare_photo_variant(original, os.path.basename(path), max_dimension, quality)
+        return cls(path, data, original_length=len(original))
+
+
+class PhotoCatalog:
+    """
+    In-memory catalog of the ticket photos, one list per photo type.
+
+    The folders are scanned and read once (on first use, or explicitly via
+    load()); next() then hands out CatalogPhoto entries round-robin using the
+    shared photo counters, without touching the filesystem.
+    """
 
-    return photo_path
+    def __init__(self, photo_root=PHOTO_ROOT, photo_types=PHOTO_TYPES, max_dimension=PHOTO_MAX_DIMENSION,
+                 quality=PHOTO_QUALITY):
+        self.photo_root = Path(photo_root)
+        self.photo_types = list(photo_types)
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.photos = None
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """Scan and read every photo folder (no-op once loaded)"""
+        with self._load_lock:
+            if self.photos is not None:
+                return self
+            photos = {}
+            for photo_type in self.photo_types:
+                entries = []
+                for path in get_photos_from_folder(photo_type, self.photo_root):
+                    try:
+                        entries.append(CatalogPhoto.from_file(path, self.max_dimension, self.quality))
+                    except OSError as e:
+                        print(f"⚠️ Could not read photo {path}: {e}")
+                photos[photo_type] = entries
+            self.photos = photos
+
+        all_photos = [photo for entries in self.photos.values() for photo in entries]
+        total_bytes = sum(photo.content_length for photo in all_photos)
+        original_bytes = sum(photo.original_length for photo in all_photos)
+        counts = ", ".join(f"{photo_type}={len(entries)}" for photo_type, entries in self.photos.items())
+        size = f"{total_bytes / 1024 / 1024:.1f} MB"
+        if total_bytes != original_bytes:
+            size += f", resized from {original_bytes / 1024 / 1024:.1f} MB"
+        elif self.max_dimension and Image is None:
+            print("⚠️ TRUCKSIM_PHOTO_MAX_DIMENSION is set but Pillow is not installed; uploading originals")
+        print(f"📷 Loaded photo catalog: {counts} ({size})")
+        return self
+
+    def get(self, photo_type):
+        """All photos of a type"""
+        if self.photos is None:
+            self.load()
+        return self.photos.get(photo_type, [])
+
+    def next(self, photo_type):
+        """Next photo of a type, cycling through the catalog; None if there are none"""
+        photos = self.get(photo_type)
+        if not photos:
+            return None
 
+        with _counter_lock:
+            index = _photo_counters.get(photo_type, 0)
+            _photo_counters[photo_type] = index + 1
+        return photos[index % len(photos)]
 
-def upload_ticket_photo(ticket_id, photo_type, remarks="Ticket photo"):
+
+# Shared photo catalog used by all uploads
+photo_catalog = PhotoCatalog()
+
+AIR_TICKET_IMAGE_PATH = Path(__file__).parent / "image.jpg"
+_air_ticket_images = {}
+_air_ticket_image_lock = threading.Lock()
+
+
+def get_air_ticket_image(variant=True):
     """
-    Upload a photo to a ticket using multipart/form-data.
+    The ATP image used for air tickets, read once and kept in memory
 
     Args:
-        ticket_id (int): The ticket ID to attach photo to
-        photo_type (str): "atp", "tonnage", "hourly", or "timesheets"
-        remarks (str): Optional remarks for the photo
+        variant: Return the resized upload variant (False returns the original, e.g. for OCR)
 
     Returns:
-        bool: True if successful, False otherwise
+        CatalogPhoto: The image, or None if image.jpg is missing or empty
     """
-    global AUTH_TOKEN
+    with _air_ticket_image_lock:
+        if variant not in _air_ticket_images:
+            try:
+                max_dimension = PHOTO_MAX_DIMENSION if variant else 0
+                _air_ticket_images[variant] = CatalogPhoto.from_file(str(AIR_TICKET_IMAGE_PATH), max_dimension)
+            except OSError:
+                _air_ticket_images[variant] = None
+        image = _air_ticket_images[variant]
+    return image if image and image.content_length else None
+
+
+def get_next_photo(photo_type):
+    """
+    Get the next photo from the folder, cycling through available photos.
+
+    Args:
+        photo_type: "atp", "tonnage", "hourly", or "timesheets"
+
+    Returns:
+        str: Path to photo file, or None if no photos available
+    """
+    photo = photo_catalog.next(photo_type)
+    return photo.path if photo else None
+
+
+def _post_photo_note(url, photo, remarks):
+    """
+    POST a photo as a multipart note (files[0]) to a ticket or air ticket notes endpoint
 
+    Args:
+        url (str): Notes endpoint URL
+        photo (CatalogPhoto): Photo to upload
+        remarks (str): Remarks for the photo
+
+    Returns:
+        requests.Response: The API response (connection errors are raised)
+    """
+    # Prepare multipart form data from the in-memory photo (the encoder copies it into the body)
+    files = {
+        'files[0]': (photo.filename, photo.data, photo.mime_type)
+    }
+
+    data = {
+        'remarks': remarks,
+        'signed': 'false'
+    }
+
+    headers = {
+        "Authorization": f"Token {AUTH_TOKEN}"
+    }
+
+    return api_client.post(url, files=files, data=data, headers=headers)
+
+
+def _upload_photo(url, photo_type, remarks, label):
+    """Pick the next photo of photo_type and upload it synchronously to url"""
     if not AUTH_TOKEN:
         print(f"⚠️ No auth token available for photo upload")
         return False
 
     # Get next photo
-    photo_path = get_next_photo(photo_type)
+    photo = photo_catalog.next(photo_type)
 
-    if not photo_path:
+    if not photo:
         print(f"⚠️ No photos available in ticket_photos/{photo_type}/")
         return False
 
-    if not os.path.exists(photo_path):
-        print(f"⚠️ Photo file not found: {photo_path}")
-        return False
-
     try:
-        # Prepare multipart form data
-        filename = os.path.basename(photo_path)
-
-        # Determine mime type
-        ext = os.path.splitext(filename)[1].lower()
-        mime_type = 'image/jpeg' if ext in ['.jpg', '.jpeg'] else 'image/png'
+        response = _post_photo_note(url, photo, remarks)
 
-        # Open and read the file
-        with open(photo_path, 'rb') as f:
-            files = {
-                'files[0]': (filename, f, mime_type)
-            }
+        if response.status_code in [200, 201]:
+            print(f"  ✅ Uploaded {label}: {photo.filename}")
+            return True
+        else:
+            print(f"  ⚠️ {label.capitalize()} upload failed: {response.status_code}")
+            print(f"     Response: {response.text}")
+            return False
 
-            data = {
-                'remarks': remarks,
-                'signed': 'false'
-            }
+    except Exception as e:
+        print(f"  ⚠️ Error uploading {label}: {e}")
+        return False
 
-            headers = {
-                "Authorization": f"Token {AUTH_TOKEN}"
-            }
 
-            response = requests.post(
-                f"{API_BASE_URL}/api/2/tickets/{ticket_id}/notes",
-                files=files,
-                data=data,
-                headers=headers
-            )
+def upload_ticket_photo(ticket_id, photo_type, remarks="Ticket photo"):
+    """
+    Upload a photo to a ticket using multipart/form-data.
 
-            if response.status_code in [200, 201]:
-                print(f"  ✅ Uploaded photo: {filename}")
-                return True
-            else:
-                print(f"  ⚠️ Photo upload failed: {response.status_code}")
-                print(f"     Response: {response.text}")
-                return False
+    Args:
+        ticket_id (int): The ticket ID to attach photo to
+        photo_type (str): "atp", "tonnage", "hourly", or "timesheets"
+        remarks (str): Optional remarks for the photo
 
-    except Exception as e:
-        print(f"  ⚠️ Error uploading photo: {e}")
-        return False
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    return _upload_photo(f"{API_BASE_URL}/api/2/tickets/{ticket_id}/notes", photo_type, remarks, "photo")
 
 
 def upload_air_ticket_photo(air_ticket_id, photo_type="atp", remarks="Air ticket photo"):
@@ -244,92 +1152,279 @@ def upload_air_ticket_photo(air_ticket_id, photo_type="atp", remarks="Air ticket
     Returns:
         bool: True if successful, False otherwise
     """
-    global AUTH_TOKEN
-
-    if not AUTH_TOKEN:
-        print(f"⚠️ No auth token available for photo upload")
-        return False
+    return _upload_photo(f"{API_BASE_URL}/api/2/air-ticket-lite/{air_ticket_id}/notes", photo_type, remarks,
+                         "air ticket photo")
 
-    # Get next photo
-    photo_path = get_next_photo(photo_type)
 
-    if not photo_path:
-        print(f"⚠️ No photos available in ticket_photos/{photo_type}/")
-        return False
+# Background photo uploads: the ticket lifecycle queues photos and moves on
+PHOTO_UPLOAD_WORKERS = int(os.environ.get("TRUCKSIM_PHOTO_UPLOAD_WORKERS", "4"))
+PHOTO_UPLOAD_RETRIES = int(os.environ.get("TRUCKSIM_PHOTO_UPLOAD_RETRIES", "3"))
+PHOTO_UPLOAD_BACKOFF = float(os.environ.get("TRUCKSIM_PHOTO_UPLOAD_BACKOFF", "1.0"))
 
-    if not os.path.exists(photo_path):
-        print(f"⚠️ Photo file not found: {photo_path}")
-        return False
 
-    try:
-        # Prepare multipart form data
-        filename = os.path.basename(photo_path)
+class PhotoUploadQueue:
+    """
+    Worker pool that uploads ticket and air ticket photos in the background.
 
-        # Determine mime type
-        ext = os.path.splitext(filename)[1].lower()
-        mime_type = 'image/jpeg' if ext in ['.jpg', '.jpeg'] else 'image/png'
+    submit_* picks the photo immediately (so the round-robin order matches
+    synchronous uploads) and returns without waiting. Workers retry
+    connection errors, 429s and 5xx responses with exponential backoff.
+    drain() blocks until every queued upload has finished; wait(group) only
+    until the uploads submitted with that group (e.g. one job) have.
+    """
 
-        # Open and read the file
-        with open(photo_path, 'rb') as f:
-            files = {
-                'files[0]': (filename, f, mime_type)
-            }
+    def __init__(self, workers=PHOTO_UPLOAD_WORKERS, max_retries=PHOTO_UPLOAD_RETRIES, backoff=PHOTO_UPLOAD_BACKOFF):
+        self.workers = max(1, workers)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.uploaded = 0
+        self.failed = 0
+        self.retried = 0
+        self._jobs = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pending = {}  # group -> uploads queued or in flight
+        self._group_done = threading.Condition(self._lock)
+
+    def submit_ticket_photo(self, ticket_id, photo_type, remarks="Ticket photo", group=None):
+        """Queue a photo for /api/2/tickets/{ticket_id}/notes"""
+        return self._submit(f"{API_BASE_URL}/api/2/tickets/{ticket_id}/notes", photo_type, remarks, "photo", group)
+
+    def submit_air_ticket_photo(self, air_ticket_id, photo_type="atp", remarks="Air ticket photo", group=None):
+        """Queue a photo for /api/2/air-ticket-lite/{air_ticket_id}/notes"""
+        return self._submit(f"{API_BASE_URL}/api/2/air-ticket-lite/{air_ticket_id}/notes", photo_type, remarks,
+                            "air ticket photo", group)
+
+    def wait(self, group):
+        """Wait until every upload submitted with `group` has finished (uploaded or failed)"""
+        with self._group_done:
+            self._group_done.wait_for(lambda: not self._pending.get(group))
+
+    def drain(self):
+        """Wait for all queued uploads and print a summary"""
+        if not self._threads:
+            return
+        self._jobs.join()
+        print(f"📷 Photo uploads: {self.uploaded} uploaded, {self.failed} failed, {self.retried} retried")
 
-            data = {
-                'remarks': remarks,
-                'signed': 'false'
-            }
+    def _submit(self, url, photo_type, remarks, label, group=None):
+        photo = photo_catalog.next(photo_type)
+        if not photo:
+            print(f"⚠️ No photos available in ticket_photos/{photo_type}/")
+            return False
 
-            headers = {
-                "Authorization": f"Token {AUTH_TOKEN}"
-            }
+        self._start_workers()
+        if group is not None:
+            with self._lock:
+                self._pending[group] = self._pending.get(group, 0) + 1
+        self._jobs.put((contextvars.copy_context(), group, url, photo, remarks, label))  # uploads trace under the caller's span
+        return True
 
-            response = requests.post(
-                f"{API_BASE_URL}/api/2/air-ticket-lite/{air_ticket_id}/notes",
-                files=files,
-                data=data,
-                headers=headers
-            )
+    def _start_workers(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"photo-upload-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            context, group, *job = self._jobs.get()
+            ok = False
+            try:
+                ok = context.run(self._upload, *job)
+            finally:
+                with self._lock:
+                    if ok:
+                        self.uploaded += 1
+                    else:
+                        self.failed += 1
+                    if group is not None:
+                        self._pending[group] -= 1
+                        if not self._pending[group]:
+                            del self._pending[group]
+                            self._group_done.notify_all()
+                self._jobs.task_done()
+
+    def _upload(self, url, photo, remarks, label):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = _post_photo_note(url, photo, remarks)
+                if response.status_code in [200, 201]:
+                    print(f"  ✅ Uploaded {label}: {photo.filename}")
+                    return True
+                retryable = response.status_code == 429 or response.status_code >= 500
+                error = f"{response.status_code} {response.text}"
+            except Exception as e:
+                retryable = True
+                error = str(e)
 
-            if response.status_code in [200, 201]:
-                print(f"  ✅ Uploaded air ticket photo: {filename}")
-                return True
-            else:
-                print(f"  ⚠️ Air ticket photo upload failed: {response.status_code}")
-                print(f"     Response: {response.text}")
+            if not retryable or attempt == self.max_retries:
+                print(f"  ⚠️ {label.capitalize()} upload failed for {url}: {error}")
                 return False
 
-    except Exception as e:
-        print(f"  ⚠️ Error uploading air ticket photo: {e}")
+            with self._lock:
+                self.retried += 1
+            time.sleep(self.backoff * (2 ** attempt))
         return False
 
 
+# Shared background uploader used by the ticket lifecycle
+photo_upload_queue = PhotoUploadQueue()
+atexit.register(photo_upload_queue.drain)
+
+
 # Initialize OpenSearch client
 es_client = OpenSearch(
-    hosts=[{'host': ES_HOST, 'port': 443}],
+    hosts=[{'host': ES_HOST, 'port': ES_PORT}],
     http_auth=ES_AUTH,
-    use_ssl=True,
-    verify_certs=True
+    use_ssl=ES_USE_SSL,
+    verify_certs=ES_USE_SSL
 )
 
+# OpenSearch bulk indexing configuration
+ES_BULK_BATCH_SIZE = int(os.environ.get("TRUCKSIM_ES_BULK_BATCH_SIZE", "500"))
+ES_BULK_FLUSH_INTERVAL = float(os.environ.get("TRUCKSIM_ES_BULK_FLUSH_INTERVAL", "5.0"))
+ES_BULK_MAX_BYTES = int(os.environ.get("TRUCKSIM_ES_BULK_MAX_BYTES", str(5 * 1024 * 1024)))
 
-def authenticate_without_device():
-    """Authenticate using standard method without device info."""
-    auth_data = {
-        "username": USERNAME,
-        "password": PASSWORD
-    }
 
-    headers = {
-        "Content-Type": "application/json"
+class OpenSearchBulkWriter:
+    """
+    Buffered writer that indexes documents through the OpenSearch _bulk API.
+
+    Documents are queued with add() and sent in one _bulk request when the
+    buffer reaches batch_size documents or max_bytes of NDJSON, or when
+    flush_interval seconds have passed since the last flush. Per-document
+    failures from the bulk response are printed and kept in `failures`.
+    """
+
+    MAX_RECORDED_FAILURES = 100
+
+    def __init__(self, client, batch_size=ES_BULK_BATCH_SIZE, flush_interval=ES_BULK_FLUSH_INTERVAL,
+                 max_bytes=ES_BULK_MAX_BYTES):
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+
+        self.indexed = 0
+        self.failed = 0
+        self.failures = []
+
+        self._buffer = []  # (index, action_line, source_line)
+        self._buffer_bytes = 0
+        self._buffer_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def add(self, index, doc):
+        """Queue a document for indexing, flushing if a size limit is reached"""
+        action_line = json.dumps({"index": {"_index": index}})
+        source_line = json.dumps(doc, default=str)
+        size = len(action_line) + len(source_line) + 2
+
+        batch = None
+        with self._buffer_lock:
+            self._start_flusher()
+            if self._buffer and self._buffer_bytes + size > self.max_bytes:
+                batch = self._take_buffer()
+            self._buffer.append((index, action_line, source_line))
+            self._buffer_bytes += size
+            if batch is None and len(self._buffer) >= self.batch_size:
+                batch = self._take_buffer()
+
+        if batch:
+            self._send(batch)
+
+    def flush(self):
+        """Send everything currently buffered"""
+        with self._buffer_lock:
+            batch = self._take_buffer()
+        if batch:
+            self._send(batch)
+
+    def close(self):
+        """Stop the interval flusher and flush remaining documents"""
+        self._stop.set()
+        self.flush()
+        if self.indexed or self.failed:
+            print(f"📤 OpenSearch bulk writer: {self.indexed} indexed, {self.failed} failed")
+
+    def _start_flusher(self):
+        if self._flusher is None and self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="es-bulk-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval / 2):
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def _take_buffer(self):
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._last_flush = time.monotonic()
+        return batch
+
+    def _send(self, batch):
+        body = "".join(f"{action_line}\n{source_line}\n" for _, action_line, source_line in batch)
+
+        with self._send_lock, tracer.span("POST /_bulk", "http", documents=len(batch)):
+            started = time.perf_counter()
+            try:
+                response = self.client.bulk(body=body)
+            except Exception as e:
+                request_metrics.observe("POST /_bulk", time.perf_counter() - started, bytes_sent=len(body.encode()), error=True)
+                print(f"❌ Bulk indexing of {len(batch)} document(s) failed: {e}")
+                self.failed += len(batch)
+                self._record_failure(batch[0][0], None, str(e))
+                return
+
+            elapsed = time.perf_counter() - started
+            items = response.get("items", [])
+            failed = 0
+            for (index, _, _), item in zip(batch, items):
+                result = item.get("index", {})
+                if result.get("error") or result.get("status", 200) >= 300:
+                    failed += 1
+                    self._record_failure(index, result.get("status"), result.get("error"))
+                    print(f"  ❌ Failed to index document in {index}: {result.get('status')} {result.get('error')}")
+
+            request_metrics.observe("POST /_bulk", elapsed, bytes_sent=len(body.encode()), error=bool(failed))
+            self.failed += failed
+            self.indexed += len(batch) - failed
+
+    def _record_failure(self, index, status, error):
+        if len(self.failures) < self.MAX_RECORDED_FAILURES:
+            self.failures.append({"index": index, "status": status, "error": error})
+
+
+# Shared bulk writer for GPS, alert and location events; flushed on exit
+es_bulk_writer = OpenSearchBulkWriter(es_client)
+atexit.register(es_bulk_writer.close)
+
+
+def authenticate_without_device():
+    """Authenticate using standard method without device info."""
+    auth_data = {
+        "username": USERNAME,
+        "password": PASSWORD
+    }
+
+    headers = {
+        "Content-Type": "application/json"
     }
 
     try:
         print("🔑 Authenticating (without device)...")
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/signin",
             json=auth_data,
-            headers=headers
+            headers=headers,
+            authenticate=False
         )
 
         if response.status_code == 200:
@@ -388,10 +1483,11 @@ def authenticate_with_device():
     try:
         print("📱 Authenticating with mobile device...")
 
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/signin",
             json=auth_data,
             headers=headers,
+            authenticate=False,
             timeout=15
         )
 
@@ -425,7 +1521,7 @@ def get_site_regions(site_id):
     }
 
     try:
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/api/1/regions?siteId={site_id}",
             headers=headers
         )
@@ -464,13 +1560,14 @@ def update_site_region(region_id, center_lat, center_lng, radius=100):
 
     try:
         print(f"  🔄 Updating region {region_id} to radius {radius}m...")
-        response = requests.put(
+        response = api_client.put(
             f"{API_BASE_URL}/api/2/regions/{region_id}",
             json=update_data,
             headers=headers
         )
         if response.status_code in [200, 201]:
             print(f"  ✅ Updated region {region_id}")
+            lookup_cache.invalidate("truck_regions:")
             return True
         else:
             print(f"  ⚠️ Could not update region {region_id}: {response.status_code}")
@@ -532,7 +1629,7 @@ def create_site_geofence(site_id, site_name, center_lat, center_lng, radius=100)
     try:
         print(f"  📍 Creating geofence for {site_name} (ID: {site_id})...")
         print(f"     Center: ({center_lat}, {center_lng}), Radius: {radius}m")
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/1/regions",
             json=region_data,
             headers=headers
@@ -541,6 +1638,7 @@ def create_site_geofence(site_id, site_name, center_lat, center_lng, radius=100)
         if response.status_code in [200, 201]:
             region_id = response.json().get("data")
             print(f"  ✅ Created geofence with ID: {region_id}")
+            lookup_cache.invalidate("truck_regions:")
             return region_id
         else:
             print(f"  ⚠️ Geofence creation failed: {response.status_code} - {response.text}")
@@ -579,53 +1677,90 @@ def ensure_site_has_geofence(site_id, site_name=None, lat=None, lng=None):
     return region_id is not None
 
 
-def get_truck_regions():
-    """Fetch truck regions for all trucks from the correct API endpoint"""
-    if not AUTH_TOKEN:
-        print("No auth token available. Please authenticate first.")
-        return []
+# Worker threads used for per-truck region fetches
+REGION_FETCH_WORKERS = int(os.environ.get("TRUCKSIM_REGION_FETCH_WORKERS", "8"))
+
+
+def _fetch_regions_for_truck(truck, headers):
+    """Regions for one truck, or None if the request failed"""
+    try:
+        response = api_client.get(
+            f"{API_BASE_URL}/api/1/trucks/truck-regions?truck={truck['id']}",
+            headers=headers
+        )
 
+        if response.status_code == 200:
+            # Extract regions from the data field
+            return response.json().get("data", [])
+
+        print(f"Failed to get regions for truck {truck['id']}. Status: {response.status_code}")
+        print(f"Response: {response.text}")
+    except Exception as e:
+        print(f"Error getting regions for truck {truck['id']}: {e}")
+    return None
+
+
+def get_regions_by_truck(trucks, workers=REGION_FETCH_WORKERS):
+    """
+    Regions of each truck, fetched one truck per worker
+
+    Cached trucks are served from the lookup cache; the rest are fetched
+    concurrently and written back in a single cache save.
+
+    Returns:
+        dict: truck ID -> list of region dicts (None where the request failed)
+    """
     headers = {
         "Authorization": f"Token {AUTH_TOKEN}",
         "Content-Type": "application/json"
     }
 
+    by_truck = {truck['id']: lookup_cache.get(f"truck_regions:{truck['id']}", ttl=FLEET_CACHE_TTL) for truck in trucks}
+    to_fetch = [truck for truck in trucks if by_truck[truck['id']] is None]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        fetched = list(executor.map(tracer.bind(lambda truck: _fetch_regions_for_truck(truck, headers)), to_fetch))
+
+    for truck, regions_list in zip(to_fetch, fetched):
+        by_truck[truck['id']] = regions_list
+    lookup_cache.set_many({f"truck_regions:{truck['id']}": regions_list for truck, regions_list in zip(to_fetch, fetched)})
+    return by_truck
+
+
+def get_truck_regions(trucks=None, workers=REGION_FETCH_WORKERS):
+    """Fetch truck regions for all trucks from the correct API endpoint, one truck per worker"""
+    if not AUTH_TOKEN:
+        print("No auth token available. Please authenticate first.")
+        return []
+
+    if trucks is None:
+        trucks = TRUCKS
+
+    return merge_truck_regions(trucks, get_regions_by_truck(trucks, workers=workers))
+
+
+def merge_truck_regions(trucks, by_truck):
+    """Unique regions across trucks, in fleet order, from get_regions_by_truck() results"""
     all_regions = []
     seen_regions = set()
 
-    # Get regions for each truck in our TRUCKS list
-    for truck in TRUCKS:
-        try:
-            response = requests.get(
-                f"{API_BASE_URL}/api/1/trucks/truck-regions?truck={truck['id']}",
-                headers=headers
-            )
+    for truck in trucks:
+        regions_list = by_truck.get(truck['id'])
+        if regions_list is None:
+            continue
 
-            if response.status_code == 200:
-                regions_data = response.json()
-                print(f"Raw response for truck {truck['id']}: {regions_data}")
-
-                # Extract regions from the data field
-                regions_list = regions_data.get("data", [])
-                regions_added = 0
-
-                for region in regions_list:
-                    region_id = region.get("id")
-                    if region_id and region_id not in seen_regions:
-                        all_regions.append(region)
-                        seen_regions.add(region_id)
-                        regions_added += 1
-
-                if regions_added > 0:
-                    print(f"Found {regions_added} region(s) for truck {truck['device_name']} (ID: {truck['id']})")
-                else:
-                    print(f"No regions found for truck {truck['device_name']} (ID: {truck['id']})")
-            else:
-                print(f"Failed to get regions for truck {truck['id']}. Status: {response.status_code}")
-                print(f"Response: {response.text}")
+        regions_added = 0
+        for region in regions_list:
+            region_id = region.get("id")
+            if region_id and region_id not in seen_regions:
+                all_regions.append(region)
+                seen_regions.add(region_id)
+                regions_added += 1
 
-        except Exception as e:
-            print(f"Error getting regions for truck {truck['id']}: {e}")
+        if regions_added > 0:
+            print(f"Found {regions_added} region(s) for truck {truck['device_name']} (ID: {truck['id']})")
+        else:
+            print(f"No regions found for truck {truck['device_name']} (ID: {truck['id']})")
 
     # If no regions found for any truck, create a default region with ID 0
     if not all_regions:
@@ -637,53 +1772,168 @@ def get_truck_regions():
     return all_regions
 
 
+def get_company_truck_regions():
+    """
+    Fetch every truck region of the company in one call (cached)
+
+    Returns:
+        list: Region dicts, or None if the bulk listing is not available
+    """
+    def fetch():
+        try:
+            response = api_client.get(
+                f"{API_BASE_URL}/api/1/trucks/truck-regions",
+                headers={"Authorization": f"Token {AUTH_TOKEN}", "Content-Type": "application/json"}
+            )
+            if response.status_code == 200:
+                regions = response.json().get("data")
+                if isinstance(regions, list) and all(isinstance(region, dict) and "id" in region for region in regions):
+                    return regions
+                print("Bulk truck region listing returned an unexpected payload, fetching per truck")
+                return None
+            print(f"Bulk truck region listing unavailable (status {response.status_code}), fetching per truck")
+        except Exception as e:
+            print(f"Error getting truck regions: {e}")
+        return None
+
+    return lookup_cache.get_or_fetch("truck_regions:all", fetch, ttl=FLEET_CACHE_TTL)
+
+
+def get_company_trucks():
+    """
+    Fetch all trucks of the company (cached)
+
+    Returns:
+        list: Truck dicts as returned by /api/2/trucks, or None on failure
+    """
+    def fetch():
+        response = api_client.get(
+            f"{API_BASE_URL}/api/2/trucks?company_id={COMPANY_ID}",
+            headers={"Authorization": f"Token {AUTH_TOKEN}", "Content-Type": "application/json"}
+        )
+
+        if response.status_code != 200:
+            print(f"Failed to get trucks. Status: {response.status_code}")
+            print(f"Response: {response.text}")
+            return None
+
+        return response.json().get("data", [])
+
+    return lookup_cache.get_or_fetch("trucks", fetch, ttl=FLEET_CACHE_TTL)
+
+
 def get_trucks_with_regions():
     """Fetch trucks with their associated regions"""
     if not AUTH_TOKEN:
         print("No auth token available. Please authenticate first.")
         return {}
 
-    headers = {
-        "Authorization": f"Token {AUTH_TOKEN}",
-        "Content-Type": "application/json"
-    }
-
     try:
         # Get all trucks for the company
-        response = requests.get(
-            f"{API_BASE_URL}/api/2/trucks?company_id={COMPANY_ID}",
-            headers=headers
-        )
+        trucks = get_company_trucks()
+        if trucks is None:
+            return {}
 
-        if response.status_code == 200:
-            trucks_data = response.json()
-            trucks = trucks_data.get("data", [])
-            print(f"Found {len(trucks)} trucks")
+        print(f"Found {len(trucks)} trucks")
 
-            # Create a map of truck_id to region_id
-            truck_to_region = {}
-            for truck in trucks:
-                truck_id = truck.get("id")
-                region_id = truck.get("truck_region_id")
+        # Create a map of truck_id to region_id
+        truck_to_region = {}
+        for truck in trucks:
+            truck_id = truck.get("id")
+            region_id = truck.get("truck_region_id")
 
-                # If truck has no region assigned, use default region ID 0
-                if not region_id:
-                    region_id = 0
-                    print(f"Truck {truck_id} has no region assigned, using default region ID 0")
+            # If truck has no region assigned, use default region ID 0
+            if not region_id:
+                region_id = 0
+                print(f"Truck {truck_id} has no region assigned, using default region ID 0")
 
-                truck_to_region[truck_id] = region_id
+            truck_to_region[truck_id] = region_id
 
-            return truck_to_region
-        else:
-            print(f"Failed to get trucks. Status: {response.status_code}")
-            print(f"Response: {response.text}")
-            return {}
+        return truck_to_region
 
     except Exception as e:
         print(f"Error getting trucks: {e}")
         return {}
 
 
+class TruckRegionIndex:
+    """
+    In-memory truck -> region and region -> name lookups for alert/activity generation
+
+    Built once per run from the company truck list and the region listing; the
+    fallback and dropoff regions that used to be rescanned per truck are
+    computed up front.
+    """
+
+    def __init__(self, truck_to_region, regions):
+        self.truck_to_region = dict(truck_to_region)
+        self.regions = list(regions)
+        self.region_names = {region.get("id"): region.get("name") for region in self.regions}
+
+        # Distinct region IDs in truck order; the first one is the fallback region
+        self.region_order = list(dict.fromkeys(r_id for r_id in self.truck_to_region.values() if r_id is not None))
+        self.default_region_id = self.region_order[0] if self.region_order else 0
+
+    def __bool__(self):
+        return bool(self.truck_to_region) and bool(self.regions)
+
+    @classmethod
+    def load(cls, trucks=None, workers=REGION_FETCH_WORKERS):
+        """
+        Build the index with one bulk truck listing plus one bulk region listing,
+        falling back to concurrent per-truck region fetches unless the bulk
+        listings cover every requested truck and every region those trucks use
+
+        Args:
+            trucks: Trucks to resolve regions for (defaults to TRUCKS)
+            workers: Worker threads for the per-truck fallback
+        """
+        if trucks is None:
+            trucks = TRUCKS
+
+        truck_to_region = get_trucks_with_regions()
+        regions = get_company_truck_regions()
+
+        unlisted = [truck for truck in trucks if truck["id"] not in truck_to_region]
+        wanted = {truck_to_region.get(truck["id"]) for truck in trucks} - {None, 0}
+        missing = wanted - {region.get("id") for region in regions or []}
+        if regions is None or unlisted or missing:
+            if regions is not None:
+                print(f"Bulk truck regions do not cover the fleet ({len(unlisted)} unlisted truck(s), "
+                      f"{len(missing)} unknown region(s)), fetching per truck")
+            by_truck = get_regions_by_truck(trucks, workers=workers)
+            regions = merge_truck_regions(trucks, by_truck)
+            # Trucks absent from the listing take their first region from the per-truck fetch
+            for truck in unlisted:
+                truck_regions = by_truck.get(truck["id"])
+                if truck_regions:
+                    truck_to_region[truck["id"]] = truck_regions[0].get("id")
+        elif not regions:
+            regions = [{"id": 0, "name": "Default Region"}]
+
+        index = cls(truck_to_region, regions)
+        print(f"Indexed {len(index.truck_to_region)} truck(s) across {len(index.region_names)} region(s)")
+        return index
+
+    def region_for(self, truck):
+        """Region ID for a truck dict, falling back to the default region"""
+        region_id = self.truck_to_region.get(truck["id"])
+        if region_id is None:  # Check for None specifically, since 0 is a valid region ID
+            print(f"No region found for truck {truck['device_name']} (ID: {truck['id']}). Using default region.")
+            region_id = self.default_region_id
+        return region_id
+
+    def dropoff_region_for(self, region_id):
+        """First region (in truck order) other than region_id, or region_id itself"""
+        for r_id in self.region_order[:2]:
+            if r_id != region_id:
+                return r_id or region_id
+        return region_id
+
+    def region_name(self, region_id):
+        return self.region_names.get(region_id, f"Region_{region_id}")
+
+
 def get_projects():
     """Get list of projects for the company"""
     if not AUTH_TOKEN:
@@ -695,9 +1945,14 @@ def get_projects():
         "Content-Type": "application/json"
     }
 
+    projects = lookup_cache.get("projects:all")
+    if projects is not None:
+        print(f"Found {len(projects)} projects (cached)")
+        return projects
+
     try:
         # Get all projects including archived/closed ones
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/api/2/projects?paginate=false&status=1,2,3",
             headers=headers
         )
@@ -705,6 +1960,7 @@ def get_projects():
         if response.status_code == 200:
             projects = response.json().get("data", [])
             print(f"Found {len(projects)} projects")
+            lookup_cache.set("projects:all", projects)
             return projects
         else:
             print(f"Failed to get projects. Status: {response.status_code}")
@@ -714,73 +1970,154 @@ def get_projects():
         return None
 
 
-def get_or_create_purchase_order(project_id, pickup_site_id, dropoff_site_id, unit_of_measure_id, po_name="Demo PO", quantity=None):
+# Worker threads used to fetch PO line items during discovery
+PO_DISCOVERY_WORKERS = int(os.environ.get("TRUCKSIM_PO_DISCOVERY_WORKERS", "10"))
+PO_PAGE_SIZE = 100
+# Upper bound on PO listing pages, in case a backend ignores page/per_page
+PO_MAX_PAGES = int(os.environ.get("TRUCKSIM_PO_MAX_PAGES", "100"))
+
+# project_id -> {unit_of_measure_id: (po_id, po_line_item_id, po_data)} for this run
+_po_uom_indexes = {}
+_po_index_lock = threading.Lock()
+
+
+def _fetch_po_line_items(po_id, headers):
+    """Fetch the line items of one PO, returning [] on failure"""
+    try:
+        response = api_client.get(
+            f"{API_BASE_URL}/api/1/purchase-orders/{po_id}/items",
+            headers=headers
+        )
+        if response.status_code == 200:
+            return response.json().get("data", [])
+        print(f"      ⚠️ Could not fetch line items for PO #{po_id}. Status: {response.status_code}")
+    except Exception as e:
+        print(f"      ⚠️ Error fetching line items for PO #{po_id}: {e}")
+    return []
+
+
+def build_po_uom_index(project_id, workers=PO_DISCOVERY_WORKERS):
     """
-    Get existing PO for a project with specific UOM, or create a new one with varied material.
+    Scan every non-archived PO of a project and index the first line item per UOM.
+
+    POs are listed page by page and their line items are fetched concurrently;
+    the first PO (in listing order) with a line item of a given UOM wins, as the
+    old one-PO-at-a-time scan did.
 
     Args:
         project_id: Project ID
-        pickup_site_id: Pickup site ID
-        dropoff_site_id: Dropoff site ID
-        unit_of_measure_id: UOM ID (1=Hour, 2=Ton, 4=Load)
-        po_name: Name/reference for the PO
+        workers: Number of concurrent line-item fetches
 
     Returns:
-        tuple: (po_id, po_line_item_id, po_data)
+        dict: {unit_of_measure_id: (po_id, po_line_item_id, po_data)}
     """
-    if not AUTH_TOKEN:
-        print("No auth token available.")
-        return None, None, None
-
     headers = {
         "Authorization": f"Token {AUTH_TOKEN}",
         "Content-Type": "application/json"
     }
 
-    # Try to find existing PO for this project with matching UOM
-    try:
-        print(f"   Checking for existing {po_name} with UOM={unit_of_measure_id}...")
-        response = requests.get(
+    pos = []
+    seen_po_ids = set()
+    page = 1
+    while page <= PO_MAX_PAGES:
+        response = api_client.get(
             f"{API_BASE_URL}/api/2/purchase-orders",
             headers=headers,
             params={
                 "projects": project_id,
                 "archived": False,
-                "page": 1,
-                "per_page": 100
+                "page": page,
+                "per_page": PO_PAGE_SIZE
             }
         )
+        if response.status_code != 200:
+            print(f"   ⚠️ Failed to list POs (page {page}). Status: {response.status_code}")
+            break
+        page_pos = response.json().get("data", [])
+        new_pos = [po for po in page_pos if po.get("id") not in seen_po_ids]
+        if page_pos and not new_pos:
+            print(f"   ⚠️ PO listing page {page} repeats earlier POs; assuming the backend ignores paging")
+            break
+        seen_po_ids.update(po.get("id") for po in new_pos)
+        pos.extend(new_pos)
+        if len(page_pos) < PO_PAGE_SIZE:
+            break
+        page += 1
+    else:
+        print(f"   ⚠️ Stopped listing POs after {PO_MAX_PAGES} page(s) (TRUCKSIM_PO_MAX_PAGES)")
 
-        if response.status_code == 200:
-            pos = response.json().get("data", [])
-            print(f"   Found {len(pos)} total PO(s) for this project")
+    print(f"   Found {len(pos)} total PO(s) for this project, fetching line items with {workers} worker(s)...")
 
-            # Check each PO for matching UOM in line items
-            for po in pos:
-                po_id = po.get("id")
+    index = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        all_line_items = executor.map(tracer.bind(lambda po: _fetch_po_line_items(po.get("id"), headers)), pos)
+        for po, line_items in zip(pos, all_line_items):
+            for line_item in line_items:
+                line_uom = line_item.get("unitOfMeasure")
+                if line_uom not in index:
+                    index[line_uom] = (po.get("id"), line_item.get("id"), po)
 
-                # Fetch line items
-                line_items_response = requests.get(
-                    f"{API_BASE_URL}/api/1/purchase-orders/{po_id}/items",
-                    headers=headers
-                )
+    for line_uom, (po_id, line_item_id, _) in sorted(index.items(), key=lambda item: str(item[0])):
+        print(f"      UOM={line_uom}: PO #{po_id} (Line Item: {line_item_id})")
+    return index
 
-                if line_items_response.status_code == 200:
-                    line_items = line_items_response.json().get("data", [])
-                    print(f"      PO #{po_id} has {len(line_items)} line item(s)")
-
-                    for line_item in line_items:
-                        line_uom = line_item.get("unitOfMeasure")
-                        line_item_id = line_item.get("id")
-                        print(f"         Line Item #{line_item_id}: UOM={line_uom} (looking for UOM={unit_of_measure_id})")
-                        if line_uom == unit_of_measure_id:
-                            print(f"   ✅ Found existing PO #{po_id} with matching UOM={line_uom} (Line Item: {line_item_id})")
-                            print(f"   ℹ️  Reusing this PO instead of creating a new one")
-                            return po_id, line_item_id, po
-    except Exception as e:
-        print(f"   ⚠️ Error checking for existing POs: {e}")
-        import traceback
-        traceback.print_exc()
+
+def get_po_uom_index(project_id):
+    """
+    UOM -> (po_id, po_line_item_id, po_data) index for a project
+
+    Built once per run (or loaded from the lookup cache) and shared by every
+    get_or_create_purchase_order call.
+    """
+    with _po_index_lock:
+        if project_id in _po_uom_indexes:
+            return _po_uom_indexes[project_id]
+
+        cache_key = f"po:{project_id}:index"
+        cached = lookup_cache.get(cache_key)
+        if cached is not None:
+            index = {uom: (po_id, line_item_id, po) for uom, po_id, line_item_id, po in cached}
+            print(f"   Loaded PO index for project {project_id} from cache ({len(index)} UOM(s))")
+        else:
+            try:
+                index = build_po_uom_index(project_id)
+                lookup_cache.set(cache_key, [[uom, *entry] for uom, entry in index.items()])
+            except Exception as e:
+                print(f"   ⚠️ Error checking for existing POs: {e}")
+                import traceback
+                traceback.print_exc()
+                index = {}
+
+        _po_uom_indexes[project_id] = index
+        return index
+
+
+def get_or_create_purchase_order(project_id, pickup_site_id, dropoff_site_id, unit_of_measure_id, po_name="Demo PO", quantity=None):
+    """
+    Get existing PO for a project with specific UOM, or create a new one with varied material.
+
+    Args:
+        project_id: Project ID
+        pickup_site_id: Pickup site ID
+        dropoff_site_id: Dropoff site ID
+        unit_of_measure_id: UOM ID (1=Hour, 2=Ton, 4=Load)
+        po_name: Name/reference for the PO
+
+    Returns:
+        tuple: (po_id, po_line_item_id, po_data)
+    """
+    if not AUTH_TOKEN:
+        print("No auth token available.")
+        return None, None, None
+
+    # Look up an existing PO for this project with matching UOM
+    print(f"   Checking for existing {po_name} with UOM={unit_of_measure_id}...")
+    po_index = get_po_uom_index(project_id)
+    if unit_of_measure_id in po_index:
+        po_id, line_item_id, po = po_index[unit_of_measure_id]
+        print(f"   ✅ Found existing PO #{po_id} with matching UOM={unit_of_measure_id} (Line Item: {line_item_id})")
+        print(f"   ℹ️  Reusing this PO instead of creating a new one")
+        return po_id, line_item_id, po
 
     # No existing PO found, create a new one with varied material
     print(f"   Creating new {po_name}...")
@@ -816,7 +2153,7 @@ def get_or_create_purchase_order(project_id, pickup_site_id, dropoff_site_id, un
         else:  # Load
             quantity = 50.0
 
-    return create_purchase_order(
+    po_id, po_line_item_id, po = create_purchase_order(
         project_id=project_id,
         pickup_site_id=pickup_site_id,
         dropoff_site_id=dropoff_site_id,
@@ -826,6 +2163,13 @@ def get_or_create_purchase_order(project_id, pickup_site_id, dropoff_site_id, un
         quantity=quantity
     )
 
+    # Later lookups for this UOM reuse the new PO
+    if po_id and po_line_item_id:
+        with _po_index_lock:
+            _po_uom_indexes.setdefault(project_id, {})[unit_of_measure_id] = (po_id, po_line_item_id, po)
+
+    return po_id, po_line_item_id, po
+
 
 def get_project_po_line_items(project_id):
     """Get PO line items for a specific project"""
@@ -839,7 +2183,7 @@ def get_project_po_line_items(project_id):
     }
 
     try:
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/api/2/projects/{project_id}/po-items",
             headers=headers
         )
@@ -858,6 +2202,44 @@ def get_project_po_line_items(project_id):
         return None
 
 
+def find_project(name, keywords=None):
+    """
+    Find a project by exact name using the projects keyword search
+
+    Args:
+        name: Exact project name to match
+        keywords: Search keywords (defaults to name)
+
+    Returns:
+        dict: Project data, or None if no project matched
+    """
+    if not AUTH_TOKEN:
+        print("No auth token available.")
+        return None
+
+    headers = {
+        "Authorization": f"Token {AUTH_TOKEN}",
+        "Content-Type": "application/json"
+    }
+
+    def fetch():
+        try:
+            search_response = api_client.get(
+                f"{API_BASE_URL}/api/2/projects",
+                headers=headers,
+                params={"keywords": keywords or name, "paginate": "false"}
+            )
+            if search_response.status_code == 200:
+                for project in search_response.json().get("data", []):
+                    if project.get('name') == name:
+                        return project
+        except Exception as e:
+            print(f"⚠️ Error searching for project: {e}")
+        return None
+
+    return lookup_cache.get_or_fetch(f"projects:name:{name}", fetch)
+
+
 def create_project(name="Demo Script Project - Restricted Customer"):
     """Create a new project"""
     if not AUTH_TOKEN:
@@ -879,7 +2261,7 @@ def create_project(name="Demo Script Project - Restricted Customer"):
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/projects",
             json=project_data,
             headers=headers
@@ -889,6 +2271,7 @@ def create_project(name="Demo Script Project - Restricted Customer"):
             project = response.json().get("data", {})
             project_id = project.get("id")
             print(f"✅ Created project: {name} (ID: {project_id})")
+            lookup_cache.invalidate("projects:")
             return project_id, project
         else:
             print(f"❌ Failed to create project. Status: {response.status_code}")
@@ -909,23 +2292,26 @@ def get_sites_by_name(name):
         "Content-Type": "application/json"
     }
 
-    try:
-        # Search for sites with the given name
-        response = requests.get(
-            f"{API_BASE_URL}/api/1/sites?keywords={name}&paginate=false",
-            headers=headers
-        )
+    def fetch():
+        try:
+            # Search for sites with the given name
+            response = api_client.get(
+                f"{API_BASE_URL}/api/1/sites?keywords={name}&paginate=false",
+                headers=headers
+            )
 
-        if response.status_code == 200:
-            sites = response.json().get("data", [])
-            # Look for exact match
-            for site in sites:
-                if site.get("name") == name:
-                    return site
-        return None
-    except Exception as e:
-        print(f"⚠️ Error checking for existing site: {e}")
-        return None
+            if response.status_code == 200:
+                sites = response.json().get("data", [])
+                # Look for exact match
+                for site in sites:
+                    if site.get("name") == name:
+                        return site
+            return None
+        except Exception as e:
+            print(f"⚠️ Error checking for existing site: {e}")
+            return None
+
+    return lookup_cache.get_or_fetch(f"sites:{name}", fetch)
 
 
 def create_site(name, address, latitude, longitude, site_type="plant"):
@@ -957,7 +2343,7 @@ def create_site(name, address, latitude, longitude, site_type="plant"):
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/1/sites",
             json=site_data,
             headers=headers
@@ -967,6 +2353,7 @@ def create_site(name, address, latitude, longitude, site_type="plant"):
             site = response.json().get("data", {})
             site_id = site.get("id")
             print(f"✅ Created {site_type} site: {name} (ID: {site_id})")
+            lookup_cache.invalidate("sites:")
             return site_id, site
         else:
             print(f"❌ Failed to create site. Status: {response.status_code}")
@@ -1008,15 +2395,19 @@ def create_purchase_order(project_id, pickup_site_id, dropoff_site_id, payload_i
     # Get truck types for the company
     truck_types = []
     try:
-        truck_types_response = requests.get(
-            f"{API_BASE_URL}/api/1/truck-types",
-            headers={"Authorization": f"Token {AUTH_TOKEN}"}
-        )
-        if truck_types_response.status_code == 200:
-            all_truck_types = truck_types_response.json().get("data", [])
-            # Get first truck type or use empty list
-            if all_truck_types:
-                truck_types = [all_truck_types[0].get("id")]
+        def fetch_truck_types():
+            truck_types_response = api_client.get(
+                f"{API_BASE_URL}/api/1/truck-types",
+                headers={"Authorization": f"Token {AUTH_TOKEN}"}
+            )
+            if truck_types_response.status_code == 200:
+                return truck_types_response.json().get("data", [])
+            return None
+
+        all_truck_types = lookup_cache.get_or_fetch("truck_types", fetch_truck_types)
+        # Get first truck type or use empty list
+        if all_truck_types:
+            truck_types = [all_truck_types[0].get("id")]
     except Exception as e:
         print(f"⚠️ Could not fetch truck types: {e}")
 
@@ -1044,7 +2435,7 @@ def create_purchase_order(project_id, pickup_site_id, dropoff_site_id, payload_i
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/1/purchase-orders",
             json=po_data,
             headers=headers
@@ -1054,13 +2445,14 @@ def create_purchase_order(project_id, pickup_site_id, dropoff_site_id, payload_i
             response_data = response.json()
             po = response_data.get("data", {})
             po_id = po.get("id")
+            lookup_cache.invalidate("po:")
 
             # Line items aren't included in the create response, fetch them separately
             if po_id:
                 print(f"✅ Created Purchase Order (ID: {po_id}), fetching line items...")
                 try:
                     # Fetch PO line items using the items endpoint
-                    line_items_response = requests.get(
+                    line_items_response = api_client.get(
                         f"{API_BASE_URL}/api/1/purchase-orders/{po_id}/items",
                         headers=headers
                     )
@@ -1198,7 +2590,7 @@ def create_job_order(pickup_site_id=None, dropoff_site_id=None, po_line_item_id=
 
     try:
         # Make the POST request to create job order
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/job-orders",  # Adjust endpoint path if needed
             json=job_order_data,
             headers=headers
@@ -1211,7 +2603,7 @@ def create_job_order(pickup_site_id=None, dropoff_site_id=None, po_line_item_id=
 
             # Fetch full job order details with items array
             if job_order_id:
-                get_response = requests.get(
+                get_response = api_client.get(
                     f"{API_BASE_URL}/api/2/job-orders/{job_order_id}",
                     headers=headers
                 )
@@ -1250,7 +2642,7 @@ def get_site_for_region(region_id):
 
     # Try to find a site that belongs to this region
     try:
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/api/2/sites?region_id={region_id}",
             headers=headers
         )
@@ -1284,7 +2676,7 @@ def get_site_name(site_id):
     }
 
     try:
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/api/2/sites/{site_id}",
             headers=headers
         )
@@ -1328,7 +2720,7 @@ def accept_job_order_for_truck(jo_line_item_id, truck_id):
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/job-orders/{jo_line_item_id}/accept/{truck_id}",
             headers=headers
         )
@@ -1414,7 +2806,7 @@ def create_ticket(job_order_id, truck_id, jo_line_item_id, quantity, latitude=40
 
     try:
         # Make the POST request to create ticket
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/tickets",
             json=ticket_data,
             headers=headers
@@ -1463,7 +2855,7 @@ def start_ticket(ticket_id):
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/1/tickets/{ticket_id}/start",
             headers=headers
         )
@@ -1498,7 +2890,7 @@ def pause_ticket(ticket_id):
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/1/tickets/{ticket_id}/pause",
             headers=headers
         )
@@ -1537,7 +2929,7 @@ def link_truck_to_device(truck_id):
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/device/force-link",
             headers=headers,
             json=payload
@@ -1545,6 +2937,10 @@ def link_truck_to_device(truck_id):
 
         if response.status_code in [200, 201]:
             print(f"✅ Linked truck {truck_id} to device")
+            # Linking changes the fleet listing and the truck's regions
+            lookup_cache.invalidate("trucks")
+            lookup_cache.invalidate(f"truck_regions:{truck_id}")
+            lookup_cache.invalidate("truck_regions:all")
             return True
         else:
             print(f"❌ Failed to link truck {truck_id}. Status: {response.status_code}, Response: {response.text}")
@@ -1554,48 +2950,33 @@ def link_truck_to_device(truck_id):
         return False
 
 
-def sync_device_action(action_type, ticket_id, jo_line_item_id, truck_id, latitude=None, longitude=None, quantity=None, additional_quantity=None, event_timestamp=None, external_ref=None):
+def build_device_action(action_type, ticket_id, jo_line_item_id, truck_id, latitude=None, longitude=None, quantity=None, additional_quantity=None, event_timestamp=None, external_ref=None, clock=None, local_id=None):
     """
-    Sync a device action using the /api/2/device/sync endpoint
-
-    Action types:
-    - ticketOpened: Open a ticket
-    - PickupCompleted: Mark pickup as completed
-    - DropOffCompleted: Mark dropoff as completed
-    - ticketClosed: Close a ticket
-    - jobStarted: Start job timer
-    - jobPaused: Pause job timer
-    - jobResumed: Resume job timer
+    Build one entry of the device sync "actions" array
 
     Args:
         action_type: The action type (e.g., "ticketOpened", "PickupCompleted")
-        ticket_id: ID of the ticket
-        jo_line_item_id: Job order line item ID (poLineItem.id from job order response)
+        ticket_id: ID of the ticket (ignored for ticketOpened)
+        jo_line_item_id: Job order line item ID
         truck_id: Truck ID
         latitude: Optional latitude for the event
         longitude: Optional longitude for the event
         quantity: Optional quantity (tonnage for tonnage-based jobs)
         additional_quantity: Optional additional quantity (tonnage for hourly jobs)
         event_timestamp: Optional ISO format timestamp for backdating (defaults to now)
-        external_ref: Optional external ticket number/reference (user-provided ticket number)
+        external_ref: Optional external ticket number/reference
+        clock: Optional SimulationClock used when event_timestamp is not given
+        local_id: Optional localId (defaults to "<action>_<epoch>_<truck>")
 
     Returns:
-        tuple: (success: bool, response_data: list or None)
+        dict: Action item for the sync payload
     """
-    if not AUTH_TOKEN:
-        print("No auth token available.")
-        return False
-
-    headers = {
-        "Authorization": f"Token {AUTH_TOKEN}",
-        "Content-Type": "application/json"
-    }
-
-    # Build the action payload
     # For ticketOpened, we use localId instead of ticketId (ticket doesn't exist yet)
     # For other actions, we use ticketId (ticket already exists)
-    timestamp_for_action = event_timestamp or datetime.now(timezone.utc).isoformat()
-    local_id = f"{action_type}_{int(datetime.now(timezone.utc).timestamp())}_{truck_id}"
+    now = clock.now() if clock else datetime.now(timezone.utc)
+    timestamp_for_action = event_timestamp or now.isoformat()
+    if local_id is None:
+        local_id = f"{action_type}_{int(now.timestamp())}_{truck_id}"
 
     action_data = {
         "actionType": action_type,
@@ -1635,33 +3016,126 @@ def sync_device_action(action_type, ticket_id, jo_line_item_id, truck_id, latitu
     if external_ref is not None:
         action_data["externalRef"] = external_ref
 
-    sync_payload = {
-        "actions": [action_data],
-        "coordinates": []
-    }
+    return action_data
 
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/2/device/sync",
-            headers=headers,
-            json=sync_payload
-        )
 
-        if response.status_code in [200, 201]:
-            # Parse response to get ticket ID mappings (for ticketOpened actions)
-            try:
-                response_data = response.json()
+def post_device_sync(actions, coordinates, description="device sync"):
+    """
+    POST one payload to /api/2/device/sync
+
+    Args:
+        actions: List of action items (see build_device_action)
+        coordinates: List of coordinate items (see _build_coordinate_item)
+        description: Text used in error messages
+
+    Returns:
+        tuple: (success: bool, response_data: list or None)
+    """
+    headers = {
+        "Authorization": f"Token {AUTH_TOKEN}",
+        "Content-Type": "application/json"
+    }
+
+    sync_payload = {
+        "actions": actions,
+        "coordinates": coordinates
+    }
+
+    try:
+        response = api_client.post(
+            f"{API_BASE_URL}/api/2/device/sync",
+            headers=headers,
+            json=sync_payload
+        )
+
+        if response.status_code in [200, 201]:
+            # Parse response to get ticket ID mappings (for ticketOpened actions)
+            try:
+                response_data = response.json()
                 return True, response_data.get("data", [])
             except:
                 return True, []
         else:
-            print(f"❌ Failed to sync {action_type} for ticket {ticket_id}. Status: {response.status_code}, Response: {response.text}")
+            print(f"❌ Failed to sync {description}. Status: {response.status_code}, Response: {response.text}")
             return False, None
     except Exception as e:
-        print(f"❌ Error syncing {action_type} for ticket {ticket_id}: {e}")
+        print(f"❌ Error syncing {description}: {e}")
         return False, None
 
 
+def sync_device_action(action_type, ticket_id, jo_line_item_id, truck_id, latitude=None, longitude=None, quantity=None, additional_quantity=None, event_timestamp=None, external_ref=None):
+    """
+    Sync a device action using the /api/2/device/sync endpoint
+
+    Action types:
+    - ticketOpened: Open a ticket
+    - PickupCompleted: Mark pickup as completed
+    - DropOffCompleted: Mark dropoff as completed
+    - ticketClosed: Close a ticket
+    - jobStarted: Start job timer
+    - jobPaused: Pause job timer
+    - jobResumed: Resume job timer
+
+    Args:
+        action_type: The action type (e.g., "ticketOpened", "PickupCompleted")
+        ticket_id: ID of the ticket
+        jo_line_item_id: Job order line item ID (poLineItem.id from job order response)
+        truck_id: Truck ID
+        latitude: Optional latitude for the event
+        longitude: Optional longitude for the event
+        quantity: Optional quantity (tonnage for tonnage-based jobs)
+        additional_quantity: Optional additional quantity (tonnage for hourly jobs)
+        event_timestamp: Optional ISO format timestamp for backdating (defaults to now)
+        external_ref: Optional external ticket number/reference (user-provided ticket number)
+
+    Returns:
+        tuple: (success: bool, response_data: list or None)
+    """
+    if not AUTH_TOKEN:
+        print("No auth token available.")
+        return False
+
+    action_data = build_device_action(action_type, ticket_id, jo_line_item_id, truck_id, latitude, longitude,
+                                      quantity=quantity, additional_quantity=additional_quantity,
+                                      event_timestamp=event_timestamp, external_ref=external_ref)
+
+    return post_device_sync([action_data], [], description=f"{action_type} for ticket {ticket_id}")
+
+
+def _build_coordinate_item(truck_id, ticket_id, coord, jo_line_item_id=None, clock=None):
+    """
+    Build one entry of the device sync "coordinates" array
+
+    Args:
+        truck_id: Truck ID
+        ticket_id: Ticket ID to associate the coordinate with
+        coord: Coordinate dict with keys: latitude, longitude, event_timestamp, speed, heading
+        jo_line_item_id: Optional JO line item ID for geofence event processing
+        clock: Optional SimulationClock used when the point has no event_timestamp
+
+    Returns:
+        dict: Coordinate item for the sync payload
+    """
+    heading_value = coord.get("heading", 0)
+    event_timestamp = coord.get("event_timestamp")
+    if event_timestamp is None:
+        event_timestamp = (clock.now() if clock else datetime.now(timezone.utc)).isoformat()
+    coord_item = {
+        "latitude": coord["latitude"],
+        "longitude": coord["longitude"],
+        "eventTimestamp": event_timestamp,
+        "currentTicketId": ticket_id,
+        "truckId": truck_id,  # Important for geofence event processing
+        "speed": coord.get("speed", 0),
+        "bearing": heading_value,  # Device sync requires both bearing and heading
+        "heading": heading_value   # Keep heading as well
+    }
+    # Add optional fields if provided
+    if jo_line_item_id:
+        coord_item["currentJoliId"] = jo_line_item_id  # JO line item ID for geofence processing
+    return coord_item
+
+
 def send_gps_coordinates_batch(truck_id, ticket_id, coordinates_list, jo_line_item_id=None):
     """
     Send a batch of GPS coordinates via device sync
@@ -1685,23 +3159,10 @@ def send_gps_coordinates_batch(truck_id, ticket_id, coordinates_list, jo_line_it
     }
 
     # Build coordinates array for device sync
-    coordinates_payload = []
-    for coord in coordinates_list:
-        heading_value = coord.get("heading", 0)
-        coord_item = {
-            "latitude": coord["latitude"],
-            "longitude": coord["longitude"],
-            "eventTimestamp": coord.get("event_timestamp", datetime.now(timezone.utc).isoformat()),
-            "currentTicketId": ticket_id,
-            "truckId": truck_id,  # Important for geofence event processing
-            "speed": coord.get("speed", 0),
-            "bearing": heading_value,  # Device sync requires both bearing and heading
-            "heading": heading_value   # Keep heading as well
-        }
-        # Add optional fields if provided
-        if jo_line_item_id:
-            coord_item["currentJoliId"] = jo_line_item_id  # JO line item ID for geofence processing
-        coordinates_payload.append(coord_item)
+    coordinates_payload = [
+        _build_coordinate_item(truck_id, ticket_id, coord, jo_line_item_id)
+        for coord in coordinates_list
+    ]
 
     sync_payload = {
         "actions": [],
@@ -1709,7 +3170,7 @@ def send_gps_coordinates_batch(truck_id, ticket_id, coordinates_list, jo_line_it
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/device/sync",
             headers=headers,
             json=sync_payload
@@ -1730,6 +3191,149 @@ def send_gps_coordinates_batch(truck_id, ticket_id, coordinates_list, jo_line_it
         return False
 
 
+# Largest number of coordinates sent in a single /api/2/device/sync request
+DEVICE_SYNC_MAX_COORDINATES = int(os.environ.get("TRUCKSIM_DEVICE_SYNC_MAX_COORDINATES", "500"))
+
+
+def _event_time(item):
+    """Sort key for device sync items: their eventTimestamp as an aware datetime"""
+    event_time = datetime.fromisoformat(item["eventTimestamp"])
+    if event_time.tzinfo is None:
+        event_time = event_time.replace(tzinfo=timezone.utc)
+    return event_time
+
+
+class GPSCoalescer:
+    """
+    Per-truck GPS uploader that coalesces coordinates into large device sync batches
+
+    Coordinates are buffered (each keeps its own ticket ID) and sent when the
+    buffer reaches max_coordinates, or before a lifecycle action so the server
+    always sees the GPS trail ahead of PickupCompleted/DropOffCompleted/ticketClosed.
+    """
+
+    def __init__(self, truck_id, jo_line_item_id=None, max_coordinates=DEVICE_SYNC_MAX_COORDINATES, clock=None):
+        self.truck_id = truck_id
+        self.jo_line_item_id = jo_line_item_id
+        self.max_coordinates = max(1, max_coordinates)
+        self.clock = clock
+        self.buffer = []
+        self.requests_sent = 0
+        self.coordinates_sent = 0
+        self.failed = 0
+
+    def add(self, ticket_id, coordinates_list):
+        """Queue coordinates for ticket_id, flushing once a full batch is buffered"""
+        for coord in coordinates_list:
+            self.buffer.append(_build_coordinate_item(self.truck_id, ticket_id, coord, self.jo_line_item_id, self.clock))
+        if len(self.buffer) >= self.max_coordinates:
+            self.flush()
+
+    def flush(self):
+        """Send everything buffered. Returns (success, response_data) like sync_device_action"""
+        batch, self.buffer = self.buffer, []
+        success, response_data = True, []
+        for start in range(0, len(batch), self.max_coordinates):
+            ok, response_data = self._send([], batch[start:start + self.max_coordinates])
+            success = success and ok
+        return success, response_data
+
+    def sync_action(self, action_type, ticket_id, *args, **kwargs):
+        """Flush buffered GPS, then send a lifecycle action via sync_device_action"""
+        self.flush()
+        return sync_device_action(action_type, ticket_id, self.jo_line_item_id, self.truck_id, *args, **kwargs)
+
+    def _send(self, actions, coordinates):
+        description = f"{len(actions)} action(s) and {len(coordinates)} GPS coordinates for truck {self.truck_id}"
+        success, response_data = post_device_sync(actions, coordinates, description=description)
+        self.requests_sent += 1
+        if success:
+            self.coordinates_sent += len(coordinates)
+        else:
+            self.failed += len(actions) + len(coordinates)
+        return success, response_data
+
+
+class DeviceSyncSession(GPSCoalescer):
+    """
+    Device sync session for one truck that sends queued actions and coordinates together
+
+    Works the way a phone syncs after reconnecting: everything queued since the
+    last flush goes out in a single /api/2/device/sync payload with both arrays
+    in eventTimestamp order. The localId -> ticketId mappings returned by the
+    server are collected in ticket_ids.
+    """
+
+    def __init__(self, truck_id, jo_line_item_id=None, max_coordinates=DEVICE_SYNC_MAX_COORDINATES, clock=None):
+        super().__init__(truck_id, jo_line_item_id, max_coordinates, clock)
+        self.actions = []
+        self.ticket_ids = {}
+        self.actions_sent = 0
+        self._sequence = 0
+
+    def queue_action(self, action_type, ticket_id, latitude=None, longitude=None, **kwargs):
+        """
+        Queue a lifecycle action for the next flush
+
+        Args:
+            action_type: The action type (e.g., "ticketOpened", "PickupCompleted")
+            ticket_id: ID of the ticket (None for ticketOpened)
+            latitude: Optional latitude for the event
+            longitude: Optional longitude for the event
+            **kwargs: quantity, additional_quantity, event_timestamp, external_ref
+
+        Returns:
+            str: The action's localId, used to look up ticket_ids after a flush
+        """
+        self._sequence += 1
+        kwargs.setdefault("clock", self.clock)
+        # Stamp the localId with the event's own (simulated) time, not the send time
+        event_timestamp = kwargs.get("event_timestamp")
+        if event_timestamp:
+            event_time = datetime.fromisoformat(event_timestamp)
+        else:
+            event_time = self.clock.now() if self.clock else datetime.now(timezone.utc)
+        local_id = f"{action_type}_{int(event_time.timestamp())}_{self.truck_id}_{self._sequence}"
+        self.actions.append(build_device_action(action_type, ticket_id, self.jo_line_item_id, self.truck_id,
+                                                latitude, longitude, local_id=local_id, **kwargs))
+        return local_id
+
+    def flush(self):
+        """
+        Send queued actions and coordinates in one chronologically ordered payload
+
+        If more than max_coordinates are queued, the oldest coordinates go out
+        first in GPS-only requests and the last request carries the actions.
+
+        Returns:
+            tuple: (success: bool, response_data: list or None)
+        """
+        if not self.actions and not self.buffer:
+            return True, []
+
+        actions, self.actions = sorted(self.actions, key=_event_time), []
+        coordinates, self.buffer = sorted(self.buffer, key=_event_time), []
+
+        success = True
+        while len(coordinates) > self.max_coordinates:
+            ok, _ = self._send([], coordinates[:self.max_coordinates])
+            success = success and ok
+            coordinates = coordinates[self.max_coordinates:]
+
+        ok, response_data = self._send(actions, coordinates)
+        if ok:
+            self.actions_sent += len(actions)
+            for mapping in response_data or []:
+                if isinstance(mapping, dict) and mapping.get("localId") is not None:
+                    self.ticket_ids[mapping["localId"]] = mapping.get("ticketId")
+        return success and ok, response_data
+
+    def sync_action(self, action_type, ticket_id, *args, **kwargs):
+        """Queue an action and flush it together with any buffered GPS"""
+        self.queue_action(action_type, ticket_id, *args, **kwargs)
+        return self.flush()
+
+
 def get_jo_line_items(job_order_id):
     """
     Get JOLineItems for a job order using /api/2/job-orders/{id}/items endpoint
@@ -1753,7 +3357,7 @@ def get_jo_line_items(job_order_id):
     }
 
     try:
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/api/2/job-orders/{job_order_id}/items",
             headers=headers
         )
@@ -1777,95 +3381,177 @@ def get_jo_line_items(job_order_id):
         return []
 
 
-def close_prior_day_jobs():
-    """
-    Close all active or not started job orders from prior days.
-    This should be called at the start of the script to clean up old jobs.
+# Prior-day cleanup: job orders are listed page by page and closed on a
+# bounded thread pool, rate limited to CLOSE_JOBS_RATE closes per second (0 = unlimited)
+JOB_ORDER_PAGE_SIZE = int(os.environ.get("TRUCKSIM_JOB_ORDER_PAGE_SIZE", "200"))
+# Upper bound on job order listing pages, in case a backend ignores page/perPage
+JOB_ORDER_MAX_PAGES = int(os.environ.get("TRUCKSIM_JOB_ORDER_MAX_PAGES", "500"))
+CLOSE_JOBS_WORKERS = int(os.environ.get("TRUCKSIM_CLOSE_JOBS_WORKERS", "8"))
+CLOSE_JOBS_RATE = float(os.environ.get("TRUCKSIM_CLOSE_JOBS_RATE", "10"))
 
-    Returns:
-        int: Number of jobs closed
+
+class RateLimiter:
+    """Thread-safe limiter that spaces acquire() calls at most `rate` per second apart"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the next slot is free"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def iter_job_order_pages(start_date, end_date, page_size=JOB_ORDER_PAGE_SIZE, max_pages=JOB_ORDER_MAX_PAGES):
     """
-    if not AUTH_TOKEN:
-        print("No auth token available for closing prior day jobs.")
-        return 0
+    Yield job orders for the company page by page
+
+    Stops on a short page, on a page holding only job orders already seen
+    (a backend ignoring the paging parameters) or after max_pages pages.
 
+    Args:
+        start_date: First day to include (YYYY-MM-DD)
+        end_date: Last day to include (YYYY-MM-DD)
+        page_size: Job orders requested per page
+        max_pages: Most pages to request
+
+    Yields:
+        list: Job orders on each page not seen on an earlier page
+    """
     headers = {
         "Authorization": f"Token {AUTH_TOKEN}",
         "Content-Type": "application/json"
     }
 
-    # Get current date at midnight (start of today)
-    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # Set date range to get ALL job orders (backend defaults to today-only if not specified)
-    # Go back 90 days to capture all recent job orders
-    start_date = (today_start - timedelta(days=90)).strftime("%Y-%m-%d")
-    end_date = today_start.strftime("%Y-%m-%d")
-
-    try:
-        # Fetch all job orders for the company with explicit date range
+    seen_ids = set()
+    page = 1
+    while page <= max_pages:
         # Must use startDate/endDate or backend will default to today-only
-        response = requests.get(
+        response = api_client.get(
             f"{API_BASE_URL}/api/2/job-orders",
             params={
                 "company": COMPANY_ID,
                 "startDate": start_date,
                 "endDate": end_date,
-                "perPage": 1000  # Large number to ensure we get all results
+                "page": page,
+                "perPage": page_size
             },
             headers=headers
         )
 
         if response.status_code != 200:
-            print(f"❌ Failed to fetch job orders. Status: {response.status_code}")
-            return 0
+            print(f"❌ Failed to fetch job orders (page {page}). Status: {response.status_code}")
+            return
 
         job_orders = response.json().get("data", [])
+        new_job_orders = [job for job in job_orders if job.get("id") not in seen_ids]
+        if job_orders and not new_job_orders:
+            print(f"⚠️ Job order page {page} repeats earlier job orders; assuming the backend ignores paging")
+            return
+        seen_ids.update(job.get("id") for job in new_job_orders)
+        yield new_job_orders
+        if len(job_orders) < page_size:
+            return
+        page += 1
 
-        if not job_orders:
-            print("✅ No job orders found.")
-            return 0
+    print(f"⚠️ Stopped listing job orders after {max_pages} page(s) (TRUCKSIM_JOB_ORDER_MAX_PAGES)")
+
+
+def close_prior_day_jobs(workers=CLOSE_JOBS_WORKERS, rate=CLOSE_JOBS_RATE):
+    """
+    Close all active or not started job orders from prior days.
+    This should be called at the start of the script to clean up old jobs.
 
-        print(f"📋 Found {len(job_orders)} total job order(s) for company {COMPANY_ID}")
+    Pages of job orders are streamed in and each unclosed job is handed to a
+    worker pool as soon as its page arrives, so closing overlaps with listing.
 
-        # Filter for jobs that are not closed
-        # Note: The backend doesn't return createdAt in the list response, so we can't filter by date
-        # Since we're querying with a date range of last 90 days, all these jobs are old enough to close
-        jobs_to_close = []
-        for job in job_orders:
-            job_id = job.get("id")
-            status = job.get("status")
-            closed = job.get("closed", False)
-            job_name = job.get("name", "Unknown")
+    Args:
+        workers: Number of concurrent close requests
+        rate: Maximum close requests per second (0 = unlimited)
 
-            # Skip jobs that are already closed
-            if closed:
-                continue
+    Returns:
+        int: Number of jobs closed
+    """
+    if not AUTH_TOKEN:
+        print("No auth token available for closing prior day jobs.")
+        return 0
 
-            # Close all non-closed jobs (they're from the 90-day lookback window, so they're old)
-            jobs_to_close.append(job)
+    # Get current date at midnight (start of today)
+    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
 
-        if not jobs_to_close:
-            print("✅ No unclosed job orders found.")
-            return 0
+    # Set date range to get ALL job orders (backend defaults to today-only if not specified)
+    # Go back 90 days to capture all recent job orders
+    start_date = (today_start - timedelta(days=90)).strftime("%Y-%m-%d")
+    end_date = today_start.strftime("%Y-%m-%d")
 
-        print(f"\n🧹 Found {len(jobs_to_close)} job order(s) to close...")
+    limiter = RateLimiter(rate)
 
-        # Close each job
-        closed_count = 0
-        for job in jobs_to_close:
-            job_id = job.get("id")
-            job_name = job.get("name", "Unknown")
-            status = job.get("status")
+    def close_job(job):
+        job_id = job.get("id")
+        print(f"  Closing job order {job_id} ('{job.get('name', 'Unknown')}', status: {job.get('status')})...")
+        limiter.acquire()
+        return close_job_order(job_id)
 
-            print(f"  Closing job order {job_id} ('{job_name}', status: {status})...")
+    started = time.monotonic()
+    total_jobs = 0
+    futures = {}
+    seen_ids = set()
 
-            if close_job_order(job_id):
-                closed_count += 1
-            else:
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for job_orders in iter_job_order_pages(start_date, end_date):
+                total_jobs += len(job_orders)
+
+                # Note: The backend doesn't return createdAt in the list response, so we can't filter by date
+                # Since we're querying with a date range of last 90 days, all non-closed jobs are old enough to close
+                for job in job_orders:
+                    job_id = job.get("id")
+                    if job.get("closed", False) or job_id in seen_ids:
+                        continue
+                    seen_ids.add(job_id)
+                    futures[executor.submit(tracer.bind(close_job), job)] = job_id
+
+            if not total_jobs:
+                print("✅ No job orders found.")
+                return 0
+
+            print(f"📋 Found {total_jobs} total job order(s) for company {COMPANY_ID}")
+
+            if not futures:
+                print("✅ No unclosed job orders found.")
+                return 0
+
+            print(f"\n🧹 Closing {len(futures)} job order(s) with {workers} worker(s)...")
+
+            closed_count = 0
+            failed_ids = []
+            for future, job_id in futures.items():
+                try:
+                    if future.result():
+                        closed_count += 1
+                        continue
+                except Exception as e:
+                    print(f"  ⚠️ Error closing job order {job_id}: {e}")
+                failed_ids.append(job_id)
                 print(f"  ⚠️ Failed to close job order {job_id}")
 
-        print(f"✅ Successfully closed {closed_count} of {len(jobs_to_close)} job order(s)\n")
+        elapsed = time.monotonic() - started
+        throughput = len(futures) / elapsed if elapsed > 0 else 0.0
+        print(f"✅ Successfully closed {closed_count} of {len(futures)} job order(s) "
+              f"in {elapsed:.1f}s ({throughput:.1f} jobs/s)")
+        if failed_ids:
+            shown = ", ".join(str(job_id) for job_id in failed_ids[:10])
+            more = f" (+{len(failed_ids) - 10} more)" if len(failed_ids) > 10 else ""
+            print(f"⚠️ {len(failed_ids)} job order(s) failed to close: {shown}{more}")
+        print()
         return closed_count
 
     except Exception as e:
@@ -1893,7 +3579,7 @@ def close_job_order(job_order_id):
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/1/job-orders/{job_order_id}/close",
             headers=headers
         )
@@ -1972,7 +3658,7 @@ def close_ticket(ticket_id, quantity=None, latitude=None, longitude=None, messag
 
     try:
         # Make the POST request to close ticket
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/tickets/{ticket_id}/close",
             json=close_data,
             headers=headers
@@ -2000,11 +3686,12 @@ def create_air_ticket_lite(truck_id, truck_name, job_order_id=None, pickup_locat
         print("No auth token available. Please authenticate first.")
         return None, None
 
-    import os
     from http.client import IncompleteRead
 
-    image_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "image.jpg")
-    if not os.path.exists(image_path) or os.path.getsize(image_path) == 0:
+    # OCR gets the full-resolution image; the ticket photo uses the upload variant
+    ocr_image = get_air_ticket_image(variant=False)
+    ticket_image = get_air_ticket_image()
+    if not ocr_image or not ticket_image:
         print("❌ Image not found or empty. Skipping air ticket creation.")
         return None, None
 
@@ -2015,26 +3702,25 @@ def create_air_ticket_lite(truck_id, truck_name, job_order_id=None, pickup_locat
     # Step 1: Upload the image for data extraction (for ticket_num, payload, supplier)
     extracted_data = {}
     try:
-        with open(image_path, "rb") as image_file:
-            files = {
-                "files": ("image.jpg", image_file, "image/jpeg")
-            }
-            data = {
-                "jobId": str(job_order_id or 0),
-                "driverId": str(0),
-                "truckId": str(truck_id),
-                "longitude": "0.0",
-                "latitude": "0.0",
-                "Content-Type": "image/jpeg"
-            }
+        files = {
+            "files": ("image.jpg", ocr_image.data, "image/jpeg")
+        }
+        data = {
+            "jobId": str(job_order_id or 0),
+            "driverId": str(0),
+            "truckId": str(truck_id),
+            "longitude": "0.0",
+            "latitude": "0.0",
+            "Content-Type": "image/jpeg"
+        }
 
-            upload_response = requests.post(
-                "https://tptest.truckit.com/uploadImage",
-                data=data,
-                files=files,
-                headers=headers,
-                timeout=30
-            )
+        upload_response = api_client.post(
+            OCR_UPLOAD_URL,
+            data=data,
+            files=files,
+            headers=headers,
+            timeout=30
+        )
 
         if upload_response.status_code == 200:
             result = upload_response.json()
@@ -2091,18 +3777,17 @@ def create_air_ticket_lite(truck_id, truck_name, job_order_id=None, pickup_locat
     air_ticket_id = None
     air_ticket_response = None
     try:
-        with open(image_path, "rb") as image_file:
-            files = {
-                "photo": ("ATP-LITE-TICKET.jpeg", image_file, "image/jpeg")
-            }
+        files = {
+            "photo": ("ATP-LITE-TICKET.jpeg", ticket_image.data, "image/jpeg")
+        }
 
-            response = requests.post(
-                f"{API_BASE_URL}/api/2/companies/{COMPANY_ID}/atp-air-tickets-lite",
-                data=data,
-                files=files,
-                headers=headers,
-                timeout=30
-            )
+        response = api_client.post(
+            f"{API_BASE_URL}/api/2/companies/{COMPANY_ID}/atp-air-tickets-lite",
+            data=data,
+            files=files,
+            headers=headers,
+            timeout=30
+        )
 
         if response.status_code in [200, 201]:
             air_ticket_response = response.json()
@@ -2130,7 +3815,7 @@ def create_air_ticket_lite(truck_id, truck_name, job_order_id=None, pickup_locat
             "isDuplicate": False
         }
 
-        patch_response = requests.patch(
+        patch_response = api_client.patch(
             f"{API_BASE_URL}/api/2/atp-air-tickets-lite/{air_ticket_id}",
             headers={
                 "Authorization": f"Token {AUTH_TOKEN}",
@@ -2189,7 +3874,7 @@ def issue_ticket_via_web_api(jo_line_item_id, truck_id, dropoff_location_id=None
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/tickets",
             json=payload,
             headers=headers
@@ -2233,7 +3918,7 @@ def close_ticket_via_web_api(ticket_id, weight=None, coordinates=None):
     }
 
     try:
-        response = requests.post(
+        response = api_client.post(
             f"{API_BASE_URL}/api/2/tickets/{ticket_id}/close",
             json=payload,
             headers=headers
@@ -2269,17 +3954,17 @@ def create_tickets_for_job_order(job_order_id, job_order_data, jo_line_item_id=N
         ticket_open_timestamp (str, optional): ISO timestamp for when tickets should be opened (defaults to now)
 
     Returns:
-        list: List of created ticket IDs
+        tuple: (created ticket IDs, JOLineItem ID, job UOM); ([], None, None) on failure
     """
     if not job_order_id:
         print("No job order ID provided. Cannot create tickets.")
-        return []
+        return [], None, None
 
     # Get JOLineItems for this job order (these are the actual JOLineItem IDs, not POLineItem IDs)
     jo_line_items = get_jo_line_items(job_order_id)
     if not jo_line_items:
         print("❌ CRITICAL: No JOLineItems found for job order. Cannot create tickets.")
-        return []
+        return [], None, None
 
     # For direct assignment jobs, there should be one JOLineItem with all trucks assigned
     jo_line_item = jo_line_items[0]
@@ -2321,7 +4006,7 @@ def create_tickets_for_job_order(job_order_id, job_order_data, jo_line_item_id=N
 
     if not assigned_truck_ids:
         print("❌ CRITICAL: No trucks assigned to this JOLineItem. Cannot create tickets.")
-        return []
+        return [], None, None
 
     # Filter TRUCKS to only include trucks assigned to this job
     job_trucks = [truck for truck in TRUCKS if truck['id'] in assigned_truck_ids]
@@ -2454,7 +4139,7 @@ def create_air_tickets_for_trucks(job_order_id=None, pickup_site_id=None):
             created_air_tickets.append(air_ticket_id)
             print(f"✅ Air ticket created successfully for {truck['device_name']}!")
             # Upload ATP photo to air ticket
-            upload_air_ticket_photo(air_ticket_id, "atp", "ATP air ticket photo")
+            photo_upload_queue.submit_air_ticket_photo(air_ticket_id, "atp", "ATP air ticket photo")
         else:
             print(f"❌ All attempts failed for {truck['device_name']}")
 
@@ -2473,8 +4158,8 @@ def create_air_tickets_for_trucks(job_order_id=None, pickup_site_id=None):
     return created_air_tickets
 
 
-def create_idle_time_alerts(job_order_id, truck_regions):
-    """Create idle time alerts in OpenSearch for each truck"""
+def create_idle_time_alerts(job_order_id, region_index):
+    """Create idle time alerts in OpenSearch for each truck (regions resolved via a TruckRegionIndex)"""
 
     if not job_order_id:
         print("No job order ID provided. Skipping alert creation.")
@@ -2482,10 +4167,7 @@ def create_idle_time_alerts(job_order_id, truck_regions):
 
     # Create alerts for each truck
     for truck in TRUCKS:
-        region_id = truck_regions.get(truck["id"])
-        if region_id is None:  # Check for None specifically, since 0 is a valid region ID
-            print(f"No region found for truck {truck['device_name']} (ID: {truck['id']}). Using default region.")
-            region_id = next((r_id for r_id in truck_regions.values() if r_id is not None), 0)
+        region_id = region_index.region_for(truck)
 
         doc = {
             "datetime": datetime.now(timezone.utc).strftime(DATETIME_FORMAT),
@@ -2500,21 +4182,17 @@ def create_idle_time_alerts(job_order_id, truck_regions):
             "user_company_id": COMPANY_ID,
         }
 
-        try:
-            # Index the document
-            response = es_client.index(index="anomaly_alert_event_index", body=doc)
-            print(f"Successfully indexed alert for {truck['device_name']}")
-        except Exception as e:
-            print(f"Error indexing alert for {truck['device_name']}: {e}")
+        # Queue the document for bulk indexing
+        es_bulk_writer.add("anomaly_alert_event_index", doc)
+        print(f"Queued alert for {truck['device_name']}")
 
 
-def create_truck_activity_events(job_order_id, truck_regions, regions_data, trucks_list=None):
+def create_truck_activity_events(job_order_id, region_index, trucks_list=None):
     """Create truck activity events in OpenSearch for the trucks assigned to the job order
 
     Args:
         job_order_id: The job order ID
-        truck_regions: Dict mapping truck IDs to region IDs
-        regions_data: List of region data dicts
+        region_index: TruckRegionIndex with truck -> region and region -> name lookups
         trucks_list: Optional list of specific trucks to create events for (defaults to TRUCKS)
     """
 
@@ -2526,27 +4204,16 @@ def create_truck_activity_events(job_order_id, truck_regions, regions_data, truc
     if trucks_list is None:
         trucks_list = TRUCKS
 
-    # Get region names mapping
-    region_names = {}
-    for region in regions_data:
-        region_names[region.get("id")] = region.get("name")
-
     # Current time for base calculations
     now = datetime.now(timezone.utc)
 
     # Create activity for each truck
     for truck in trucks_list:
         # Get the region ID for this truck
-        region_id = truck_regions.get(truck["id"])
-        if region_id is None:  # Check for None specifically, since 0 is a valid region ID
-            print(f"No region found for truck {truck['device_name']} (ID: {truck['id']}). Using default region.")
-            region_id = next((r_id for r_id in truck_regions.values() if r_id is not None), 0)
-            if region_id is None:
-                print(f"No default region available. Skipping events for truck {truck['device_name']}.")
-                continue
+        region_id = region_index.region_for(truck)
 
         # Get region name
-        region_name = region_names.get(region_id, f"Region_{region_id}")
+        region_name = region_index.region_name(region_id)
 
         # Encode region name in the format expected by the system
         encoded_region = encode_region_name(region_name, COMPANY_ID)
@@ -2590,18 +4257,10 @@ def create_truck_activity_events(job_order_id, truck_regions, regions_data, truc
         }
 
         # Use the first available dropoff region ID (if different from pickup)
-        dropoff_region_id = None
-        for r_id in truck_regions.values():
-            if r_id is not None and r_id != region_id:  # Check for None specifically
-                dropoff_region_id = r_id
-                break
-
-        # If no different region found, use the pickup region
-        if not dropoff_region_id:
-            dropoff_region_id = region_id
+        dropoff_region_id = region_index.dropoff_region_for(region_id)
 
         # Get dropoff region name and encode it
-        dropoff_region_name = region_names.get(dropoff_region_id, f"Region_{dropoff_region_id}")
+        dropoff_region_name = region_index.region_name(dropoff_region_id)
         encoded_dropoff_region = encode_region_name(dropoff_region_name, COMPANY_ID)
 
         # Create events for dropoff location
@@ -2640,21 +4299,128 @@ def create_truck_activity_events(job_order_id, truck_regions, regions_data, truc
         ]
 
         for idx, event in enumerate(truck_events):
-            try:
-                response = es_client.index(
-                    index="location_event_index",  # The index for location events
-                    body=event
-                )
-                event_type = "ENTERED" if idx % 2 == 0 else "LEFT"
-                location_type = "pickup" if idx < 2 else "dropoff"
-                print(f"Indexed {event_type} event at {location_type} for truck {truck['device_name']}")
-            except Exception as e:
-                print(f"Error indexing event: {e}")
+            es_bulk_writer.add("location_event_index", event)  # The index for location events
+            event_type = "ENTERED" if idx % 2 == 0 else "LEFT"
+            location_type = "pickup" if idx < 2 else "dropoff"
+            print(f"Queued {event_type} event at {location_type} for truck {truck['device_name']}")
 
     print(f"Created truck activity events for job order {job_order_id}")
 
 
-def generate_route_coordinates(start_coords, end_coords, num_points=20):
+# Shared NumPy random generator for the vectorized path/sensor kernels
+_np_rng = np.random.default_rng()
+
+# Bow direction for generate_varied_gps_path, indexed by variation_index:
+# 0 = slight northern bow, 1 = southern, 2 = eastern, 3 = western.
+# Any other index is a zigzag that alternates +/- 0.2 on both axes.
+_PATH_BOW_LAT_FACTORS = np.array([0.3, -0.4, 0.0, 0.0])
+_PATH_BOW_LNG_FACTORS = np.array([0.0, 0.0, 0.5, -0.4])
+
+
+def _progress_array(num_points):
+    """Progress (0 to 1) for each of num_points points along a path"""
+    if num_points > 1:
+        return np.arange(num_points) / (num_points - 1)
+    return np.zeros(num_points)
+
+
+def generate_route_arrays(start_coords, end_coords, num_points=20, num_trucks=1, now=None, rng=None):
+    """
+    Vectorized generate_route_coordinates for many trucks at once.
+
+    Args:
+        start_coords (dict): Starting coordinates with 'lat' and 'lng' keys
+        end_coords (dict): Ending coordinates with 'lat' and 'lng' keys
+        num_points (int): Number of points per truck
+        num_trucks (int): Number of independent routes to generate
+        now (datetime, optional): Reference time the journeys end at (defaults to now)
+        rng (numpy.random.Generator, optional): Random generator to draw from
+
+    Returns:
+        dict: 'lat', 'lng', 'timestamp' (UTC epoch seconds) and 'progress' arrays of
+              shape (num_trucks, num_points), each row sorted chronologically
+    """
+    rng = rng or _np_rng
+    now = now or datetime.now(timezone.utc)
+    shape = (num_trucks, num_points)
+
+    progress = np.broadcast_to(_progress_array(num_points), shape)
+
+    # GPS drift of 3-5 meters, plus a curve on interior points (trucks don't travel in straight lines)
+    lat_variance = rng.uniform(-0.00005, 0.00005, shape)
+    lng_variance = rng.uniform(-0.00005, 0.00005, shape)
+    interior = np.zeros(num_points, dtype=bool)
+    interior[1:-1] = True  # Don't vary the start and end points
+    curve_factor = np.sin(progress * np.pi) * 0.001 * interior
+    lat_variance += curve_factor * rng.uniform(-1, 1, shape)
+    lng_variance += curve_factor * rng.uniform(-1, 1, shape)
+
+    lat = np.round(start_coords['lat'] + (end_coords['lat'] - start_coords['lat']) * progress + lat_variance, 6)
+    lng = np.round(start_coords['lng'] + (end_coords['lng'] - start_coords['lng']) * progress + lng_variance, 6)
+
+    # Journeys take 90-150 minutes, with +/- 5 minutes of timing variation per point
+    journey_duration_minutes = rng.integers(90, 151, shape)
+    time_offset_minutes = journey_duration_minutes * progress + rng.uniform(-5, 5, shape)
+    timestamp = now.timestamp() - (journey_duration_minutes - time_offset_minutes) * 60.0
+
+    # Sort each route by timestamp to ensure chronological order
+    order = np.argsort(timestamp, axis=1, kind="stable")
+    return {
+        'lat': np.take_along_axis(lat, order, axis=1),
+        'lng': np.take_along_axis(lng, order, axis=1),
+        'timestamp': np.take_along_axis(timestamp, order, axis=1),
+        'progress': np.take_along_axis(progress, order, axis=1),
+    }
+
+
+def generate_varied_path_arrays(start_coords, end_coords, num_points=25, num_trucks=1, variation_index=0,
+                                start_time=None, end_time=None, rng=None):
+    """
+    Vectorized generate_varied_gps_path for many trucks at once.
+
+    Args:
+        start_coords: Dict with 'lat' and 'lng'
+        end_coords: Dict with 'lat' and 'lng'
+        num_points: Number of points per truck
+        num_trucks: Number of paths to generate
+        variation_index: Bow/zigzag selector, either one int for all trucks or a sequence of
+                         num_trucks ints (same semantics as generate_varied_gps_path)
+        start_time: Optional datetime of the first point; with end_time, points are spaced evenly
+        end_time: Optional datetime the path ends at
+        rng: Optional numpy.random.Generator
+
+    Returns:
+        dict: 'lat', 'lng', 'progress' and 'timestamp' (UTC epoch seconds, or None without
+              start/end times) arrays of shape (num_trucks, num_points)
+    """
+    rng = rng or _np_rng
+    shape = (num_trucks, num_points)
+
+    progress = np.broadcast_to(_progress_array(num_points), shape)
+    perpendicular_offset = 0.01 * np.sin(progress * np.pi)  # Bow in the middle
+
+    variation = np.broadcast_to(np.asarray(variation_index), (num_trucks,))[:, np.newaxis]
+    is_bow = (variation >= 0) & (variation < len(_PATH_BOW_LAT_FACTORS))
+    bow_index = np.clip(variation, 0, len(_PATH_BOW_LAT_FACTORS) - 1)
+    zigzag = np.where(np.arange(num_points) % 2 == 0, 0.2, -0.2)
+    lat_factor = np.where(is_bow, _PATH_BOW_LAT_FACTORS[bow_index], zigzag)
+    lng_factor = np.where(is_bow, _PATH_BOW_LNG_FACTORS[bow_index], zigzag)
+
+    # Add random noise for realism
+    lat = (start_coords['lat'] + (end_coords['lat'] - start_coords['lat']) * progress
+           + perpendicular_offset * lat_factor + rng.uniform(-0.0005, 0.0005, shape))
+    lng = (start_coords['lng'] + (end_coords['lng'] - start_coords['lng']) * progress
+           + perpendicular_offset * lng_factor + rng.uniform(-0.0005, 0.0005, shape))
+
+    timestamp = None
+    if start_time is not None and end_time is not None:
+        step = (end_time - start_time).total_seconds() / num_points
+        timestamp = np.broadcast_to(start_time.timestamp() + np.arange(num_points) * step, shape)
+
+    return {'lat': lat, 'lng': lng, 'timestamp': timestamp, 'progress': progress}
+
+
+def generate_route_coordinates(start_coords, end_coords, num_points=20, rng=None):
     """
     Generate GPS coordinates along a route between two points
 
@@ -2662,201 +4428,243 @@ def generate_route_coordinates(start_coords, end_coords, num_points=20):
         start_coords (dict): Starting coordinates with 'lat' and 'lng' keys
         end_coords (dict): Ending coordinates with 'lat' and 'lng' keys
         num_points (int): Number of coordinate points to generate
+        rng (numpy.random.Generator, optional): Random generator to draw from
 
     Returns:
         list: List of coordinate dictionaries with 'lat', 'lng', and 'timestamp' keys
     """
-    coordinates = []
+    route = generate_route_arrays(start_coords, end_coords, num_points=num_points, rng=rng)
+
+    return [
+        {
+            'lat': lat,
+            'lng': lng,
+            'timestamp': datetime.fromtimestamp(ts, tz=timezone.utc),
+            'progress': progress
+        }
+        for lat, lng, ts, progress in zip(route['lat'][0].tolist(), route['lng'][0].tolist(),
+                                          route['timestamp'][0].tolist(), route['progress'][0].tolist())
+    ]
+
+
+# Sensor axes and the uniform range each axis is drawn from
+SENSOR_AXES = [
+    # Accelerometer in m/s^2 - realistic truck movements
+    ("accelerometer", "x", -1.5, 1.5),    # Lateral acceleration (turns)
+    ("accelerometer", "y", -2.5, 2.5),    # Forward/backward acceleration (braking/accelerating)
+    ("accelerometer", "z", 9.0, 10.5),    # Vertical (gravity ~9.8 + road bumps)
+    # Gyroscope in degrees/second - small rotational movements during normal driving
+    ("gyroscope", "x", -3.0, 3.0),        # Roll (side-to-side tilt)
+    ("gyroscope", "y", -3.0, 3.0),        # Pitch (front-back tilt)
+    ("gyroscope", "z", -8.0, 8.0),        # Yaw (turning rotation)
+    # Magnetometer in μT - Earth's magnetic field is roughly 25-65 μT
+    ("magnetometer", "x", -50.0, 50.0),
+    ("magnetometer", "y", -50.0, 50.0),
+    ("magnetometer", "z", -60.0, 60.0),
+]
+SENSORS = ["accelerometer", "gyroscope", "magnetometer"]
 
-    # Calculate the distance and bearing between start and end points
-    lat_diff = end_coords['lat'] - start_coords['lat']
-    lng_diff = end_coords['lng'] - start_coords['lng']
+_SENSOR_LOW = np.array([axis[2] for axis in SENSOR_AXES])
+_SENSOR_HIGH = np.array([axis[3] for axis in SENSOR_AXES])
 
-    # Generate points along the route with some randomness to simulate real GPS tracking
-    for i in range(num_points):
-        # Calculate progress along the route (0 to 1)
-        progress = i / (num_points - 1) if num_points > 1 else 0
 
-        # Interpolate between start and end coordinates
-        base_lat = start_coords['lat'] + (lat_diff * progress)
-        base_lng = start_coords['lng'] + (lng_diff * progress)
+def generate_sensor_batch(num_points, rng=None):
+    """
+    Generate accelerometer, gyroscope, and magnetometer readings for many points at once
 
-        # Add some random variation to simulate realistic GPS drift
-        # GPS accuracy is typically within 3-5 meters, which is roughly 0.00003-0.00005 degrees
-        lat_variance = random.uniform(-0.00005, 0.00005)
-        lng_variance = random.uniform(-0.00005, 0.00005)
+    Args:
+        num_points (int): Number of GPS points to generate readings for
+        rng (numpy.random.Generator, optional): Random generator to draw from
 
-        # Add some route variation to make it more realistic (trucks don't travel in straight lines)
-        if i > 0 and i < num_points - 1:  # Don't vary the start and end points
-            # Add a slight curve to the route
-            curve_factor = math.sin(progress * math.pi) * 0.001
-            lat_variance += curve_factor * random.uniform(-1, 1)
-            lng_variance += curve_factor * random.uniform(-1, 1)
+    Returns:
+        dict: Columnar readings keyed by flattened field name ("accelerometer.x", ...,
+              "magnetometer.value"), each an array of num_points values rounded to 3 places
+    """
+    rng = rng or _np_rng
+    readings = rng.uniform(_SENSOR_LOW, _SENSOR_HIGH, (num_points, len(SENSOR_AXES)))
+    magnitudes = np.sqrt(np.square(readings).reshape(num_points, len(SENSORS), 3).sum(axis=2))
 
-        final_lat = base_lat + lat_variance
-        final_lng = base_lng + lng_variance
+    readings = np.round(readings, 3)
+    magnitudes = np.round(magnitudes, 3)
 
-        # Calculate timestamp (spread over the journey time)
-        # Assume the journey takes about 1.5-2.5 hours (90-150 minutes) - realistic for truck routes
-        journey_duration_minutes = random.randint(90, 150)
-        time_offset_minutes = (journey_duration_minutes * progress) + random.uniform(-5, 5)  # Add some timing variation
+    columns = {}
+    for col, (sensor, axis, _, _) in enumerate(SENSOR_AXES):
+        columns[f"{sensor}.{axis}"] = readings[:, col]
+    for col, sensor in enumerate(SENSORS):
+        columns[f"{sensor}.value"] = magnitudes[:, col]
+    return columns
 
-        timestamp = datetime.now(timezone.utc) - timedelta(minutes=journey_duration_minutes - time_offset_minutes)
 
-        coordinates.append({
-            'lat': round(final_lat, 6),
-            'lng': round(final_lng, 6),
-            'timestamp': timestamp,
-            'progress': progress
-        })
+def write_sensor_fields(documents, rng=None):
+    """
+    Add flattened sensor fields ("accelerometer.x", ...) to each GPS document in place
 
-    # Sort by timestamp to ensure chronological order
-    coordinates.sort(key=lambda x: x['timestamp'])
+    Args:
+        documents (list): GPS event dicts to fill
+        rng (numpy.random.Generator, optional): Random generator to draw from
 
-    return coordinates
+    Returns:
+        list: The same documents
+    """
+    columns = generate_sensor_batch(len(documents), rng=rng)
+    for field, values in columns.items():
+        for document, value in zip(documents, values.tolist()):
+            document[field] = value
+    return documents
 
 
-def generate_sensor_data():
+def generate_sensor_data(rng=None):
     """
     Generate realistic accelerometer, gyroscope, and magnetometer data
 
+    Args:
+        rng (numpy.random.Generator, optional): Random generator to draw from
+
     Returns:
         dict: Dictionary containing sensor data
     """
-    # Generate accelerometer data (m/s²)
-    # Normal driving typically has small accelerations
-    # Accelerometer in m/s^2 - realistic truck movements
-    accel_x = random.uniform(-1.5, 1.5)  # Lateral acceleration (turns)
-    accel_y = random.uniform(-2.5, 2.5)  # Forward/backward acceleration (braking/accelerating)
-    accel_z = random.uniform(9.0, 10.5)  # Vertical (gravity ~9.8 + road bumps)
-    accel_value = math.sqrt(accel_x ** 2 + accel_y ** 2 + accel_z ** 2)
-
-    # Generate gyroscope data (degrees/second) - realistic truck movements
-    # Small rotational movements during normal driving
-    gyro_x = random.uniform(-3.0, 3.0)  # Roll (side-to-side tilt)
-    gyro_y = random.uniform(-3.0, 3.0)  # Pitch (front-back tilt)
-    gyro_z = random.uniform(-8.0, 8.0)  # Yaw (turning rotation)
-    gyro_value = math.sqrt(gyro_x ** 2 + gyro_y ** 2 + gyro_z ** 2)
-
-    # Generate magnetometer data (μT - microtesla)
-    # Earth's magnetic field varies by location, roughly 25-65 μT
-    mag_x = random.uniform(-50.0, 50.0)
-    mag_y = random.uniform(-50.0, 50.0)
-    mag_z = random.uniform(-60.0, 60.0)
-    mag_value = math.sqrt(mag_x ** 2 + mag_y ** 2 + mag_z ** 2)
-
+    columns = generate_sensor_batch(1, rng=rng)
     return {
-        "accelerometer": {
-            "x": round(accel_x, 3),
-            "y": round(accel_y, 3),
-            "z": round(accel_z, 3),
-            "value": round(accel_value, 3)
-        },
-        "gyroscope": {
-            "x": round(gyro_x, 3),
-            "y": round(gyro_y, 3),
-            "z": round(gyro_z, 3),
-            "value": round(gyro_value, 3)
-        },
-        "magnetometer": {
-            "x": round(mag_x, 3),
-            "y": round(mag_y, 3),
-            "z": round(mag_z, 3),
-            "value": round(mag_value, 3)
+        sensor: {
+            "x": float(columns[f"{sensor}.x"][0]),
+            "y": float(columns[f"{sensor}.y"][0]),
+            "z": float(columns[f"{sensor}.z"][0]),
+            "value": float(columns[f"{sensor}.value"][0])
         }
+        for sensor in SENSORS
     }
 
 
-def calculate_bearing(coord1, coord2):
+EARTH_RADIUS_KM = 6371  # Earth's radius in kilometers
+KM_TO_MILES = 0.621371
+
+
+def haversine_distance_array(lat1, lng1, lat2, lng2):
     """
-    Calculate the bearing between two GPS coordinates
+    Element-wise Haversine distance between coordinate arrays
 
     Args:
-        coord1 (dict): Starting coordinate with 'lat' and 'lng' keys
-        coord2 (dict): Ending coordinate with 'lat' and 'lng' keys
+        lat1, lng1: Starting latitudes/longitudes in degrees (arrays or scalars)
+        lat2, lng2: Ending latitudes/longitudes in degrees (arrays or scalars)
 
     Returns:
-        float: Bearing in degrees (0-360)
+        numpy.ndarray: Distances in kilometers
     """
-    if coord1 == coord2:
-        return 0
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlng = np.radians(np.subtract(lng2, lng1))
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
 
-    lat1 = math.radians(coord1['lat'])
-    lat2 = math.radians(coord2['lat'])
-    lng_diff = math.radians(coord2['lng'] - coord1['lng'])
+def bearing_array(lat1, lng1, lat2, lng2):
+    """
+    Element-wise initial bearing between coordinate arrays
+
+    Args:
+        lat1, lng1: Starting latitudes/longitudes in degrees (arrays or scalars)
+        lat2, lng2: Ending latitudes/longitudes in degrees (arrays or scalars)
 
-    x = math.sin(lng_diff) * math.cos(lat2)
-    y = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(lng_diff)
+    Returns:
+        numpy.ndarray: Bearings in degrees (0-360); identical points give 0
+    """
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    lng_diff = np.radians(np.subtract(lng2, lng1))
 
-    bearing = math.atan2(x, y)
-    bearing = math.degrees(bearing)
-    bearing = (bearing + 360) % 360  # Normalize to 0-360 degrees
+    x = np.sin(lng_diff) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(lng_diff)
 
-    return round(bearing, 1)
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360  # Normalize to 0-360 degrees
 
 
-def generate_varied_gps_path(start_coords, end_coords, num_points=25, variation_index=0):
+def track_kinematics(lats, lngs, timestamps):
     """
-    Generate a GPS path with visible variation from previous paths.
+    Distance, bearing and speed between consecutive points of one or more tracks
 
     Args:
-        start_coords: Dict with 'lat' and 'lng'
-        end_coords: Dict with 'lat' and 'lng'
-        num_points: Number of points to generate
-        variation_index: Index to create different paths (0-4)
+        lats: Latitudes, shape (N,) or (M, N) for M tracks
+        lngs: Longitudes, same shape as lats
+        timestamps: UTC epoch seconds, same shape as lats
 
     Returns:
-        List of coordinate dicts with lat/lng
+        dict: 'distance_km', 'bearing' (degrees) and 'speed_mph' arrays with one fewer
+              point along the last axis; speed is 0 where the time difference is not positive
     """
-    path = []
-
-    # Create curved paths by varying the interpolation
-    # variation_index determines how much we deviate from straight line
-    for i in range(num_points):
-        progress = i / (num_points - 1)
-
-        # Base interpolation
-        lat = start_coords['lat'] + (end_coords['lat'] - start_coords['lat']) * progress
-        lng = start_coords['lng'] + (end_coords['lng'] - start_coords['lng']) * progress
-
-        # Add perpendicular offset based on variation_index
-        # This creates visibly different paths
-        perpendicular_offset = 0.01 * math.sin(progress * math.pi)  # Bow in the middle
-
-        if variation_index == 0:
-            # Straight-ish path with slight northern bow
-            lat += perpendicular_offset * 0.3
-        elif variation_index == 1:
-            # Southern bow
-            lat -= perpendicular_offset * 0.4
-        elif variation_index == 2:
-            # Eastern bow
-            lng += perpendicular_offset * 0.5
-        elif variation_index == 3:
-            # Western bow
-            lng -= perpendicular_offset * 0.4
-        else:
-            # Zigzag pattern
-            if i % 2 == 0:
-                lat += perpendicular_offset * 0.2
-                lng += perpendicular_offset * 0.2
-            else:
-                lat -= perpendicular_offset * 0.2
-                lng -= perpendicular_offset * 0.2
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    timestamps = np.asarray(timestamps, dtype=float)
 
-        # Add random noise for realism
-        lat += random.uniform(-0.0005, 0.0005)
-        lng += random.uniform(-0.0005, 0.0005)
+    distance_km = haversine_distance_array(lats[..., :-1], lngs[..., :-1], lats[..., 1:], lngs[..., 1:])
+    bearing = bearing_array(lats[..., :-1], lngs[..., :-1], lats[..., 1:], lngs[..., 1:])
 
-        path.append({'lat': lat, 'lng': lng})
+    time_diff_hours = np.diff(timestamps, axis=-1) / 3600
+    positive = time_diff_hours > 0
+    speed_kmh = np.divide(distance_km, time_diff_hours, out=np.zeros_like(distance_km), where=positive)
 
-    return path
+    return {'distance_km': distance_km, 'bearing': bearing, 'speed_mph': speed_kmh * KM_TO_MILES}
 
 
-def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropoff_coords, job_uom, num_trips, final_state, truck_offset_minutes=0):
+def calculate_bearing(coord1, coord2):
+    """
+    Calculate the bearing between two GPS coordinates
+
+    Args:
+        coord1 (dict): Starting coordinate with 'lat' and 'lng' keys
+        coord2 (dict): Ending coordinate with 'lat' and 'lng' keys
+
+    Returns:
+        float: Bearing in degrees (0-360)
+    """
+    if coord1 == coord2:
+        return 0
+
+    bearing = bearing_array(coord1['lat'], coord1['lng'], coord2['lat'], coord2['lng'])
+    return round(float(bearing), 1)
+
+
+def generate_varied_gps_path(start_coords, end_coords, num_points=25, variation_index=0, rng=None):
+    """
+    Generate a GPS path with visible variation from previous paths.
+
+    Args:
+        start_coords: Dict with 'lat' and 'lng'
+        end_coords: Dict with 'lat' and 'lng'
+        num_points: Number of points to generate
+        variation_index: Index to create different paths (0-3 bow north/south/east/west, others zigzag)
+        rng: Optional numpy.random.Generator
+
+    Returns:
+        List of coordinate dicts with lat/lng
+    """
+    path = generate_varied_path_arrays(start_coords, end_coords, num_points=num_points,
+                                       variation_index=variation_index, rng=rng)
+    return [{'lat': lat, 'lng': lng} for lat, lng in zip(path['lat'][0].tolist(), path['lng'][0].tolist())]
+
+
+# GPS points generated per trip leg (en route to the dropoff, and the return to pickup)
+TRIP_ENROUTE_GPS_POINTS = int(os.environ.get("TRUCKSIM_TRIP_ENROUTE_GPS_POINTS", "30"))
+TRIP_RETURN_GPS_POINTS = int(os.environ.get("TRUCKSIM_TRIP_RETURN_GPS_POINTS", "20"))
+
+# Checkpoint phases of a trip, in order: ticket opened, pickup synced, dropoff
+# synced, ticket closed, return leg / final position synced
+TRIP_PHASES = ["opened", "picked_up", "dropped_off", "closed", "done"]
+
+
+def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropoff_coords, job_uom, num_trips, final_state, truck_offset_minutes=0,
+                                    checkpoint_key=None, clock=None, upload_group=None):
     """
     Generate multiple trips for a single truck with varied GPS paths and tickets.
 
+    With a checkpoint_key, progress is written to the checkpoint journal: the
+    truck's timeline, then per trip the ticket (and sub-ticket) IDs and the
+    phase reached (see TRIP_PHASES). A phase whose actions and GPS go through
+    device sync is only journaled once the flush that sends them succeeds. A
+    resumed run replays the same timeline, skips finished trips and continues
+    an interrupted trip after the last phase it delivered.
+
     Args:
         truck: Truck dict with 'id' and 'device_name'
         jo_line_item_id: JOLineItem ID
@@ -2866,32 +4674,94 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
         num_trips: Number of trips to generate (2-5)
         final_state: 'at_dropoff', 'at_pickup', or 'en_route'
         truck_offset_minutes: Time offset in minutes for this truck (default 0)
+        checkpoint_key: Optional checkpoint journal key for this truck's trips
+        clock: Optional SimulationClock the trip timeline is anchored to (defaults to a new
+               virtual clock); actions and GPS without an explicit timestamp also use it
+        upload_group: Optional photo upload group (the job) the ticket photos are queued under
 
     Returns:
         List of ticket IDs created
     """
+    journaled = checkpoint_journal.get("truck", checkpoint_key) if checkpoint_key else {}
+    if journaled.get("done"):
+        print(f"\n↩️ {truck['device_name']}: all {num_trips} trips done in a previous run")
+        return journaled.get("tickets", [])
+
     print(f"\n🚛 Generating {num_trips} trips for {truck['device_name']} (final state: {final_state}, offset: {truck_offset_minutes}min)...")
     print(f"   DEBUG: job_uom={job_uom}, jo_line_item_id={jo_line_item_id}")
 
     bearing = calculate_bearing(pickup_coords, dropoff_coords)
     tickets_created = []
 
-    # Calculate timestamps - spread trips over realistic time periods
-    now = datetime.now(timezone.utc)
-
-    # For hourly jobs, make trips span longer to match photo hours (9.5, 13 hours)
-    # For tonnage jobs, keep shorter realistic trip durations
-    if job_uom == 1:  # Hourly
-        # Spread trips over 8-10 hours total for realistic hourly billing
-        trip_duration_minutes = random.randint(90, 120)  # 1.5-2 hours per trip
-        gap_between_trips = random.randint(20, 40)  # 20-40 min gaps
-    else:  # Tonnage/Load
-        trip_duration_minutes = random.randint(40, 50)  # 40-50 min per trip
-        gap_between_trips = random.randint(10, 20)  # 10-20 min gaps
+    # GPS and lifecycle actions for this truck are queued and synced together,
+    # flushed whenever we need a response or before a web API call
+    if clock is None:
+        clock = SimulationClock()
+    sync_session = DeviceSyncSession(truck['id'], jo_line_item_id, clock=clock)
+
+    if journaled.get("now"):
+        # Resuming: keep the timeline of the interrupted attempt
+        now = datetime.fromisoformat(journaled["now"])
+        trip_duration_minutes = journaled["trip_duration_minutes"]
+        gap_between_trips = journaled["gap_between_trips"]
+        print(f"   ↩️ Resuming timeline from {journaled['now']}")
+    else:
+        # Calculate timestamps - spread trips over realistic time periods
+        now = clock.now()
+
+        # For hourly jobs, make trips span longer to match photo hours (9.5, 13 hours)
+        # For tonnage jobs, keep shorter realistic trip durations
+        if job_uom == 1:  # Hourly
+            # Spread trips over 8-10 hours total for realistic hourly billing
+            trip_duration_minutes = random.randint(90, 120)  # 1.5-2 hours per trip
+            gap_between_trips = random.randint(20, 40)  # 20-40 min gaps
+        else:  # Tonnage/Load
+            trip_duration_minutes = random.randint(40, 50)  # 40-50 min per trip
+            gap_between_trips = random.randint(10, 20)  # 10-20 min gaps
+
+        if checkpoint_key:
+            checkpoint_journal.record("truck", checkpoint_key, now=now.isoformat(),
+                                      trip_duration_minutes=trip_duration_minutes, gap_between_trips=gap_between_trips)
+
+    # Journal entries waiting for the device sync that delivers their work; a failed
+    # flush drops its queue, so their entries are dropped too and a resume redoes it
+    unsynced = []
+
+    def sync(*action, **kwargs):
+        """Flush the session (or sync one action with it), then journal what it delivered"""
+        success, response_data = sync_session.sync_action(*action, **kwargs) if action else sync_session.flush()
+        if success:
+            for trip_key, fields in unsynced:
+                checkpoint_journal.record("trip", trip_key, **fields)
+        unsynced.clear()
+        return success, response_data
 
+    trips = tracer.sequence("trip")
     for trip_num in range(num_trips):
+        trips.next(f"trip {trip_num + 1}/{num_trips}", truck_id=truck['id'])
         is_last_trip = (trip_num == num_trips - 1)
 
+        trip_key = f"{checkpoint_key}:{trip_num}"
+        trip_progress = checkpoint_journal.get("trip", trip_key) if checkpoint_key else {}
+        if trip_progress.get("phase") == "done":
+            tickets_created.append(trip_progress["ticket_id"])
+            print(f"  Trip {trip_num + 1}/{num_trips}: ↩️ done in a previous run (ticket #{trip_progress['ticket_id']})")
+            continue
+
+        def trip_checkpoint(**fields):
+            if checkpoint_key:
+                checkpoint_journal.record("trip", trip_key, **fields)
+
+        def trip_checkpoint_after_sync(trip_key=trip_key, **fields):
+            if checkpoint_key:
+                unsynced.append((trip_key, fields))
+
+        resumed_phase = TRIP_PHASES.index(trip_progress["phase"]) if trip_progress.get("phase") else -1
+
+        def reached(phase):
+            """Whether an earlier attempt already delivered this phase of the trip"""
+            return resumed_phase >= TRIP_PHASES.index(phase)
+
         # Calculate timestamps for this trip with truck-specific offset
         trip_start_offset = trip_num * (trip_duration_minutes + gap_between_trips)
 
@@ -2907,13 +4777,17 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
 
         print(f"  Trip {trip_num + 1}/{num_trips}: {ticket_open_time.strftime('%H:%M')} - {ticket_close_time.strftime('%H:%M')}")
 
-        # 1. Open ticket
+        # 1. Open ticket (or pick up the one an interrupted attempt opened)
         ticket_number = generate_ticket_number()
         print(f"    DEBUG: Opening ticket #{ticket_number} for truck {truck['id']}, job_uom={job_uom}")
 
         # Use appropriate ticket opening method based on job UOM
-        if job_uom == 1:  # Hourly - use web API
+        if trip_progress.get("ticket_id"):
+            ticket_id = trip_progress["ticket_id"]
+            print(f"    ↩️ Continuing with ticket #{ticket_id} from a previous run")
+        elif job_uom == 1:  # Hourly - use web API
             print(f"    DEBUG: Using issue_ticket_via_web_api for hourly job")
+            sync()
             success, ticket_id = issue_ticket_via_web_api(
                 jo_line_item_id=jo_line_item_id,
                 truck_id=truck['id'],
@@ -2926,59 +4800,62 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
             print(f"    DEBUG: Hourly ticket result: success={success}, ticket_id={ticket_id}")
         else:  # Tonnage/Load - use device sync
             print(f"    DEBUG: Using sync_device_action for tonnage/load job")
-            success, response_data = sync_device_action(
-                action_type="ticketOpened",
-                ticket_id=None,
-                jo_line_item_id=jo_line_item_id,
-                truck_id=truck['id'],
+            local_id = sync_session.queue_action(
+                "ticketOpened",
+                None,
                 latitude=pickup_coords['lat'],
                 longitude=pickup_coords['lng'],
                 event_timestamp=ticket_open_time.isoformat(),
                 external_ref=ticket_number
             )
+            success, response_data = sync()
             print(f"    DEBUG: Device sync result: success={success}, response_data={response_data}")
 
-            # Extract ticket ID from response - format is [{'ticketId': 123, 'localId': 'xxx'}]
-            ticket_id = None
-            if success and response_data and isinstance(response_data, list) and len(response_data) > 0:
-                # Just get ticketId from first item in response
-                ticket_id = response_data[0].get('ticketId')
+            # Response maps localId -> ticketId - format is [{'ticketId': 123, 'localId': 'xxx'}]
+            ticket_id = sync_session.ticket_ids.get(local_id) if success else None
+            if ticket_id:
                 print(f"    DEBUG: Extracted ticket_id={ticket_id} from device sync response")
 
         if not ticket_id:
             print(f"    ⚠️ Failed to open ticket for trip {trip_num + 1}")
             continue
 
-        print(f"    ✅ Opened ticket #{ticket_id}")
+        if not trip_progress.get("ticket_id"):
+            print(f"    ✅ Opened ticket #{ticket_id}")
+            trip_checkpoint(phase="opened", ticket_id=ticket_id)
 
         tickets_created.append(ticket_id)
 
         # 2. GPS at pickup (loading)
-        coords_pickup = []
-        for i in range(6):
-            lat_offset = random.uniform(-0.0001, 0.0001)
-            lng_offset = random.uniform(-0.0001, 0.0001)
-            coords_pickup.append({
-                "latitude": pickup_coords['lat'] + lat_offset,
-                "longitude": pickup_coords['lng'] + lng_offset,
-                "speed": 0,
-                "heading": bearing,
-                "event_timestamp": (ticket_open_time + timedelta(minutes=i*2)).isoformat()
-            })
-        print(f"    DEBUG: Sending {len(coords_pickup)} pickup GPS points for ticket {ticket_id}")
-        send_gps_coordinates_batch(truck['id'], ticket_id, coords_pickup, jo_line_item_id)
-        print(f"    ✅ Sent pickup GPS")
-        time.sleep(0.3)
+        if reached("picked_up"):
+            print(f"    ↩️ Pickup was synced in a previous run")
+        else:
+            coords_pickup = []
+            for i in range(6):
+                lat_offset = random.uniform(-0.0001, 0.0001)
+                lng_offset = random.uniform(-0.0001, 0.0001)
+                coords_pickup.append({
+                    "latitude": pickup_coords['lat'] + lat_offset,
+                    "longitude": pickup_coords['lng'] + lng_offset,
+                    "speed": 0,
+                    "heading": bearing,
+                    "event_timestamp": (ticket_open_time + timedelta(minutes=i*2)).isoformat()
+                })
+            print(f"    DEBUG: Queueing {len(coords_pickup)} pickup GPS points for ticket {ticket_id}")
+            sync_session.add(ticket_id, coords_pickup)
+
+            # 3. PickupCompleted (queued; synced with the GPS trail)
+            sync_session.queue_action("PickupCompleted", ticket_id,
+                                      pickup_coords['lat'], pickup_coords['lng'],
+                                      event_timestamp=pickup_complete_time.isoformat())
 
-        # 3. PickupCompleted
-        sync_device_action("PickupCompleted", ticket_id, jo_line_item_id, truck['id'],
-                          pickup_coords['lat'], pickup_coords['lng'],
-                          event_timestamp=pickup_complete_time.isoformat())
-        time.sleep(0.3)
+            trip_checkpoint_after_sync(phase="picked_up")
+            sync()
 
         # 3b. For hourly jobs, create sub-ticket for tonnage tracking
-        subticket_id = None
-        if job_uom == 1:
+        subticket_id = trip_progress.get("subticket_id")
+        if job_uom == 1 and not subticket_id and not reached("dropped_off"):
+            sync()
             subticket_number = generate_ticket_number()
             subticket_payload = {
                 "joLineItemId": jo_line_item_id,
@@ -2989,7 +4866,7 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
 
             headers = {"Authorization": f"Token {AUTH_TOKEN}", "Content-Type": "application/json"}
             try:
-                response = requests.post(
+                response = api_client.post(
                     f"{API_BASE_URL}/api/2/tickets",
                     json=subticket_payload,
                     headers=headers
@@ -2998,68 +4875,73 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
                     subticket_data = response.json().get("data", {})
                     subticket_id = subticket_data.get("id")
                     print(f"    ✅ Created sub-ticket #{subticket_id} for tonnage")
+                    trip_checkpoint(subticket_id=subticket_id)
             except Exception as e:
                 print(f"    ⚠️ Failed to create sub-ticket: {e}")
 
         # 4. For last trip with final_state='at_pickup', continue to dropoff then return
         # (will handle at end of loop)
 
-        # 5. Generate varied GPS path en route
-        varied_path = generate_varied_gps_path(pickup_coords, dropoff_coords, num_points=30, variation_index=trip_num)
-        coords_enroute = []
-        time_between_points = (dropoff_complete_time - pickup_complete_time).total_seconds() / len(varied_path)
-
-        for idx, point in enumerate(varied_path):
-            coords_enroute.append({
-                "latitude": point['lat'],
-                "longitude": point['lng'],
-                "speed": random.randint(40, 60),  # Highway speed range mph
-                "heading": bearing,
-                "event_timestamp": (pickup_complete_time + timedelta(seconds=idx * time_between_points)).isoformat()
-            })
+        # 5-8. En route to the dropoff and unloading (tonnage is reused when closing)
+        tonnage_value = trip_progress.get("tonnage")
+        if reached("dropped_off"):
+            print(f"    ↩️ Dropoff was synced in a previous run")
+        else:
+            # 5. Generate varied GPS path en route
+            varied_path = generate_varied_gps_path(pickup_coords, dropoff_coords, num_points=TRIP_ENROUTE_GPS_POINTS, variation_index=trip_num)
+            coords_enroute = []
+            time_between_points = (dropoff_complete_time - pickup_complete_time).total_seconds() / len(varied_path)
+
+            for idx, point in enumerate(varied_path):
+                coords_enroute.append({
+                    "latitude": point['lat'],
+                    "longitude": point['lng'],
+                    "speed": random.randint(40, 60),  # Highway speed range mph
+                    "heading": bearing,
+                    "event_timestamp": (pickup_complete_time + timedelta(seconds=idx * time_between_points)).isoformat()
+                })
 
-        print(f"    DEBUG: Sending {len(coords_enroute)} enroute GPS points for ticket {ticket_id}")
-        send_gps_coordinates_batch(truck['id'], ticket_id, coords_enroute, jo_line_item_id)
-        print(f"    ✅ Sent enroute GPS")
-        time.sleep(0.3)
+            print(f"    DEBUG: Queueing {len(coords_enroute)} enroute GPS points for ticket {ticket_id}")
+            sync_session.add(ticket_id, coords_enroute)
 
-        # 6. For last trip, check if en route
-        if is_last_trip and final_state == 'en_route':
-            # Stop here - truck is en route
-            print(f"    🚗 Final trip - en route (ticket open)")
-            break
+            # 6. For last trip, check if en route
+            if is_last_trip and final_state == 'en_route':
+                # Stop here - truck is en route
+                print(f"    🚗 Final trip - en route (ticket open)")
+                trip_checkpoint_after_sync(phase="done")
+                break
 
-        # 7. GPS at dropoff (unloading)
-        coords_dropoff = []
-        for i in range(6):
-            lat_offset = random.uniform(-0.0001, 0.0001)
-            lng_offset = random.uniform(-0.0001, 0.0001)
-            coords_dropoff.append({
-                "latitude": dropoff_coords['lat'] + lat_offset,
-                "longitude": dropoff_coords['lng'] + lng_offset,
-                "speed": 0,
-                "heading": bearing,
-                "event_timestamp": (dropoff_complete_time + timedelta(minutes=i)).isoformat()
-            })
-        send_gps_coordinates_batch(truck['id'], ticket_id, coords_dropoff, jo_line_item_id)
-        time.sleep(0.3)
-
-        # 8. DropOffCompleted (with tonnage for tonnage jobs)
-        tonnage_value = None
-        if job_uom == 2:  # Tonnage job - include quantity (use photo values)
-            tonnage_value = get_next_tonnage_value()
-            sync_device_action("DropOffCompleted", ticket_id, jo_line_item_id, truck['id'],
-                              dropoff_coords['lat'], dropoff_coords['lng'],
-                              quantity=tonnage_value,
-                              event_timestamp=dropoff_complete_time.isoformat())
-        else:  # Hourly/Load job - no quantity
-            sync_device_action("DropOffCompleted", ticket_id, jo_line_item_id, truck['id'],
-                              dropoff_coords['lat'], dropoff_coords['lng'],
-                              event_timestamp=dropoff_complete_time.isoformat())
-        time.sleep(0.3)
+            # 7. GPS at dropoff (unloading)
+            coords_dropoff = []
+            for i in range(6):
+                lat_offset = random.uniform(-0.0001, 0.0001)
+                lng_offset = random.uniform(-0.0001, 0.0001)
+                coords_dropoff.append({
+                    "latitude": dropoff_coords['lat'] + lat_offset,
+                    "longitude": dropoff_coords['lng'] + lng_offset,
+                    "speed": 0,
+                    "heading": bearing,
+                    "event_timestamp": (dropoff_complete_time + timedelta(minutes=i)).isoformat()
+                })
+            sync_session.add(ticket_id, coords_dropoff)
+
+            # 8. DropOffCompleted (with tonnage for tonnage jobs; queued with the GPS trail)
+            if job_uom == 2:  # Tonnage job - include quantity (use photo values)
+                tonnage_value = get_next_tonnage_value()
+                sync_session.queue_action("DropOffCompleted", ticket_id,
+                                          dropoff_coords['lat'], dropoff_coords['lng'],
+                                          quantity=tonnage_value,
+                                          event_timestamp=dropoff_complete_time.isoformat())
+            else:  # Hourly/Load job - no quantity
+                sync_session.queue_action("DropOffCompleted", ticket_id,
+                                          dropoff_coords['lat'], dropoff_coords['lng'],
+                                          event_timestamp=dropoff_complete_time.isoformat())
+
+            trip_checkpoint_after_sync(phase="dropped_off", tonnage=tonnage_value)
 
         # 9. Close sub-ticket with tonnage (hourly jobs only)
-        if job_uom == 1 and subticket_id:
+        if job_uom == 1 and subticket_id and not trip_progress.get("subticket_closed"):
+            sync()
             tonnage = get_next_hourly_tonnage()
             close_payload = {
                 "weight": tonnage,  # API expects 'weight' not 'quantity'
@@ -3070,7 +4952,7 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
             headers = {"Authorization": f"Token {AUTH_TOKEN}", "Content-Type": "application/json"}
             print(f"    DEBUG: Closing sub-ticket {subticket_id} with {tonnage:.1f} tons")
             try:
-                response = requests.post(
+                response = api_client.post(
                     f"{API_BASE_URL}/api/2/tickets/{subticket_id}/close",
                     json=close_payload,
                     headers=headers
@@ -3078,23 +4960,27 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
                 print(f"    DEBUG: Sub-ticket close response: status={response.status_code}")
                 if response.status_code in [200, 201]:
                     print(f"    ✅ Closed sub-ticket #{subticket_id} with {tonnage:.1f} tons")
-                    upload_ticket_photo(subticket_id, "hourly", "Hourly job tonnage delivery")
+                    trip_checkpoint(subticket_closed=True)
+                    photo_upload_queue.submit_ticket_photo(subticket_id, "hourly", "Hourly job tonnage delivery",
+                                                           group=upload_group)
                 else:
                     print(f"    ❌ Failed to close sub-ticket. Status: {response.status_code}, Response: {response.text}")
             except Exception as e:
                 print(f"    ⚠️ Exception closing sub-ticket: {e}")
-            time.sleep(0.3)
 
         # 10. Close parent ticket
-        if job_uom == 1:
+        if reached("closed"):
+            print(f"    ↩️ Ticket #{ticket_id} was closed in a previous run")
+        elif job_uom == 1:
             # Hourly jobs: parent ticket closed via web API (no quantity needed - calculated by timer)
             print(f"    DEBUG: Closing parent ticket {ticket_id} (hourly)")
-            success, response = sync_device_action("ticketClosed", ticket_id, jo_line_item_id, truck['id'],
-                                            dropoff_coords['lat'], dropoff_coords['lng'],
-                                            event_timestamp=ticket_close_time.isoformat())
+            success, response = sync("ticketClosed", ticket_id,
+                                     dropoff_coords['lat'], dropoff_coords['lng'],
+                                     event_timestamp=ticket_close_time.isoformat())
             print(f"    DEBUG: Parent ticket close result: success={success}")
             if success:
-                upload_ticket_photo(ticket_id, "timesheets", "Timesheet photo")
+                trip_checkpoint(phase="closed")
+                photo_upload_queue.submit_ticket_photo(ticket_id, "timesheets", "Timesheet photo", group=upload_group)
                 print(f"    ✅ Trip {trip_num + 1} parent ticket #{ticket_id} closed")
             else:
                 print(f"    ❌ Failed to close parent ticket #{ticket_id}")
@@ -3103,13 +4989,14 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
             if tonnage_value is None:
                 tonnage_value = get_next_tonnage_value()
             print(f"    DEBUG: Closing tonnage ticket {ticket_id} with {tonnage_value:.2f} tons")
-            success, response = sync_device_action("ticketClosed", ticket_id, jo_line_item_id, truck['id'],
-                                            dropoff_coords['lat'], dropoff_coords['lng'],
-                                            quantity=tonnage_value,
-                                            event_timestamp=ticket_close_time.isoformat())
+            success, response = sync("ticketClosed", ticket_id,
+                                     dropoff_coords['lat'], dropoff_coords['lng'],
+                                     quantity=tonnage_value,
+                                     event_timestamp=ticket_close_time.isoformat())
             print(f"    DEBUG: Tonnage ticket close result: success={success}")
             if success:
-                upload_ticket_photo(ticket_id, "tonnage", "Delivery ticket photo")
+                trip_checkpoint(phase="closed")
+                photo_upload_queue.submit_ticket_photo(ticket_id, "tonnage", "Delivery ticket photo", group=upload_group)
                 print(f"    ✅ Trip {trip_num + 1} ticket #{ticket_id} closed with {tonnage_value:.1f} tons")
             else:
                 print(f"    ❌ Failed to close tonnage ticket #{ticket_id}")
@@ -3120,7 +5007,7 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
             return_start_time = ticket_close_time + timedelta(minutes=5)
             return_end_time = return_start_time + timedelta(minutes=20)
 
-            return_path = generate_varied_gps_path(dropoff_coords, pickup_coords, num_points=20, variation_index=trip_num + 10)
+            return_path = generate_varied_gps_path(dropoff_coords, pickup_coords, num_points=TRIP_RETURN_GPS_POINTS, variation_index=trip_num + 10)
             coords_return = []
             time_between_points = (return_end_time - return_start_time).total_seconds() / len(return_path)
 
@@ -3133,16 +5020,15 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
                     "event_timestamp": (return_start_time + timedelta(seconds=idx * time_between_points)).isoformat()
                 })
 
-            print(f"    DEBUG: Sending {len(coords_return)} return journey GPS points")
-            send_gps_coordinates_batch(truck['id'], ticket_id, coords_return, jo_line_item_id)
+            print(f"    DEBUG: Queueing {len(coords_return)} return journey GPS points")
+            sync_session.add(ticket_id, coords_return)
             print(f"    🔄 Added return journey GPS")
-            time.sleep(0.3)
         elif final_state == 'at_pickup':
             # Last trip ending at pickup: return to pickup
             return_start_time = ticket_close_time + timedelta(minutes=5)
             return_end_time = return_start_time + timedelta(minutes=20)
 
-            return_path = generate_varied_gps_path(dropoff_coords, pickup_coords, num_points=20, variation_index=trip_num + 10)
+            return_path = generate_varied_gps_path(dropoff_coords, pickup_coords, num_points=TRIP_RETURN_GPS_POINTS, variation_index=trip_num + 10)
             coords_return = []
             time_between_points = (return_end_time - return_start_time).total_seconds() / len(return_path)
 
@@ -3155,8 +5041,8 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
                     "event_timestamp": (return_start_time + timedelta(seconds=idx * time_between_points)).isoformat()
                 })
 
-            print(f"    DEBUG: Sending {len(coords_return)} return journey GPS points (final at pickup)")
-            send_gps_coordinates_batch(truck['id'], ticket_id, coords_return, jo_line_item_id)
+            print(f"    DEBUG: Queueing {len(coords_return)} return journey GPS points (final at pickup)")
+            sync_session.add(ticket_id, coords_return)
 
             # Add stationary GPS at pickup to show truck is there
             stationary_time = return_end_time
@@ -3171,9 +5057,8 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
                     "heading": calculate_bearing(dropoff_coords, pickup_coords),
                     "event_timestamp": (stationary_time + timedelta(minutes=i*2)).isoformat()
                 })
-            send_gps_coordinates_batch(truck['id'], ticket_id, coords_stationary, jo_line_item_id)
+            sync_session.add(ticket_id, coords_stationary)
             print(f"    🅿️  Final position: at pickup")
-            time.sleep(0.3)
         elif final_state == 'at_dropoff':
             # Last trip ending at dropoff: add stationary GPS
             stationary_time = ticket_close_time + timedelta(minutes=5)
@@ -3188,571 +5073,26 @@ def setup_truck_with_multiple_trips(truck, jo_line_item_id, pickup_coords, dropo
                     "heading": bearing,
                     "event_timestamp": (stationary_time + timedelta(minutes=i*2)).isoformat()
                 })
-            send_gps_coordinates_batch(truck['id'], ticket_id, coords_stationary, jo_line_item_id)
+            sync_session.add(ticket_id, coords_stationary)
             print(f"    📍 Final position: at dropoff")
-            time.sleep(0.3)
         # For 'en_route' final state, no additional GPS needed (already en route)
 
-        time.sleep(0.5)
-
-    return tickets_created
-
-
-def setup_truck_states_for_job(job_order_id, jo_line_item_id, created_tickets, trucks, pickup_coords, dropoff_coords, job_uom=None):
-    """
-    Set up trucks with proper GPS journeys coordinated with ticket lifecycle events via device sync.
-    Each truck gets a different end state:
-    - Truck 1: Complete journey with CLOSED ticket (PickupCompleted + DropOffCompleted)
-    - Truck 2: At pickup with CLOSED ticket (completed a previous trip)
-    - Truck 3: En route between pickup and dropoff with OPEN ticket (PickupCompleted only)
-
-    For hourly jobs (UOM=1), creates sub-tickets for tonnage tracking.
-
-    Args:
-        job_order_id: The job order ID
-        jo_line_item_id: The JOLineItem ID
-        created_tickets: List of ticket IDs [ticket1, ticket2, ticket3]
-        trucks: List of truck dicts (3 trucks)
-        pickup_coords: Dict with 'lat' and 'lng' for pickup location
-        dropoff_coords: Dict with 'lat' and 'lng' for dropoff location
-        job_uom: Optional UOM ID (1=Hour, 2=Ton, 4=Load). If 1, sub-tickets will be created.
-    """
-    if not created_tickets or len(created_tickets) < 3:
-        print(f"⚠️ Need at least 3 tickets. Got {len(created_tickets) if created_tickets else 0}")
-        return
-
-    print(f"\n🚚 Setting up truck states for job {job_order_id}...")
-
-    bearing = calculate_bearing(pickup_coords, dropoff_coords)
-
-    # ===== TRUCK 1: Complete journey with CLOSED ticket =====
-    ticket_1 = created_tickets[0]
-    truck_1 = trucks[0]
-    print(f"  📍 {truck_1['device_name']}: Complete journey → CLOSED ticket")
-
-    # Timestamps for 1.5 hour trip (90 minutes ago to now)
-    ticket_open_time = datetime.now(timezone.utc) - timedelta(minutes=90)
-    pickup_complete_time = datetime.now(timezone.utc) - timedelta(minutes=70)
-    dropoff_complete_time = datetime.now(timezone.utc) - timedelta(minutes=5)
-    ticket_close_time = datetime.now(timezone.utc) - timedelta(minutes=2)
-
-    # 1. GPS at pickup (loading) - more realistic with 5-6 points over 15 minutes
-    coords_pickup_1 = []
-    for i in range(6):
-        # Small variations around pickup location to simulate loading activity
-        lat_offset = random.uniform(-0.0001, 0.0001)
-        lng_offset = random.uniform(-0.0001, 0.0001)
-        coords_pickup_1.append({
-            "latitude": pickup_coords['lat'] + lat_offset,
-            "longitude": pickup_coords['lng'] + lng_offset,
-            "speed": 0,
-            "heading": bearing,
-            "event_timestamp": (ticket_open_time + timedelta(minutes=i*3)).isoformat()
-        })
-    send_gps_coordinates_batch(truck_1['id'], ticket_1, coords_pickup_1, jo_line_item_id)
-    time.sleep(0.5)
-
-    # 2. PickupCompleted action (no quantity - hours calculated by timer)
-    success, _ = sync_device_action("PickupCompleted", ticket_1, jo_line_item_id, truck_1['id'],
-                                    pickup_coords['lat'], pickup_coords['lng'],
-                                    event_timestamp=pickup_complete_time.isoformat())
-    if not success:
-        print(f"  ⚠️ PickupCompleted failed for {truck_1['device_name']}")
-    time.sleep(0.5)
-
-    # 2b. Create OPEN sub-ticket for tonnage tracking (after pickup) - ONLY FOR HOURLY JOBS
-    #     Mobile app creates sub-ticket after pickup via POST /api/2/tickets
-    #     NOTE: Mobile app does NOT pass historical timestamps - uses current time
-    #     DELAY: Wait to spread timestamps across different minutes
-    print(f"  ⏳ Waiting 75 seconds before creating sub-ticket...")
-    time.sleep(75)
-
-    subticket_1_id = None
-    if job_uom == 1:  # Only create sub-tickets for hourly jobs
-        subticket_number = generate_ticket_number()
-        subticket_payload = {
-            "joLineItemId": jo_line_item_id,
-            "truckId": truck_1['id'],
-            "dropOffLocation": dropoff_coords['site_id'],  # Set dropoff site at creation
-            "externalRef": subticket_number
-        }
-        headers = {
-            "Authorization": f"Token {AUTH_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        try:
-            response = requests.post(f"{API_BASE_URL}/api/2/tickets", json=subticket_payload, headers=headers)
-            if response.status_code in [200, 201]:
-                response_data = response.json()
-                print(f"  DEBUG: Sub-ticket creation response: {response_data}")
-                # Try different possible locations for the ID
-                subticket_1_id = response_data.get('id') or response_data.get('data', {}).get('id')
-                print(f"  ✅ Created OPEN sub-ticket #{subticket_1_id} ({subticket_number}) for tonnage on {truck_1['device_name']}")
-            else:
-                print(f"  ⚠️ Sub-ticket creation failed: {response.status_code} - {response.text}")
-        except Exception as e:
-            print(f"  ⚠️ Sub-ticket creation error: {e}")
-        time.sleep(0.5)
-
-    # 3. GPS en route - generate realistic path with 25-30 points
-    coords_enroute_1 = []
-    num_enroute_points = 28
-    journey_minutes = 50  # Travel time from pickup complete to dropoff arrival
-
-    for i in range(num_enroute_points):
-        # Calculate progress along route (0 to 1)
-        progress = i / (num_enroute_points - 1) if num_enroute_points > 1 else 0
-
-        # Interpolate between pickup and dropoff
-        base_lat = pickup_coords['lat'] + (dropoff_coords['lat'] - pickup_coords['lat']) * progress
-        base_lng = pickup_coords['lng'] + (dropoff_coords['lng'] - pickup_coords['lng']) * progress
-
-        # Add realistic GPS drift and route variation
-        lat_variance = random.uniform(-0.00005, 0.00005)
-        lng_variance = random.uniform(-0.00005, 0.00005)
-
-        # Add curve to route (trucks don't drive perfectly straight)
-        if 0 < i < num_enroute_points - 1:
-            curve_factor = math.sin(progress * math.pi) * 0.0008
-            lat_variance += curve_factor * random.uniform(-1, 1)
-            lng_variance += curve_factor * random.uniform(-1, 1)
-
-        # Calculate realistic speed (varies during journey)
-        if i < 3:  # Accelerating from pickup
-            speed = 15 + (i * 10)
-        elif i > num_enroute_points - 4:  # Decelerating to dropoff
-            speed = 50 - ((num_enroute_points - i) * 10)
-        else:  # Cruising speed with variation
-            speed = 45 + random.uniform(-8, 12)
-        speed = max(5, min(speed, 65))  # Cap between 5-65 mph
-
-        # Calculate timestamp spread over journey
-        time_offset = pickup_complete_time + timedelta(minutes=(journey_minutes * progress))
-
-        coords_enroute_1.append({
-            "latitude": base_lat + lat_variance,
-            "longitude": base_lng + lng_variance,
-            "speed": round(speed, 1),
-            "heading": bearing + random.uniform(-5, 5),  # Slight heading variation
-            "event_timestamp": time_offset.isoformat()
-        })
-
-    send_gps_coordinates_batch(truck_1['id'], ticket_1, coords_enroute_1, jo_line_item_id)
-    time.sleep(0.5)
-
-    # 4. GPS at dropoff (unloading) - 5-6 points over 10 minutes
-    coords_dropoff_1 = []
-    for i in range(5):
-        # Small variations around dropoff location to simulate unloading activity
-        lat_offset = random.uniform(-0.0001, 0.0001)
-        lng_offset = random.uniform(-0.0001, 0.0001)
-        time_offset = dropoff_complete_time - timedelta(minutes=10-(i*2))
-        coords_dropoff_1.append({
-            "latitude": dropoff_coords['lat'] + lat_offset,
-            "longitude": dropoff_coords['lng'] + lng_offset,
-            "speed": 0,
-            "heading": bearing,
-            "event_timestamp": time_offset.isoformat()
-        })
-    send_gps_coordinates_batch(truck_1['id'], ticket_1, coords_dropoff_1, jo_line_item_id)
-    time.sleep(0.5)
-
-    # 5. DropOffCompleted action (no tonnage - hours calculated by timer)
-    success, _ = sync_device_action("DropOffCompleted", ticket_1, jo_line_item_id, truck_1['id'],
-                                    dropoff_coords['lat'], dropoff_coords['lng'],
-                                    event_timestamp=dropoff_complete_time.isoformat())
-    if not success:
-        print(f"  ⚠️ DropOffCompleted failed for {truck_1['device_name']}")
-    time.sleep(0.5)
-
-    # 6. Close sub-ticket with tonnage (15 tons) - ONLY FOR HOURLY JOBS
-    #    Mobile app closes sub-ticket at dropoff via POST /api/2/tickets/{id}/close
-    #    NOTE: Mobile app does NOT pass historical timestamps - uses current time
-    #    DELAY: Wait to spread timestamps
-    print(f"  ⏳ Waiting 60 seconds before closing sub-ticket...")
-    time.sleep(60)
-
-    if job_uom == 1 and subticket_1_id:  # Only close sub-tickets for hourly jobs
-        close_payload = {
-            "weight": 15.0,  # 15 tons delivered
-        }
-        headers = {
-            "Authorization": f"Token {AUTH_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/api/2/tickets/{subticket_1_id}/close",
-                json=close_payload,
-                headers=headers
-            )
-            if response.status_code in [200, 201]:
-                print(f"  ✅ Closed sub-ticket #{subticket_1_id} with 15 tons on {truck_1['device_name']}")
-                # Upload hourly ticket photo to sub-ticket
-                upload_ticket_photo(subticket_1_id, "hourly", "Hourly job tonnage delivery")
-            else:
-                print(f"  ⚠️ Sub-ticket close failed: {response.status_code} - {response.text}")
-        except Exception as e:
-            print(f"  ⚠️ Sub-ticket close error: {e}")
-        time.sleep(0.5)
-
-    # 7. Close parent ticket via web API (for hourly jobs)
-    #    Mobile app uses web API for STANDALONE hourly jobs, not device sync
-    #    DELAY: Wait to spread timestamps
-    print(f"  ⏳ Waiting 45 seconds before closing parent ticket...")
-    time.sleep(45)
-
-    if job_uom == 1:  # Hourly jobs
-        success = close_ticket_via_web_api(
-            ticket_id=ticket_1,
-            coordinates={"latitude": dropoff_coords['lat'], "longitude": dropoff_coords['lng']}
-        )
-        if success:
-            print(f"  ✅ Closed parent ticket #{ticket_1} on {truck_1['device_name']}")
-            # Upload timesheet photo to parent ticket
-            upload_ticket_photo(ticket_1, "timesheets", "Timesheet photo")
-        else:
-            print(f"  ⚠️ Parent ticket close failed for {truck_1['device_name']}")
-    else:
-        # For non-hourly jobs, use device sync
-        success, _ = sync_device_action("ticketClosed", ticket_1, jo_line_item_id, truck_1['id'],
-                                        dropoff_coords['lat'], dropoff_coords['lng'],
-                                        event_timestamp=ticket_close_time.isoformat())
-        if success:
-            # Upload photo based on job type (tonnage or ATP)
-            photo_type = "tonnage" if job_uom == 2 else "atp"
-            upload_ticket_photo(ticket_1, photo_type, f"Delivery ticket photo")
-        else:
-            print(f"  ⚠️ ticketClosed failed for {truck_1['device_name']}")
-    time.sleep(0.5)
-
-    # ===== TRUCK 2: At pickup with CLOSED ticket (completed previous trip) =====
-    ticket_2 = created_tickets[1]
-    truck_2 = trucks[1]
-    print(f"  📍 {truck_2['device_name']}: At pickup - CLOSED ticket")
-
-    # Timestamps for 2 hour trip (completed)
-    ticket2_open_time = datetime.now(timezone.utc) - timedelta(minutes=130)
-    ticket2_pickup_complete = datetime.now(timezone.utc) - timedelta(minutes=110)
-    ticket2_dropoff_complete = datetime.now(timezone.utc) - timedelta(minutes=20)
-    ticket2_close_time = datetime.now(timezone.utc) - timedelta(minutes=15)
-
-    # Simulate a complete previous trip
-    # 1. GPS at pickup - 6 points over 18 minutes
-    coords_pickup_2_prev = []
-    for i in range(6):
-        lat_offset = random.uniform(-0.00015, 0.00015)
-        lng_offset = random.uniform(-0.00015, 0.00015)
-        coords_pickup_2_prev.append({
-            "latitude": pickup_coords['lat'] + lat_offset,
-            "longitude": pickup_coords['lng'] + lng_offset,
-            "speed": 0,
-            "heading": bearing,
-            "event_timestamp": (ticket2_open_time + timedelta(minutes=i*3)).isoformat()
-        })
-    send_gps_coordinates_batch(truck_2['id'], ticket_2, coords_pickup_2_prev, jo_line_item_id)
-    time.sleep(0.5)
-
-    # 2. PickupCompleted (no quantity - hours calculated by timer)
-    success, _ = sync_device_action("PickupCompleted", ticket_2, jo_line_item_id, truck_2['id'],
-                                    pickup_coords['lat'], pickup_coords['lng'],
-                                    event_timestamp=ticket2_pickup_complete.isoformat())
-    if not success:
-        print(f"  ⚠️ PickupCompleted failed for {truck_2['device_name']}")
-    time.sleep(0.5)
-
-    # 2b. Create OPEN sub-ticket for tonnage tracking (after pickup) - ONLY FOR HOURLY JOBS
-    #     NOTE: Mobile app does NOT pass historical timestamps - uses current time
-    #     DELAY: Wait to spread timestamps
-    print(f"  ⏳ Waiting 80 seconds before creating sub-ticket for Truck 2...")
-    time.sleep(80)
-
-    subticket_2_id = None
-    if job_uom == 1:  # Only create sub-tickets for hourly jobs
-        subticket_number = generate_ticket_number()
-        subticket_payload = {
-            "joLineItemId": jo_line_item_id,
-            "truckId": truck_2['id'],
-            "dropOffLocation": dropoff_coords['site_id'],  # Set dropoff site at creation
-            "externalRef": subticket_number
-        }
-        headers = {
-            "Authorization": f"Token {AUTH_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        try:
-            response = requests.post(f"{API_BASE_URL}/api/2/tickets", json=subticket_payload, headers=headers)
-            if response.status_code in [200, 201]:
-                response_data = response.json()
-                print(f"  DEBUG: Sub-ticket creation response: {response_data}")
-                # Try different possible locations for the ID
-                subticket_2_id = response_data.get('id') or response_data.get('data', {}).get('id')
-                print(f"  ✅ Created OPEN sub-ticket #{subticket_2_id} ({subticket_number}) for tonnage on {truck_2['device_name']}")
-            else:
-                print(f"  ⚠️ Sub-ticket creation failed: {response.status_code} - {response.text}")
-        except Exception as e:
-            print(f"  ⚠️ Sub-ticket creation error: {e}")
-        time.sleep(0.5)
-
-    # 3. GPS en route - Truck 2 takes a slightly different path (30 points)
-    coords_enroute_2 = []
-    num_enroute_points = 30
-    journey_minutes = 70  # Slightly longer journey for variety
-
-    for i in range(num_enroute_points):
-        progress = i / (num_enroute_points - 1) if num_enroute_points > 1 else 0
-
-        # Interpolate between pickup and dropoff
-        base_lat = pickup_coords['lat'] + (dropoff_coords['lat'] - pickup_coords['lat']) * progress
-        base_lng = pickup_coords['lng'] + (dropoff_coords['lng'] - pickup_coords['lng']) * progress
-
-        # Different route variation pattern for Truck 2
-        lat_variance = random.uniform(-0.00008, 0.00008)
-        lng_variance = random.uniform(-0.00008, 0.00008)
-
-        if 0 < i < num_enroute_points - 1:
-            # Different curve pattern (cosine vs sine)
-            curve_factor = math.cos(progress * math.pi) * 0.0012
-            lat_variance -= curve_factor * random.uniform(-1, 1)  # Opposite direction
-            lng_variance += curve_factor * random.uniform(-1, 1)
-
-        # Different speed profile
-        if i < 4:
-            speed = 10 + (i * 12)
-        elif i > num_enroute_points - 5:
-            speed = 55 - ((num_enroute_points - i) * 8)
-        else:
-            speed = 48 + random.uniform(-10, 10)
-        speed = max(5, min(speed, 70))
-
-        # Calculate timestamp from ticket2_pickup_complete
-        time_offset = ticket2_pickup_complete + timedelta(minutes=(journey_minutes * progress))
-
-        coords_enroute_2.append({
-            "latitude": base_lat + lat_variance,
-            "longitude": base_lng + lng_variance,
-            "speed": round(speed, 1),
-            "heading": bearing + random.uniform(-8, 8),
-            "event_timestamp": time_offset.isoformat()
-        })
-
-    send_gps_coordinates_batch(truck_2['id'], ticket_2, coords_enroute_2, jo_line_item_id)
-    time.sleep(0.5)
-
-    # 4. GPS at dropoff - 5 points over 12 minutes
-    coords_dropoff_2 = []
-    for i in range(5):
-        lat_offset = random.uniform(-0.00012, 0.00012)
-        lng_offset = random.uniform(-0.00012, 0.00012)
-        time_offset = ticket2_dropoff_complete - timedelta(minutes=12-(i*2.5))
-        coords_dropoff_2.append({
-            "latitude": dropoff_coords['lat'] + lat_offset,
-            "longitude": dropoff_coords['lng'] + lng_offset,
-            "speed": 0,
-            "heading": bearing,
-            "event_timestamp": time_offset.isoformat()
-        })
-    send_gps_coordinates_batch(truck_2['id'], ticket_2, coords_dropoff_2, jo_line_item_id)
-    time.sleep(0.5)
-
-    # 5. DropOffCompleted (no tonnage - hours calculated by timer)
-    success, _ = sync_device_action("DropOffCompleted", ticket_2, jo_line_item_id, truck_2['id'],
-                                    dropoff_coords['lat'], dropoff_coords['lng'],
-                                    event_timestamp=ticket2_dropoff_complete.isoformat())
-    if not success:
-        print(f"  ⚠️ DropOffCompleted failed for {truck_2['device_name']}")
-    time.sleep(0.5)
-
-    # 6. Close sub-ticket with tonnage (20 tons) - ONLY FOR HOURLY JOBS
-    #    DELAY: Wait to spread timestamps
-    print(f"  ⏳ Waiting 65 seconds before closing sub-ticket for Truck 2...")
-    time.sleep(65)
-
-    if job_uom == 1 and subticket_2_id:  # Only close sub-tickets for hourly jobs
-        close_payload = {
-            "weight": 20.0,  # 20 tons delivered
-        }
-        headers = {
-            "Authorization": f"Token {AUTH_TOKEN}",
-            "Content-Type": "application/json"
-        }
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/api/2/tickets/{subticket_2_id}/close",
-                json=close_payload,
-                headers=headers
-            )
-            if response.status_code in [200, 201]:
-                print(f"  ✅ Closed sub-ticket #{subticket_2_id} with 20 tons on {truck_2['device_name']}")
-                # Upload hourly ticket photo to sub-ticket
-                upload_ticket_photo(subticket_2_id, "hourly", "Hourly job tonnage delivery")
-            else:
-                print(f"  ⚠️ Sub-ticket close failed: {response.status_code} - {response.text}")
-        except Exception as e:
-            print(f"  ⚠️ Sub-ticket close error: {e}")
-        time.sleep(0.5)
+        # Journaled as done once the return leg / final position is synced
+        trip_checkpoint_after_sync(phase="done")
 
-    # 7. Close parent ticket via web API (for hourly jobs)
-    #    Mobile app uses web API for STANDALONE hourly jobs, not device sync
-    #    DELAY: Wait to spread timestamps
-    print(f"  ⏳ Waiting 50 seconds before closing parent ticket for Truck 2...")
-    time.sleep(50)
+    trips.end()
 
-    if job_uom == 1:  # Hourly jobs
-        success = close_ticket_via_web_api(
-            ticket_id=ticket_2,
-            coordinates={"latitude": dropoff_coords['lat'], "longitude": dropoff_coords['lng']}
-        )
-        if success:
-            print(f"  ✅ Closed parent ticket #{ticket_2} on {truck_2['device_name']}")
-            # Upload timesheet photo to parent ticket
-            upload_ticket_photo(ticket_2, "timesheets", "Timesheet photo")
-        else:
-            print(f"  ⚠️ Parent ticket close failed for {truck_2['device_name']}")
-    else:
-        # For non-hourly jobs, use device sync
-        success, _ = sync_device_action("ticketClosed", ticket_2, jo_line_item_id, truck_2['id'],
-                                        dropoff_coords['lat'], dropoff_coords['lng'],
-                                        event_timestamp=ticket2_close_time.isoformat())
-        if success:
-            # Upload photo based on job type (tonnage or ATP)
-            photo_type = "tonnage" if job_uom == 2 else "atp"
-            upload_ticket_photo(ticket_2, photo_type, f"Delivery ticket photo")
-        else:
-            print(f"  ⚠️ ticketClosed failed for {truck_2['device_name']}")
-    time.sleep(0.5)
-
-    # 8. GPS showing truck CURRENTLY returning from dropoff to pickup (last 10 minutes to now)
-    # This simulates the truck actively driving back right now
-    coords_return_journey_2 = []
-    num_return_points = 25
-    return_journey_start = datetime.now(timezone.utc) - timedelta(minutes=10)
-
-    for i in range(num_return_points):
-        progress = i / (num_return_points - 1) if num_return_points > 1 else 0
-        # Interpolate from dropoff back to pickup
-        lat = dropoff_coords['lat'] + (pickup_coords['lat'] - dropoff_coords['lat']) * progress
-        lng = dropoff_coords['lng'] + (pickup_coords['lng'] - dropoff_coords['lng']) * progress
-
-        # Add realistic path variation
-        if 0.1 < progress < 0.9:
-            lat += random.uniform(-0.0004, 0.0004)
-            lng += random.uniform(-0.0004, 0.0004)
-
-        # Speed variation (accelerating from 0, cruising, then decelerating)
-        if progress < 0.1:
-            speed = random.uniform(5, 15)
-        elif progress > 0.85:
-            speed = random.uniform(10, 25)
-        else:
-            speed = random.uniform(35, 45)
-
-        timestamp = return_journey_start + timedelta(minutes=10 * progress)
-
-        coords_return_journey_2.append({
-            "latitude": lat,
-            "longitude": lng,
-            "speed": speed,
-            "heading": (bearing + 180) % 360,  # Opposite direction
-            "event_timestamp": timestamp.isoformat()
-        })
-
-    send_gps_coordinates_batch(truck_2['id'], ticket_2, coords_return_journey_2, jo_line_item_id)
-    print(f"    📍 Sent {len(coords_return_journey_2)} GPS points for return journey (last 10 min)")
-    time.sleep(0.5)
-
-    # 9. GPS at pickup (just arrived, last 2 minutes)
-    coords_back_pickup_2 = []
-    for i in range(8):
-        coords_back_pickup_2.append({
-            "latitude": pickup_coords['lat'] + random.uniform(-0.00012, 0.00012),
-            "longitude": pickup_coords['lng'] + random.uniform(-0.00012, 0.00012),
-            "speed": 0,
-            "heading": bearing,
-            "event_timestamp": (datetime.now(timezone.utc) - timedelta(seconds=120 - i*15)).isoformat()
-        })
-    send_gps_coordinates_batch(truck_2['id'], ticket_2, coords_back_pickup_2, jo_line_item_id)
-    print(f"    📍 Sent {len(coords_back_pickup_2)} GPS points at pickup (current position)")
-
-    # ===== TRUCK 3: En route with OPEN ticket (PickupCompleted only) =====
-    ticket_3 = created_tickets[2]
-    truck_3 = trucks[2]
-    print(f"  📍 {truck_3['device_name']}: En route - OPEN ticket")
-
-    # Timestamps for ongoing trip (started 40 minutes ago, still en route)
-    ticket3_open_time = datetime.now(timezone.utc) - timedelta(minutes=40)
-    ticket3_pickup_complete = datetime.now(timezone.utc) - timedelta(minutes=25)
-
-    # 1. GPS at pickup (loading) - 6 points
-    coords_pickup_3 = []
-    for i in range(6):
-        lat_offset = random.uniform(-0.00013, 0.00013)
-        lng_offset = random.uniform(-0.00013, 0.00013)
-        coords_pickup_3.append({
-            "latitude": pickup_coords['lat'] + lat_offset,
-            "longitude": pickup_coords['lng'] + lng_offset,
-            "speed": 0,
-            "heading": bearing,
-            "event_timestamp": (ticket3_open_time + timedelta(minutes=i*2.5)).isoformat()
-        })
-    send_gps_coordinates_batch(truck_3['id'], ticket_3, coords_pickup_3, jo_line_item_id)
-    time.sleep(0.5)
-
-    # 2. PickupCompleted action (no quantity - hours calculated by timer)
-    success, _ = sync_device_action("PickupCompleted", ticket_3, jo_line_item_id, truck_3['id'],
-                                    pickup_coords['lat'], pickup_coords['lng'],
-                                    event_timestamp=ticket3_pickup_complete.isoformat())
+    # Send whatever GPS is left (return journey / final position / en route trail)
+    success, _ = sync()
+    print(f"   📡 {truck['device_name']}: {sync_session.actions_sent} action(s) and {sync_session.coordinates_sent} GPS points "
+          f"in {sync_session.requests_sent} device sync request(s)")
     if not success:
-        print(f"  ⚠️ PickupCompleted failed for {truck_3['device_name']}")
-    time.sleep(0.5)
+        print(f"   ⚠️ {truck['device_name']}: final device sync failed; its last trip is not marked done")
+        return tickets_created
 
-    # 3. GPS en route (currently ~55% of the way to dropoff) - Truck 3 takes yet another path
-    coords_enroute_3 = []
-    num_enroute_points = 15
-    # Start at 40% progress, end at 55% progress (currently en route)
-    start_progress = 0.40
-    end_progress = 0.55
-    minutes_elapsed = 25  # Time since pickup complete
-
-    for i in range(num_enroute_points):
-        # Calculate progress along this segment
-        segment_progress = i / (num_enroute_points - 1) if num_enroute_points > 1 else 0
-        overall_progress = start_progress + (end_progress - start_progress) * segment_progress
-
-        # Interpolate between pickup and dropoff
-        base_lat = pickup_coords['lat'] + (dropoff_coords['lat'] - pickup_coords['lat']) * overall_progress
-        base_lng = pickup_coords['lng'] + (dropoff_coords['lng'] - pickup_coords['lng']) * overall_progress
-
-        # Third unique route variation pattern
-        lat_variance = random.uniform(-0.00006, 0.00006)
-        lng_variance = random.uniform(-0.00006, 0.00006)
-
-        if 0 < i < num_enroute_points - 1:
-            # Different curve using tangent
-            curve_factor = math.tan((overall_progress - 0.5) * 0.5) * 0.0006
-            lat_variance += curve_factor
-            lng_variance -= curve_factor * 0.5
-
-        # Steady cruising speed with small variations
-        speed = 52 + random.uniform(-6, 8)
-        speed = max(40, min(speed, 68))
-
-        # Calculate timestamp
-        time_offset = ticket3_pickup_complete + timedelta(minutes=(minutes_elapsed * segment_progress))
-
-        coords_enroute_3.append({
-            "latitude": base_lat + lat_variance,
-            "longitude": base_lng + lng_variance,
-            "speed": round(speed, 1),
-            "heading": bearing + random.uniform(-6, 6),
-            "event_timestamp": time_offset.isoformat()
-        })
-
-    send_gps_coordinates_batch(truck_3['id'], ticket_3, coords_enroute_3, jo_line_item_id)
-
-    # NOTE: We do NOT send DropOffCompleted or ticketClosed for Truck3 - ticket stays OPEN
-
-    print(f"  ✅ Truck states configured for job {job_order_id}")
+    if checkpoint_key:
+        checkpoint_journal.record("truck", checkpoint_key, done=True, tickets=tickets_created)
+    return tickets_created
 
 
 def create_single_gps_point(truck_id, truck_name, job_order_id, ticket_id, lat, lng, speed, heading):
@@ -3769,45 +5109,27 @@ def create_single_gps_point(truck_id, truck_name, job_order_id, ticket_id, lat,
         speed: Speed in mph
         heading: Heading in degrees
     """
-    # Generate sensor data
-    sensor_data = generate_sensor_data()
-
     # Create GPS tracking event
     gps_event = {
-        "accelerometer.value": sensor_data["accelerometer"]["value"],
-        "accelerometer.x": sensor_data["accelerometer"]["x"],
-        "accelerometer.y": sensor_data["accelerometer"]["y"],
-        "accelerometer.z": sensor_data["accelerometer"]["z"],
         "datetime": datetime.now(timezone.utc).strftime(DATETIME_FORMAT),
-        "gyroscope.value": sensor_data["gyroscope"]["value"],
-        "gyroscope.x": sensor_data["gyroscope"]["x"],
-        "gyroscope.y": sensor_data["gyroscope"]["y"],
-        "gyroscope.z": sensor_data["gyroscope"]["z"],
         "heading": heading,
         "job_order_id": job_order_id,
         "location": {
             "type": "point",
             "coordinates": [lng, lat]  # GeoJSON format: [longitude, latitude]
         },
-        "magnetometer.value": sensor_data["magnetometer"]["value"],
-        "magnetometer.x": sensor_data["magnetometer"]["x"],
-        "magnetometer.y": sensor_data["magnetometer"]["y"],
-        "magnetometer.z": sensor_data["magnetometer"]["z"],
         "speed": round(speed, 2),
         "ticket_id": ticket_id,
         "truck_id": truck_id,
         "truck_name": truck_name
     }
 
-    try:
-        response = es_client.index(
-            index="truck",
-            body=gps_event
-        )
-        return True
-    except Exception as e:
-        print(f"  ❌ Error indexing GPS point for {truck_name}: {e}")
-        return False
+    # Add accelerometer/gyroscope/magnetometer fields
+    write_sensor_fields([gps_event])
+
+    # Indexing happens in bulk; failures are reported by es_bulk_writer
+    es_bulk_writer.add("truck", gps_event)
+    return True
 
 
 def create_truck_gps_tracking_data(job_order_id, truck_regions, created_tickets=None):
@@ -3839,67 +5161,41 @@ def create_truck_gps_tracking_data(job_order_id, truck_regions, created_tickets=
 
         print(f"Generated {len(route_coords)} GPS coordinates for {truck['device_name']}")
 
+        # Speed (mph, capped 0-80) and heading between consecutive points, derived in one pass
+        kinematics = track_kinematics(
+            [coord['lat'] for coord in route_coords],
+            [coord['lng'] for coord in route_coords],
+            [coord['timestamp'].timestamp() for coord in route_coords]
+        )
+        speeds = [random.uniform(35, 65)] + np.clip(kinematics['speed_mph'], 0, 80).tolist()  # Initial speed
+        headings = [0] + np.round(kinematics['bearing'], 1).tolist()
+
         # Create GPS tracking events in OpenSearch using the exact payload structure specified
+        gps_events = []
         for i, coord in enumerate(route_coords):
-            # Generate sensor data
-            sensor_data = generate_sensor_data()
-
-            # Calculate speed (mph) - varies based on route progress
-            if i > 0:
-                # Calculate speed based on distance and time difference
-                prev_coord = route_coords[i - 1]
-                distance_km = calculate_distance(prev_coord, coord)
-                time_diff_hours = (coord['timestamp'] - prev_coord['timestamp']).total_seconds() / 3600
-                speed_kmh = distance_km / time_diff_hours if time_diff_hours > 0 else 0
-                speed_mph = speed_kmh * 0.621371  # Convert to mph
-                speed = min(max(speed_mph, 0), 80)  # Cap between 0-80 mph
-            else:
-                speed = random.uniform(35, 65)  # Initial speed
-
-            # Calculate heading
-            heading = 0
-            if i > 0:
-                heading = calculate_bearing(route_coords[i - 1], coord)
-
-            # Create GPS tracking event with exact payload structure
-            gps_event = {
-                "accelerometer.value": sensor_data["accelerometer"]["value"],
-                "accelerometer.x": sensor_data["accelerometer"]["x"],
-                "accelerometer.y": sensor_data["accelerometer"]["y"],
-                "accelerometer.z": sensor_data["accelerometer"]["z"],
+            gps_events.append({
                 "datetime": coord['timestamp'].strftime(DATETIME_FORMAT),
-                "gyroscope.value": sensor_data["gyroscope"]["value"],
-                "gyroscope.x": sensor_data["gyroscope"]["x"],
-                "gyroscope.y": sensor_data["gyroscope"]["y"],
-                "gyroscope.z": sensor_data["gyroscope"]["z"],
-                "heading": heading,
+                "heading": headings[i],
                 "job_order_id": job_order_id,
                 "location": {
                     "type": "point",
                     "coordinates": [coord['lng'], coord['lat']]  # GeoJSON format: [longitude, latitude]
                 },
-                "magnetometer.value": sensor_data["magnetometer"]["value"],
-                "magnetometer.x": sensor_data["magnetometer"]["x"],
-                "magnetometer.y": sensor_data["magnetometer"]["y"],
-                "magnetometer.z": sensor_data["magnetometer"]["z"],
-                "speed": round(speed, 2),
+                "speed": round(speeds[i], 2),
                 "ticket_id": ticket_id,
                 "truck_id": truck["id"],
                 "truck_name": truck["device_name"]
-            }
+            })
 
-            try:
-                # Index the GPS event in the "truck" index as specified
-                response = es_client.index(
-                    index="truck",  # Using "truck" index as specified
-                    body=gps_event
-                )
+        # Sensor data for the whole route in one batch
+        write_sensor_fields(gps_events)
 
-                if (i + 1) % 5 == 0:  # Print progress every 5 points
-                    print(f"  Indexed GPS point {i + 1}/{len(route_coords)} for {truck['device_name']}")
+        for i, gps_event in enumerate(gps_events):
+            # Queue the GPS event for the "truck" index as specified
+            es_bulk_writer.add("truck", gps_event)
 
-            except Exception as e:
-                print(f"Error indexing GPS event for {truck['device_name']} at point {i + 1}: {e}")
+            if (i + 1) % 5 == 0:  # Print progress every 5 points
+                print(f"  Queued GPS point {i + 1}/{len(route_coords)} for {truck['device_name']}")
 
         print(f"Completed GPS tracking data for {truck['device_name']}")
 
@@ -3917,357 +5213,1296 @@ def calculate_distance(coord1, coord2):
     Returns:
         float: Distance in kilometers
     """
-    R = 6371  # Earth's radius in kilometers
+    return float(haversine_distance_array(coord1['lat'], coord1['lng'], coord2['lat'], coord2['lng']))
 
-    lat1 = math.radians(coord1['lat'])
-    lat2 = math.radians(coord2['lat'])
-    dlat = math.radians(coord2['lat'] - coord1['lat'])
-    dlng = math.radians(coord2['lng'] - coord1['lng'])
 
-    a = (math.sin(dlat / 2) * math.sin(dlat / 2) +
-         math.cos(lat1) * math.cos(lat2) *
-         math.sin(dlng / 2) * math.sin(dlng / 2))
+# Fleet model: where the simulated trucks come from and how they are split across jobs
+#   static    - the TRUCKS list above (demo trucks that exist in the system)
+#   discover  - trucks listed by /api/2/trucks for COMPANY_ID
+#   synthetic - locally generated trucks (ids from FLEET_SYNTHETIC_ID_START) for load tests
+FLEET_SOURCE = os.environ.get("TRUCKSIM_FLEET_SOURCE", "static")
+FLEET_SIZE = int(os.environ.get("TRUCKSIM_FLEET_SIZE", "0"))  # 0 = whole source (static/discover)
+FLEET_TRUCKS_PER_JOB = int(os.environ.get("TRUCKSIM_FLEET_TRUCKS_PER_JOB", "3"))
+FLEET_SEED = os.environ.get("TRUCKSIM_FLEET_SEED")
+FLEET_SYNTHETIC_ID_START = int(os.environ.get("TRUCKSIM_FLEET_SYNTHETIC_ID_START", "900000"))
+# Device links per second (0 = unlimited). Linking runs before any job starts, so it
+# costs fleet size / rate seconds up front: ~50s for 1,000 trucks at the default 20/s.
+FLEET_LINK_RATE = float(os.environ.get("TRUCKSIM_FLEET_LINK_RATE", "20"))
 
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    distance = R * c
+FINAL_STATES = ["at_dropoff", "at_pickup", "en_route"]
 
-    return distance
 
+def assign_truck_params(truck, rng):
+    """
+    Fill in any missing per-truck simulation params (idle threshold and trip plan)
 
-def main():
-    """Main execution function with controlled setup"""
+    Args:
+        truck: Truck dict with at least 'id' and 'device_name'
+        rng: random.Random used to draw the params
 
-    global AUTH_TOKEN
+    Returns:
+        dict: The same truck dict
+    """
+    truck.setdefault("idle_threshold", round(rng.uniform(15.0, 25.0), 1))
+    truck.setdefault("num_trips", rng.randint(2, 5))
+    truck.setdefault("final_state", rng.choice(FINAL_STATES))
+    truck.setdefault("truck_offset_minutes", rng.choice([0, 15, 30, 45, 60, 75, 90]))
+    return truck
 
-    print("🚀 Starting controlled job order and ticket creation process...")
 
-    # 🔐 Step 0: Authenticate WITHOUT device info
-    AUTH_TOKEN = authenticate_without_device()
-    if not AUTH_TOKEN:
-        print("❌ Initial authentication failed. Aborting.")
-        return
+def truck_trip_plan(truck):
+    """The trip params of a truck, in the shape setup_truck_with_multiple_trips takes"""
+    return {
+        "num_trips": truck["num_trips"],
+        "final_state": truck["final_state"],
+        "truck_offset_minutes": truck["truck_offset_minutes"]
+    }
 
-    # 🧹 Step 0.5: Close all active/not started job orders from prior days
-    print("\n🧹 Checking for prior day job orders to close...")
-    close_prior_day_jobs()
 
-    # Step 1: Check if "Demo Script Project" exists, create if not
-    print("\n📁 Checking for Demo Script Project - Restricted Customer...")
-    project_id = None
-    project_data = None
+def build_fleet(source=FLEET_SOURCE, size=FLEET_SIZE, seed=FLEET_SEED):
+    """
+    Build the list of trucks to simulate.
+
+    Args:
+        source: "static", "discover" or "synthetic"
+        size: Number of trucks (0 = everything the source has; required for synthetic)
+        seed: Optional seed so generated params are reproducible
+
+    Returns:
+        list: Truck dicts with id, device_name, idle_threshold and trip params
+    """
+    rng = random.Random(seed)
+
+    if source == "static":
+        trucks = [dict(truck) for truck in TRUCKS]
+    elif source == "discover":
+        company_trucks = get_company_trucks() or []
+        trucks = [
+            {
+                "id": truck.get("id"),
+                "device_name": truck.get("name") or truck.get("deviceName") or f"Truck {truck.get('id')}"
+            }
+            for truck in company_trucks if truck.get("id")
+        ]
+    elif source == "synthetic":
+        if size <= 0:
+            raise ValueError("A synthetic fleet needs a size (TRUCKSIM_FLEET_SIZE / --fleet-size)")
+        trucks = [
+            {"id": FLEET_SYNTHETIC_ID_START + i, "device_name": f"Sim Truck {i + 1}"}
+            for i in range(size)
+        ]
+    else:
+        raise ValueError(f"Unknown fleet source: {source}")
+
+    if size > 0:
+        if size > len(trucks):
+            print(f"⚠️ Requested {size} trucks but the {source} fleet only has {len(trucks)}")
+        trucks = trucks[:size]
+
+    for truck in trucks:
+        assign_truck_params(truck, rng)
+
+    print(f"🚚 Fleet: {len(trucks)} {source} truck(s)")
+    return trucks
+
+
+def partition_fleet(trucks, jobs, repeat_jobs=(), trucks_per_job=FLEET_TRUCKS_PER_JOB):
+    """
+    Split the fleet into job assignments.
+
+    Jobs take trucks in order, each as many as its "trucks" count (or
+    trucks_per_job when it has none); assignment stops at the first job the
+    remaining fleet cannot fill. Further full groups cycle through
+    repeat_jobs, and a trailing partial group stays unassigned. With the
+    default scenario and the 9 static trucks this is trucks 0-2 (active),
+    3-5 (closed) and 6 (pending).
+
+    Args:
+        trucks: Fleet from build_fleet()
+        jobs: Job definitions from a compiled scenario plan
+        repeat_jobs: Job definitions that take the leftover trucks, in turn
+        trucks_per_job: Group size for jobs without a "trucks" count
+
+    Returns:
+        list: (job, trucks) tuples
+    """
+    trucks_per_job = max(1, trucks_per_job)
+
+    def group_size(job):
+        return trucks_per_job if job.get("trucks") is None else job["trucks"]
+
+    assignments = []
+    index = 0
+    for job in jobs:
+        size = group_size(job)
+        if len(trucks) - index < size:
+            return assignments
+        assignments.append((job, trucks[index:index + size]))
+        index += size
+
+    repeat_jobs = [job for job in repeat_jobs if group_size(job) > 0]
+    turn = 0
+    while repeat_jobs and len(trucks) - index >= group_size(repeat_jobs[turn % len(repeat_jobs)]):
+        job = repeat_jobs[turn % len(repeat_jobs)]
+        assignments.append((job, trucks[index:index + group_size(job)]))
+        index += group_size(job)
+        turn += 1
+    return assignments
+
+
+def link_fleet_to_device(trucks, workers=SIM_CONCURRENCY, rate=FLEET_LINK_RATE):
+    """
+    Link every truck to the authenticated device on a worker pool, rate limited
+
+    Each successful link is journaled, so a resumed run only relinks the
+    trucks that were not linked before.
 
-    # First try searching by keywords
-    headers = {"Authorization": f"Token {AUTH_TOKEN}", "Content-Type": "application/json"}
+    Returns:
+        list: IDs of the trucks that could not be linked (empty when all were)
+    """
+    pending = [truck for truck in trucks if not checkpoint_journal.get("link", truck['id']).get("linked")]
+    if len(pending) < len(trucks):
+        print(f"↩️ {len(trucks) - len(pending)} truck(s) were linked in a previous run")
+
+    limiter = RateLimiter(rate)
+    if rate > 0 and pending:
+        print(f"🔗 Linking {len(pending)} truck(s) at {rate:g}/s (~{len(pending) / rate:.0f}s)")
+
+    def link(truck):
+        limiter.acquire()
+        linked = link_truck_to_device(truck['id'])
+        if linked:
+            checkpoint_journal.record("link", truck['id'], linked=True)
+        return linked
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(tracer.bind(link), pending))
+    failed = [truck['id'] for truck, linked in zip(pending, results) if not linked]
+    print(f"🔗 Linked {len(trucks) - len(failed)}/{len(trucks)} truck(s) to device")
+    if failed:
+        shown = ", ".join(str(truck_id) for truck_id in failed[:10])
+        more = f" (+{len(failed) - 10} more)" if len(failed) > 10 else ""
+        print(f"⚠️ {len(failed)} truck(s) could not be linked: {shown}{more}")
+    return failed
+
+
+# Scenarios: what main() provisions and simulates, as data instead of code.
+# A scenario (JSON, or YAML when PyYAML is installed) names the project, sites,
+# purchase orders, fleet and jobs. compile_scenario() validates it and folds
+# duplicate sites/POs into a plan; add_scenario_steps() turns the plan into
+# workflow steps. `--dump-scenario` prints the built-in default, which
+# reproduces the classic demo run, as a template.
+SCENARIO_FILE = os.environ.get("TRUCKSIM_SCENARIO")
+
+UNITS_OF_MEASURE = {"hour": 1, "ton": 2, "load": 4}
+LOAD_UOM = UNITS_OF_MEASURE["load"]
+SITE_TYPES = ["plant", "dump"]
+
+DEFAULT_SCENARIO = {
+    "project": {
+        "name": "Demo Script Project - Restricted Customer",
+        "keywords": "Demo Script Project"
+    },
+    # Fleet settings (source, size, seed, trucks_per_job, link_rate) left out (or null)
+    # fall back to the CLI flags / TRUCKSIM_FLEET_* env vars
+    "fleet": {},
+    "sites": {
+        "atlanta": {
+            "name": "Demo Pickup Site - Atlanta",
+            "address": "123 Peachtree St NE, Atlanta, GA 30303",
+            "latitude": 33.7490,
+            "longitude": -84.3880,
+            "site_type": "plant"
+        },
+        "marietta": {
+            "name": "Demo Dropoff Site - Marietta",
+            "address": "2900 Delk Rd SE, Marietta, GA 30067",
+            "latitude": 33.9526,
+            "longitude": -84.4681,
+            "site_type": "dump"
+        },
+        # Tonnage job sites (different from hourly job)
+        "decatur": {
+            "name": "Demo Tonnage Pickup - Decatur",
+            "address": "315 W Ponce de Leon Ave, Decatur, GA 30030",
+            "latitude": 33.7748,
+            "longitude": -84.2963,
+            "site_type": "plant"
+        },
+        "sandy_springs": {
+            "name": "Demo Tonnage Dropoff - Sandy Springs",
+            "address": "6600 Roswell Rd NE, Sandy Springs, GA 30328",
+            "latitude": 33.9304,
+            "longitude": -84.3733,
+            "site_type": "dump"
+        }
+    },
+    "purchase_orders": {
+        "hourly": {"po_name": "Hourly PO", "uom": "hour", "pickup": "atlanta", "dropoff": "marietta"},
+        "tonnage": {"po_name": "Tonnage PO", "uom": "ton", "pickup": "decatur", "dropoff": "sandy_springs"},
+        "load": {"po_name": "Load PO", "uom": "load", "pickup": "atlanta", "dropoff": "marietta"}
+    },
+    # Jobs take trucks from the fleet in this order ("trucks" defaults to trucks_per_job).
+    # "trips" (optional) overrides the trucks' own trip params: a fixed value,
+    # a [low, high] range (num_trips, truck_offset_minutes) or a list of
+    # final states to pick from.
+    "jobs": [
+        {
+            # Active Hourly job (will have tickets created and left open)
+            "key": "active",
+            "name": "Active",
+            "label": "1️⃣ Creating ACTIVE job order (Hourly)...",
+            "po": "hourly",
+            "quantity": 35.0,  # Realistic: 3 trucks * ~11-12 hours each
+            "open_tickets": True,
+            # Open tickets 90 minutes ago to match the journey start time
+            "ticket_open_minutes_ago": 90,
+            "close_after": False,
+            "idle_alerts": True,
+            "air_tickets": True
+        },
+        {
+            # Closed Tonnage job (will have tickets created and closed)
+            "key": "closed",
+            "name": "Closed",
+            "label": "2️⃣ Creating CLOSED job order (Tonnage)...",
+            "po": "tonnage",
+            "quantity": 350.0,  # Request more than will be delivered (realistic variance)
+            "open_tickets": True,
+            "close_after": True
+        },
+        {
+            # Pending Load-based job (no tickets created)
+            # Load-based jobs can only have 0 or 1 truck assigned
+            "key": "pending",
+            "name": "Pending",
+            "label": "3️⃣ Creating PENDING job order (Load-based)...",
+            "po": "load",
+            "quantity": 50.0,  # Realistic number of loads
+            "trucks": 1,
+            "open_tickets": False,
+            "close_after": False
+        }
+    ],
+    # Leftover full groups of trucks (large fleets) run copies of these jobs in turn
+    "repeat_jobs": ["active", "closed"]
+}
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; JSON scenarios always work
+    yaml = None
+
+
+def load_scenario(path=None):
+    """
+    Read a scenario file, or return a copy of DEFAULT_SCENARIO when path is empty
+
+    Raises:
+        ValueError: If the file cannot be read or parsed
+    """
+    if not path:
+        return json.loads(json.dumps(DEFAULT_SCENARIO))
+
+    path = Path(path)
     try:
-        search_response = requests.get(
-            f"{API_BASE_URL}/api/2/projects?keywords=Demo Script Project&paginate=false",
-            headers=headers
+        text = path.read_text()
+    except OSError as e:
+        raise ValueError(f"cannot read scenario {path}: {e}")
+
+    if path.suffix.lower() in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError(f"{path} is YAML but PyYAML is not installed (pip install pyyaml, or use JSON)")
+        try:
+            scenario = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"cannot parse {path}: {e}")
+    else:
+        try:
+            scenario = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"cannot parse {path}: {e}")
+
+    if not isinstance(scenario, dict):
+        raise ValueError(f"{path} must contain a mapping at the top level")
+    return scenario
+
+
+def _validate_trips(where, trips, errors):
+    """Check a job's "trips" override (a mapping, or a list of mappings applied per truck)"""
+    for entry in trips if isinstance(trips, list) else [trips]:
+        if not isinstance(entry, dict):
+            errors.append(f"{where}: trips entries must be mappings")
+            continue
+        for field in entry:
+            if field not in ("num_trips", "final_state", "truck_offset_minutes"):
+                errors.append(f"{where}: unknown trips field '{field}'")
+        for field, minimum in (("num_trips", 1), ("truck_offset_minutes", 0)):
+            value = entry.get(field)
+            bounds = value if isinstance(value, list) else [value]
+            if value is None:
+                continue
+            if (len(bounds) not in (1, 2) or not all(isinstance(bound, int) for bound in bounds)
+                    or min(bounds) < minimum or bounds[0] > bounds[-1]):
+                errors.append(f"{where}: trips.{field} must be an integer >= {minimum} or a [low, high] range")
+        states = entry.get("final_state")
+        if states is not None:
+            states = states if isinstance(states, list) else [states]
+            unknown = [state for state in states if state not in FINAL_STATES]
+            if not states or unknown:
+                errors.append(f"{where}: trips.final_state must be one or more of {FINAL_STATES}")
+
+
+def compile_scenario(scenario):
+    """
+    Validate a scenario and compile it into an execution plan.
+
+    Sites with the same name are folded into one (they resolve to the same
+    site anyway), as are purchase orders with the same UOM, since
+    get_or_create_purchase_order reuses one PO per project and UOM. After
+    that every site and PO in the plan is distinct, so their steps can run
+    side by side.
+
+    Args:
+        scenario: Scenario mapping (see DEFAULT_SCENARIO)
+
+    Returns:
+        dict: Plan with project, fleet, sites, purchase_orders, jobs,
+              repeat_jobs and warnings
+
+    Raises:
+        ValueError: Listing every problem found
+    """
+    errors = []
+    warnings = []
+
+    project = scenario.get("project")
+    if isinstance(project, str):
+        project = {"name": project}
+    if not isinstance(project, dict) or not project.get("name"):
+        errors.append("project: a project name is required")
+        project = {}
+
+    fleet = scenario.get("fleet") or {}
+    if not isinstance(fleet, dict):
+        errors.append("fleet: must be a mapping")
+        fleet = {}
+    for field in fleet:
+        if field not in ("source", "size", "seed", "trucks_per_job", "link_rate"):
+            errors.append(f"fleet: unknown field '{field}'")
+    if fleet.get("source") not in (None, "static", "discover", "synthetic"):
+        errors.append(f"fleet.source: unknown source '{fleet['source']}'")
+    for field in ("size", "trucks_per_job"):
+        if fleet.get(field) is not None and (not isinstance(fleet[field], int) or fleet[field] < 0):
+            errors.append(f"fleet.{field}: must be a non-negative integer")
+    link_rate = fleet.get("link_rate")
+    if link_rate is not None and (isinstance(link_rate, bool) or not isinstance(link_rate, (int, float)) or link_rate < 0):
+        errors.append("fleet.link_rate: must be a non-negative number (links per second, 0 = unlimited)")
+
+    # Sites, folded by name
+    sites = {}
+    site_aliases = {}
+    sites_by_name = {}
+    raw_sites = scenario.get("sites") or {}
+    if not isinstance(raw_sites, dict) or not raw_sites:
+        errors.append("sites: at least one site is required")
+        raw_sites = {}
+    for key, site in raw_sites.items():
+        where = f"sites.{key}"
+        if not isinstance(site, dict):
+            errors.append(f"{where}: must be a mapping")
+            continue
+        site = {"site_type": "plant", **site}
+        problems = [field for field in ("name", "address") if not isinstance(site.get(field), str) or not site[field]]
+        problems += [field for field in ("latitude", "longitude")
+                     if isinstance(site.get(field), bool) or not isinstance(site.get(field), (int, float))]
+        if problems:
+            errors.append(f"{where}: missing or invalid {', '.join(problems)}")
+            continue
+        if not (-90 <= site["latitude"] <= 90 and -180 <= site["longitude"] <= 180):
+            errors.append(f"{where}: coordinates out of range")
+            continue
+        if site["site_type"] not in SITE_TYPES:
+            errors.append(f"{where}: site_type must be one of {SITE_TYPES}")
+            continue
+
+        existing_key = sites_by_name.get(site["name"])
+        if existing_key is None:
+            sites_by_name[site["name"]] = key
+            sites[key] = site
+            site_aliases[key] = key
+        elif sites[existing_key] == site:
+            site_aliases[key] = existing_key
+            warnings.append(f"{where}: same site as sites.{existing_key}, created once")
+        else:
+            errors.append(f"{where}: name '{site['name']}' is already used by sites.{existing_key} with different details")
+
+    # Purchase orders, folded by UOM
+    purchase_orders = {}
+    po_aliases = {}
+    po_definitions = {}
+    pos_by_uom = {}
+    raw_pos = scenario.get("purchase_orders") or {}
+    if not isinstance(raw_pos, dict) or not raw_pos:
+        errors.append("purchase_orders: at least one purchase order is required")
+        raw_pos = {}
+    for key, po in raw_pos.items():
+        where = f"purchase_orders.{key}"
+        if not isinstance(po, dict):
+            errors.append(f"{where}: must be a mapping")
+            continue
+        uom = po.get("uom")
+        uom_id = UNITS_OF_MEASURE.get(uom, uom)
+        if uom_id not in UNITS_OF_MEASURE.values():
+            errors.append(f"{where}: uom must be one of {list(UNITS_OF_MEASURE)}")
+            continue
+        pickup = site_aliases.get(po.get("pickup"))
+        dropoff = site_aliases.get(po.get("dropoff"))
+        if pickup is None or dropoff is None:
+            errors.append(f"{where}: pickup and dropoff must name sites")
+            continue
+
+        definition = {
+            "po_name": po.get("po_name") or key,
+            "uom": uom_id,
+            "pickup": pickup,
+            "dropoff": dropoff,
+            "quantity": po.get("quantity")
+        }
+        po_definitions[key] = definition
+        existing_key = pos_by_uom.get(uom_id)
+        if existing_key is None:
+            pos_by_uom[uom_id] = key
+            purchase_orders[key] = definition
+            po_aliases[key] = key
+        else:
+            po_aliases[key] = existing_key
+            warnings.append(f"{where}: same UOM as purchase_orders.{existing_key}, both resolve to one PO")
+
+    # Jobs
+    jobs = []
+    jobs_by_key = {}
+    raw_jobs = scenario.get("jobs") or []
+    if not isinstance(raw_jobs, list) or not raw_jobs:
+        errors.append("jobs: at least one job is required")
+        raw_jobs = []
+    for position, job in enumerate(raw_jobs):
+        if not isinstance(job, dict):
+            errors.append(f"jobs[{position}]: must be a mapping")
+            continue
+        key = job.get("key")
+        where = f"jobs.{key}" if key else f"jobs[{position}]"
+        if not key or not isinstance(key, str):
+            errors.append(f"{where}: a key is required")
+            continue
+        if key in jobs_by_key:
+            errors.append(f"{where}: duplicate job key")
+            continue
+        po_definition = po_definitions.get(job.get("po"))
+        if po_definition is None:
+            errors.append(f"{where}: po must name a purchase order")
+            continue
+        quantity = job.get("quantity")
+        if isinstance(quantity, bool) or not isinstance(quantity, (int, float)) or quantity <= 0:
+            errors.append(f"{where}: quantity must be a positive number")
+            continue
+        trucks = job.get("trucks")
+        if trucks is not None and (isinstance(trucks, bool) or not isinstance(trucks, int) or trucks < 0):
+            errors.append(f"{where}: trucks must be a non-negative integer")
+            continue
+        if po_definition["uom"] == LOAD_UOM and (trucks is None or trucks > 1):
+            errors.append(f"{where}: load-based jobs can only have 0 or 1 truck (set \"trucks\": 1)")
+            continue
+        pickup = site_aliases.get(job.get("pickup", po_definition["pickup"]))
+        dropoff = site_aliases.get(job.get("dropoff", po_definition["dropoff"]))
+        if pickup is None or dropoff is None:
+            errors.append(f"{where}: pickup and dropoff must name sites")
+            continue
+        if job.get("trips") is not None:
+            _validate_trips(where, job["trips"], errors)
+
+        name = job.get("name") or key.replace("_", " ").title()
+        open_tickets = bool(job.get("open_tickets", True))
+        compiled = {
+            "key": key,
+            "name": name,
+            "label": job.get("label") or f"Creating {name.upper()} job order...",
+            "po": po_aliases[job["po"]],
+            "pickup": pickup,
+            "dropoff": dropoff,
+            "quantity": float(quantity),
+            "trucks": trucks,
+            "open_tickets": open_tickets,
+            "ticket_open_minutes_ago": job.get("ticket_open_minutes_ago"),
+            "close_after": bool(job.get("close_after", False)),
+            "activity_events": bool(job.get("activity_events", open_tickets)),
+            "idle_alerts": bool(job.get("idle_alerts", False)),
+            "air_tickets": bool(job.get("air_tickets", False)),
+            "trips": job.get("trips")
+        }
+        jobs.append(compiled)
+        jobs_by_key[key] = compiled
+
+    repeat_jobs = []
+    for key in scenario.get("repeat_jobs") or []:
+        job = jobs_by_key.get(key)
+        if job is None:
+            errors.append(f"repeat_jobs: '{key}' is not a job key")
+        elif job["trucks"] == 0:
+            errors.append(f"repeat_jobs: '{key}' has no trucks to repeat with")
+        else:
+            repeat_jobs.append(job)
+
+    if errors:
+        raise ValueError("\n  - " + "\n  - ".join(errors))
+
+    # Only provision what the jobs use
+    used_pos = {job["po"] for job in jobs}
+    purchase_orders = {key: po for key, po in purchase_orders.items() if key in used_pos}
+    used_sites = {job[end] for job in jobs for end in ("pickup", "dropoff")}
+    used_sites |= {po[end] for po in purchase_orders.values() for end in ("pickup", "dropoff")}
+    sites = {key: site for key, site in sites.items() if key in used_sites}
+
+    return {
+        "project": project,
+        "fleet": fleet,
+        "sites": sites,
+        "purchase_orders": purchase_orders,
+        "jobs": jobs,
+        "repeat_jobs": repeat_jobs,
+        "warnings": warnings
+    }
+
+
+def _draw_trip_param(value, rng):
+    """A fixed value, a random pick from a list of choices, or a random int from a [low, high] range"""
+    if not isinstance(value, list):
+        return value
+    if all(isinstance(item, int) for item in value) and len(value) == 2:
+        return rng.randint(value[0], value[1])
+    return rng.choice(value)
+
+
+def job_trip_plans(job, trucks, seed=None):
+    """
+    Trip params for each truck of a job: the truck's own, overridden by the job's "trips"
+
+    Overrides are drawn from a generator seeded per job, so a seeded run is reproducible.
+    """
+    if not job["trips"]:
+        return [truck_trip_plan(truck) for truck in trucks]
+
+    rng = random.Random(f"{seed}:{job['key']}" if seed is not None else None)
+    overrides = job["trips"] if isinstance(job["trips"], list) else [job["trips"]]
+    plans = []
+    for position, truck in enumerate(trucks):
+        plan = truck_trip_plan(truck)
+        for field, value in overrides[position % len(overrides)].items():
+            plan[field] = _draw_trip_param(value, rng)
+        plans.append(plan)
+    return plans
+
+
+def build_job_specs(plan, resources, trucks, trucks_per_job=FLEET_TRUCKS_PER_JOB, seed=None):
+    """
+    Assign the fleet to the plan's jobs and build the job specs start_job() runs
+
+    Returns:
+        list: Job spec dicts, keyed "<job key>" and "<job key>_<n>" for repeats
+    """
+    sites = resources["sites"]
+    purchase_orders = resources["purchase_orders"]
+
+    def site_coords(key):
+        site_id, site_data = sites[key]
+        site = plan["sites"][key]
+        return {
+            "lat": (site_data or {}).get("latitude", site["latitude"]),
+            "lng": (site_data or {}).get("longitude", site["longitude"]),
+            "site_id": site_id
+        }
+
+    job_specs = []
+    job_counts = {}
+    for job, job_trucks in partition_fleet(trucks, plan["jobs"], plan["repeat_jobs"], trucks_per_job):
+        count = job_counts[job["key"]] = job_counts.get(job["key"], 0) + 1
+        job_spec = dict(
+            job,
+            pickup_site_id=sites[job["pickup"]][0],
+            dropoff_site_id=sites[job["dropoff"]][0],
+            po_line_item_id=purchase_orders[job["po"]][1],
+            pickup_coords=site_coords(job["pickup"]),
+            dropoff_coords=site_coords(job["dropoff"]),
+            trucks=job_trucks
         )
-        if search_response.status_code == 200:
-            search_results = search_response.json().get("data", [])
-            for project in search_results:
-                if project.get('name') == 'Demo Script Project - Restricted Customer':
-                    project_id = project.get('id')
-                    project_data = project
-                    print(f"✅ Found existing Demo Script Project - Restricted Customer (ID: {project_id})")
-                    break
-    except Exception as e:
-        print(f"⚠️ Error searching for project: {e}")
-
-    # If not found, get all projects and check
-    if not project_id:
-        projects = get_projects()
-        if projects:
-            for project in projects:
-                if project.get('name') == 'Demo Script Project - Restricted Customer':
-                    project_id = project.get('id')
-                    project_data = project
-                    print(f"✅ Found existing Demo Script Project - Restricted Customer (ID: {project_id})")
-                    break
-
-    if not project_id:
-        print("📁 Creating Demo Script Project - Restricted Customer...")
-        project_id, project_data = create_project("Demo Script Project - Restricted Customer")
-        if not project_id:
-            print("❌ Project creation failed. Aborting.")
-            return
-        print(f"✅ Created Demo Script Project - Restricted Customer (ID: {project_id})")
-
-    # Step 2: Create two sites in Atlanta
-    print("\n🏭 Creating pickup site in Atlanta...")
-    pickup_site_id, pickup_site_data = create_site(
-        name="Demo Pickup Site - Atlanta",
-        address="123 Peachtree St NE, Atlanta, GA 30303",
-        latitude=33.7490,
-        longitude=-84.3880,
-        site_type="plant"
-    )
-    if not pickup_site_id:
-        print("❌ Pickup site creation failed. Aborting.")
-        return
+        if count > 1:
+            # Repeats run the same job on more trucks; per-run extras stay with the first one
+            job_spec.update(
+                key=f"{job['key']}_{count}",
+                name=f"{job['name']} #{count}",
+                label=f"➕ Creating {job['key'].upper()} job order #{count}...",
+                idle_alerts=False,
+                air_tickets=False
+            )
+        # Jobs without tickets have no trips
+        job_spec["trips"] = job_trip_plans(job, job_trucks, seed) if job["open_tickets"] else []
+        job_specs.append(job_spec)
+    return job_specs
 
-    print("\n🏗️ Creating dropoff site in Marietta (north of Atlanta)...")
-    dropoff_site_id, dropoff_site_data = create_site(
-        name="Demo Dropoff Site - Marietta",
-        address="2900 Delk Rd SE, Marietta, GA 30067",
-        latitude=33.9526,
-        longitude=-84.4681,
-        site_type="dump"
-    )
-    if not dropoff_site_id:
-        print("❌ Dropoff site creation failed. Aborting.")
-        return
 
-    # Tonnage job sites (different from hourly job)
-    print("\n🏭 Creating tonnage pickup site in Decatur (east of Atlanta)...")
-    tonnage_pickup_site_id, tonnage_pickup_site_data = create_site(
-        name="Demo Tonnage Pickup - Decatur",
-        address="315 W Ponce de Leon Ave, Decatur, GA 30030",
-        latitude=33.7748,
-        longitude=-84.2963,
-        site_type="plant"
-    )
-    if not tonnage_pickup_site_id:
-        print("❌ Tonnage pickup site creation failed. Aborting.")
-        return
+class StepGraph:
+    """
+    Runs workflow steps as a dependency graph on a worker pool.
+
+    Each step is a no-argument callable. A step starts as soon as everything it
+    waits for has finished, so independent steps overlap and the wall time
+    follows the longest dependency chain (the critical path) instead of the
+    sum of all steps. With one worker, steps run one at a time in the order
+    they were added (as far as their dependencies allow).
+
+    deps are hard dependencies: if one fails or is skipped, the step is
+    skipped too. after is ordering only: the step waits for those steps but
+    runs whatever their outcome. Steps added with resume=True record their
+    result in the checkpoint journal, and reuse it instead of running again
+    when the run is resumed.
+    """
 
-    print("\n🏗️ Creating tonnage dropoff site in Sandy Springs (north-west of Atlanta)...")
-    tonnage_dropoff_site_id, tonnage_dropoff_site_data = create_site(
-        name="Demo Tonnage Dropoff - Sandy Springs",
-        address="6600 Roswell Rd NE, Sandy Springs, GA 30328",
-        latitude=33.9304,
-        longitude=-84.3733,
-        site_type="dump"
-    )
-    if not tonnage_dropoff_site_id:
-        print("❌ Tonnage dropoff site creation failed. Aborting.")
-        return
+    def __init__(self, workers=SIM_CONCURRENCY, journal=None):
+        self.workers = max(1, workers)
+        self.journal = journal
+        self.steps = {}
+        self.results = {}
+        self.status = {}
+        self.timings = {}
+        self.wall_time = 0.0
+
+    def add(self, name, func, deps=(), after=(), check=None, resume=False):
+        """
+        Add a step
+
+        Args:
+            name: Unique step name
+            func: Callable run with no arguments; its return value goes to results[name]
+            deps: Steps that must succeed first
+            after: Steps that must finish first, successfully or not
+            check: Optional predicate on the return value; False marks the step failed
+            resume: Journal the (JSON-serialisable) result and reuse it on resume
+        """
+        if name in self.steps:
+            raise ValueError(f"duplicate step: {name}")
+        self.steps[name] = {"func": func, "deps": list(deps), "after": list(after), "check": check, "resume": resume}
+        return name
+
+    def ok(self, name):
+        """Whether a step ran and succeeded"""
+        return self.status.get(name) == "ok"
+
+    def _waits_for(self, name):
+        step = self.steps[name]
+        return step["deps"] + step["after"]
+
+    def _check_graph(self):
+        """Raise ValueError on unknown dependencies or cycles"""
+        for name in self.steps:
+            unknown = [dep for dep in self._waits_for(name) if dep not in self.steps]
+            if unknown:
+                raise ValueError(f"step {name} waits for unknown step(s): {', '.join(unknown)}")
+
+        remaining = {name: set(self._waits_for(name)) for name in self.steps}
+        while remaining:
+            ready = [name for name, waits in remaining.items() if not waits]
+            if not ready:
+                raise ValueError(f"dependency cycle among: {', '.join(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for waits in remaining.values():
+                waits.difference_update(ready)
+
+    def _run_step(self, name):
+        step = self.steps[name]
+        started = time.perf_counter()
+        journaled = self.journal.get("step", name) if self.journal and step["resume"] else {}
+        if "result" in journaled:
+            print(f"↩️ {name}: done in a previous run")
+            return journaled["result"], "ok", started, time.perf_counter()
+        try:
+            with tracer.span(name, "step"):
+                result = step["func"]()
+            status = "ok" if step["check"] is None or step["check"](result) else "failed"
+        except Exception as e:
+            print(f"❌ Step {name} failed: {e}")
+            result, status = None, "failed"
+        if status == "ok" and step["resume"] and self.journal:
+            self.journal.record("step", name, result=result)
+        return result, status, started, time.perf_counter()
+
+    def run(self):
+        """
+        Run every step, respecting dependencies
+
+        Returns:
+            dict: Step results keyed by step name (skipped and raising steps have None)
+        """
+        self._check_graph()
+        run_started = time.perf_counter()
+        pending = list(self.steps)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="truck-sim-step") as executor:
+            while pending or running:
+                for name in list(pending):
+                    if any(dep not in self.status for dep in self._waits_for(name)):
+                        continue
+                    pending.remove(name)
+                    if all(self.ok(dep) for dep in self.steps[name]["deps"]):
+                        running[executor.submit(tracer.bind(self._run_step), name)] = name
+                    else:
+                        self.results[name] = None
+                        self.status[name] = "skipped"
+                        now = time.perf_counter() - run_started
+                        self.timings[name] = (now, now)
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result, status, started, finished = future.result()
+                    self.results[name] = result
+                    self.status[name] = status
+                    self.timings[name] = (started - run_started, finished - run_started)
+
+        self.wall_time = time.perf_counter() - run_started
+        return self.results
+
+    def critical_path(self):
+        """
+        The chain of steps that determined the wall time: starting from the last
+        step to finish, repeatedly follow the dependency that finished last.
+        With one worker this is the dependency chain only; queueing behind
+        unrelated steps is not on it.
+
+        Returns:
+            list: Step names, first to last
+        """
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda step: self.timings[step][1])
+        path = [name]
+        while True:
+            waits = [dep for dep in self._waits_for(name) if dep in self.timings]
+            if not waits:
+                break
+            name = max(waits, key=lambda step: self.timings[step][1])
+            path.append(name)
+        # Skipped steps take no time; they only pass the chain on
+        return [name for name in path[::-1] if self.status[name] != "skipped"]
+
+    def print_report(self, top=10):
+        """Print the slowest steps and the critical path"""
+        busy = sum(end - start for start, end in self.timings.values())
+        failed = [name for name, status in self.status.items() if status != "ok"]
+        print(f"\n⏱️ Workflow: {len(self.steps)} step(s) in {self.wall_time:.1f}s wall "
+              f"({busy:.1f}s of step time, {self.workers} worker(s))")
+        slowest = sorted(self.timings, key=lambda step: self.timings[step][0] - self.timings[step][1])[:top]
+        for name in slowest:
+            start, end = self.timings[name]
+            print(f"    {name:<32} {end - start:7.2f}s  (+{start:.2f}s) {self.status[name]}")
+        path = self.critical_path()
+        if path:
+            length = self.timings[path[-1]][1] - self.timings[path[0]][0]
+            print(f"  Critical path ({length:.1f}s): {' → '.join(path)}")
+        if failed:
+            print(f"  Not completed: {', '.join(f'{name} ({self.status[name]})' for name in failed)}")
+
+
+def get_or_create_project(name, keywords=None):
+    """
+    Find a project by name (keyword search first, then the full listing), or create it
 
-    # Step 2b: Ensure sites have geofences for turntimes calculation
-    print("\n🔷 Ensuring sites have geofences...")
-    print("  Creating geofence for pickup site...")
-    ensure_site_has_geofence(
-        pickup_site_id,
-        site_name="Demo Pickup Site - Atlanta",
-        lat=33.7490,
-        lng=-84.3880
-    )
+    Returns:
+        tuple: (project_id, project_data), (None, None) on failure
+    """
+    project = find_project(name, keywords=keywords)
+    if not project:
+        project = next((p for p in get_projects() or [] if p.get('name') == name), None)
+    if project:
+        print(f"✅ Found existing {name} (ID: {project.get('id')})")
+        return project.get('id'), project
 
-    print("  Creating geofence for dropoff site...")
-    ensure_site_has_geofence(
-        dropoff_site_id,
-        site_name="Demo Dropoff Site - Marietta",
-        lat=33.9526,
-        lng=-84.4681
-    )
+    print(f"📁 Creating {name}...")
+    project_id, project_data = create_project(name)
+    if project_id:
+        print(f"✅ Created {name} (ID: {project_id})")
+    return project_id, project_data
 
-    print("  Creating geofence for tonnage pickup site...")
-    ensure_site_has_geofence(
-        tonnage_pickup_site_id,
-        site_name="Demo Tonnage Pickup - Decatur",
-        lat=33.7748,
-        lng=-84.2963
-    )
 
-    print("  Creating geofence for tonnage dropoff site...")
-    ensure_site_has_geofence(
-        tonnage_dropoff_site_id,
-        site_name="Demo Tonnage Dropoff - Sandy Springs",
-        lat=33.9304,
-        lng=-84.3733
-    )
-    print("✅ Geofence setup complete")
+def add_scenario_steps(graph, plan):
+    """
+    Add the project, site, geofence and PO steps of a plan to a StepGraph
 
-    # Step 3: Create three Purchase Orders with different UOMs
+    Each site, geofence and PO is its own step: a geofence waits only for its
+    site, and a PO only for the project and its own two sites.
 
-    # PO 1: Hourly job (check for existing or create with varied material)
-    print("\n📦 Getting or Creating Purchase Order 1 (Hourly)...")
-    hourly_po_id, hourly_po_line_item_id, hourly_po_data = get_or_create_purchase_order(
-        project_id=project_id,
-        pickup_site_id=pickup_site_id,
-        dropoff_site_id=dropoff_site_id,
-        unit_of_measure_id=1,  # Hour
-        po_name="Hourly PO"
-    )
-    if not hourly_po_line_item_id:
-        print("❌ Hourly PO failed. Aborting.")
-        return
+    Returns:
+        list: Names of the steps added
+    """
+    results = graph.results
+    step_ok = lambda result: bool(result and result[0])
+
+    names = [graph.add(
+        "project",
+        lambda: get_or_create_project(plan["project"]["name"], plan["project"].get("keywords")),
+        check=step_ok,
+        resume=True
+    )]
+    for key, site in plan["sites"].items():
+        names.append(graph.add(
+            f"site:{key}",
+            lambda site=site: create_site(site["name"], site["address"], site["latitude"], site["longitude"], site["site_type"]),
+            check=step_ok,
+            resume=True
+        ))
+        # Ensure sites have geofences for turntimes calculation
+        names.append(graph.add(
+            f"geofence:{key}",
+            lambda key=key, site=site: ensure_site_has_geofence(
+                results[f"site:{key}"][0], site_name=site["name"], lat=site["latitude"], lng=site["longitude"]
+            ),
+            deps=[f"site:{key}"],
+            check=bool,
+            resume=True
+        ))
+    for key, po in plan["purchase_orders"].items():
+        names.append(graph.add(
+            f"po:{key}",
+            lambda po=po: get_or_create_purchase_order(
+                project_id=results["project"][0],
+                pickup_site_id=results[f"site:{po['pickup']}"][0],
+                dropoff_site_id=results[f"site:{po['dropoff']}"][0],
+                unit_of_measure_id=po["uom"],
+                po_name=po["po_name"],
+                quantity=po["quantity"]
+            ),
+            deps=["project", f"site:{po['pickup']}", f"site:{po['dropoff']}"],
+            check=lambda result: bool(result and result[1]),
+            resume=True
+        ))
+    return names
+
+
+def scenario_resources(graph, plan):
+    """The project, site and PO results of add_scenario_steps() in the shape build_job_specs() takes"""
+    return {
+        "project": graph.results["project"],
+        "sites": {key: graph.results[f"site:{key}"] for key in plan["sites"]},
+        "purchase_orders": {key: graph.results[f"po:{key}"] for key in plan["purchase_orders"]}
+    }
 
-    # PO 2: Tonnage job (check for existing or create with varied material)
-    # Uses DIFFERENT sites from hourly job
-    print("\n📦 Getting or Creating Purchase Order 2 (Tonnage)...")
-    tonnage_po_id, tonnage_po_line_item_id, tonnage_po_data = get_or_create_purchase_order(
-        project_id=project_id,
-        pickup_site_id=tonnage_pickup_site_id,
-        dropoff_site_id=tonnage_dropoff_site_id,
-        unit_of_measure_id=2,  # Ton
-        po_name="Tonnage PO"
-    )
-    if not tonnage_po_line_item_id:
-        print("❌ Tonnage PO failed. Aborting.")
-        return
 
-    # PO 3: Load-based job (check for existing or create with varied material)
-    print("\n📦 Getting or Creating Purchase Order 3 (Load-based)...")
-    load_po_id, load_po_line_item_id, load_po_data = get_or_create_purchase_order(
-        project_id=project_id,
-        pickup_site_id=pickup_site_id,
-        dropoff_site_id=dropoff_site_id,
-        unit_of_measure_id=4,  # Load
-        po_name="Load PO"
-    )
-    if not load_po_line_item_id:
-        print("❌ Load-based PO failed. Aborting.")
-        return
+def start_job(job_spec):
+    """
+    Create the job order for a job spec and open its initial tickets.
 
-    # Step 4: Re-authenticate WITH device info for ticket operations
-    print("\n📱 Re-authenticating with mobile device for ticket operations...")
-    AUTH_TOKEN = authenticate_with_device()
-    if not AUTH_TOKEN:
-        print("❌ Device authentication failed. Continuing without ticket start/pause.")
-    else:
-        # Link all trucks to the device
-        print("\n🔗 Linking trucks to device...")
-        for truck in TRUCKS:
-            link_truck_to_device(truck['id'])
-            time.sleep(0.5)  # Small delay between requests
-
-    # Step 5: Get truck regions for activity/GPS data
-    regions_data = get_truck_regions()
-    truck_regions = get_trucks_with_regions()
+    Args:
+        job_spec: Job definition dict (sites, PO line item, trucks, trip plans)
+
+    Returns:
+        dict: Job state with job_id, tickets, jo_line_item_id, job_uom and per-truck trip plans
+    """
+    with tracer.span(f"start {job_spec['key']}", "job", job=job_spec["key"]):
+        print(f"\n{job_spec['label']}")
+
+        # A resumed run reuses the job order (and tickets) an earlier attempt created
+        journaled = checkpoint_journal.get("job", job_spec["key"])
+        if journaled.get("job_id"):
+            job_id, job_data = journaled["job_id"], journaled.get("job_data")
+            print(f"↩️ {job_spec['name']} job {job_id} was created in a previous run")
+        else:
+            job_id, job_data, _, _, _ = create_job_order(
+                pickup_site_id=job_spec["pickup_site_id"],
+                dropoff_site_id=job_spec["dropoff_site_id"],
+                po_line_item_id=job_spec["po_line_item_id"],
+                truck_ids=[t["id"] for t in job_spec["trucks"]],
+                quantity=job_spec["quantity"]
+            )
+            if job_id:
+                checkpoint_journal.record("job", job_spec["key"], job_id=job_id, job_data=job_data)
+
+        job_state = {
+            "spec": job_spec,
+            "job_id": job_id,
+            "tickets": [],
+            "jo_line_item_id": None,
+            "job_uom": None,
+            "trip_plans": [],
+            "trip_tickets": []
+        }
 
-    # Step 6: Create three job orders (active, closed, pending) with different UOMs
-    print("\n📦 Creating three job orders with different UOMs...")
+        if not job_id:
+            print(f"❌ {job_spec['name']} job creation failed.")
+            return job_state
 
-    # Job 1: Active Hourly job (will have tickets created and left open)
-    # Use trucks 0-2 (575123-575125)
-    job1_trucks = TRUCKS[0:3]
-    print("\n1️⃣ Creating ACTIVE job order (Hourly)...")
-    active_job_id, active_job_data, _, _, _ = create_job_order(
-        pickup_site_id=pickup_site_id,
-        dropoff_site_id=dropoff_site_id,
-        po_line_item_id=hourly_po_line_item_id,
-        truck_ids=[t["id"] for t in job1_trucks],
-        quantity=35.0  # Realistic: 3 trucks * ~11-12 hours each
-    )
-    if not active_job_id:
-        print("❌ Active job creation failed.")
-        active_tickets = []
-    else:
-        print(f"✅ Active job created: {active_job_id}")
+        if not job_spec.get("open_tickets"):
+            print(f"✅ {job_spec['name']} job created: {job_id} (no tickets created)")
+            return job_state
+
+        print(f"✅ {job_spec['name']} job created: {job_id}")
+
+        if "tickets" in journaled:
+            tickets, jo_line_item_id, job_uom = journaled["tickets"], journaled["jo_line_item_id"], journaled["job_uom"]
+            print(f"↩️ Reusing {len(tickets)} tickets of {job_spec['name'].lower()} job from a previous run")
+        else:
+            ticket_open_timestamp = None
+            if job_spec.get("ticket_open_minutes_ago"):
+                ticket_open_timestamp = (datetime.now(timezone.utc) - timedelta(minutes=job_spec["ticket_open_minutes_ago"])).isoformat()
+
+            tickets, jo_line_item_id, job_uom = create_tickets_for_job_order(
+                job_id, job_data, ticket_open_timestamp=ticket_open_timestamp
+            )
+            print(f"✅ Created {len(tickets)} tickets for {job_spec['name'].lower()} job")
+            checkpoint_journal.record("job", job_spec["key"], tickets=tickets, jo_line_item_id=jo_line_item_id, job_uom=job_uom)
+
+        job_state.update(tickets=tickets, jo_line_item_id=jo_line_item_id, job_uom=job_uom)
+
+        # One trip plan per truck, with varied GPS and time offsets
+        if jo_line_item_id:
+            for truck, trips in zip(job_spec["trucks"], job_spec["trips"]):
+                job_state["trip_plans"].append({
+                    "truck": truck,
+                    "jo_line_item_id": jo_line_item_id,
+                    "pickup_coords": job_spec["pickup_coords"],
+                    "dropoff_coords": job_spec["dropoff_coords"],
+                    "job_uom": job_uom,
+                    "num_trips": trips["num_trips"],
+                    "final_state": trips["final_state"],
+                    "truck_offset_minutes": trips["truck_offset_minutes"],
+                    "checkpoint_key": f"{job_spec['key']}:{truck['id']}",
+                    "upload_group": job_spec["key"]
+                })
+
+        return job_state
+
+
+def run_truck_trips(trip_plan):
+    """Run one truck's trip timeline from a trip plan produced by start_job()"""
+    truck = trip_plan["truck"]
+    with tracer.span(f"truck {truck['device_name']}", "truck", truck_id=truck["id"], trips=trip_plan["num_trips"]):
+        return setup_truck_with_multiple_trips(**trip_plan)
+
+
+def finish_job(job_state):
+    """Close the job order once all of its truck timelines are done (if the spec asks for it)"""
+    with tracer.span(f"finish {job_state['spec']['key']}", "job", job=job_state["spec"]["key"]):
+        job_id = job_state["job_id"]
+        if not job_id or not job_state["spec"].get("close_after"):
+            return
+        if checkpoint_journal.get("job", job_state["spec"]["key"]).get("closed"):
+            print(f"↩️ Job order {job_id} was closed in a previous run")
+            return
+
+        # Ticket photos are still uploading in the background; close the job only after them
+        print("⏳ Waiting for this job's photo uploads to complete...")
+        photo_upload_queue.wait(job_state["spec"]["key"])
+
+        print(f"🔒 Closing job order {job_id}...")
+        if close_job_order(job_id):
+            checkpoint_journal.record("job", job_state["spec"]["key"], closed=True)
+
+
+def run_jobs_sequential(job_specs):
+    """
+    Run each job and each of its trucks one after another.
 
-        # Create tickets but don't close them
-        # Open tickets 90 minutes ago to match the journey start time
-        ticket_open_time = (datetime.now(timezone.utc) - timedelta(minutes=90)).isoformat()
-        active_tickets, active_jo_line_item_id, active_job_uom = create_tickets_for_job_order(
-            active_job_id, active_job_data, ticket_open_timestamp=ticket_open_time
+    Returns:
+        dict: Job states keyed by job spec key
+    """
+    job_states = {}
+    for job_spec in job_specs:
+        with tracer.span(f"job {job_spec['key']}", "job", job=job_spec["key"]):
+            job_state = start_job(job_spec)
+            job_state["trip_tickets"] = [run_truck_trips(plan) for plan in job_state["trip_plans"]]
+            finish_job(job_state)
+        job_states[job_spec["key"]] = job_state
+    return job_states
+
+
+async def _run_blocking(limiter, func, *args):
+    """Run a blocking API workflow on the worker pool, holding a concurrency slot"""
+    async with limiter:
+        return await asyncio.to_thread(func, *args)
+
+
+async def run_job_async(job_spec, limiter):
+    """Run one job as a coroutine, with each assigned truck as its own coroutine"""
+    # Concurrent jobs share the event loop thread, so each job span gets its own trace track
+    with tracer.span(f"job {job_spec['key']}", "job", track=f"job {job_spec['key']}", job=job_spec["key"]):
+        job_state = await _run_blocking(limiter, start_job, job_spec)
+
+        results = await asyncio.gather(
+            *(_run_blocking(limiter, run_truck_trips, plan) for plan in job_state["trip_plans"]),
+            return_exceptions=True
         )
-        print(f"✅ Created {len(active_tickets)} tickets for active job (left open)")
-
-        # Set up multiple trips for each truck with varied GPS and time offsets
-        if active_jo_line_item_id:
-            print("\n🚛 Setting up multiple trips for hourly job trucks...")
-            pickup_coords = {"lat": pickup_site_data.get("latitude", 33.7490), "lng": pickup_site_data.get("longitude", -84.3880), "site_id": pickup_site_id}
-            dropoff_coords = {"lat": dropoff_site_data.get("latitude", 33.9526), "lng": dropoff_site_data.get("longitude", -84.4681), "site_id": dropoff_site_id}
-
-            # Truck 1: 3 trips, final state at dropoff, no offset
-            setup_truck_with_multiple_trips(job1_trucks[0], active_jo_line_item_id, pickup_coords, dropoff_coords, active_job_uom, num_trips=3, final_state='at_dropoff', truck_offset_minutes=0)
-
-            # Truck 2: 4 trips, final state at pickup, 45 min offset
-            setup_truck_with_multiple_trips(job1_trucks[1], active_jo_line_item_id, pickup_coords, dropoff_coords, active_job_uom, num_trips=4, final_state='at_pickup', truck_offset_minutes=45)
-
-            # Truck 3: 2 trips, final state en route, 90 min offset
-            setup_truck_with_multiple_trips(job1_trucks[2], active_jo_line_item_id, pickup_coords, dropoff_coords, active_job_uom, num_trips=2, final_state='en_route', truck_offset_minutes=90)
-
-    # Job 2: Closed Tonnage job (will have tickets created and closed)
-    # Use trucks 3-5 (575126-575128)
-    # Uses DIFFERENT sites from hourly job
-    job2_trucks = TRUCKS[3:6]
-    print("\n2️⃣ Creating CLOSED job order (Tonnage)...")
-    closed_job_id, closed_job_data, _, _, _ = create_job_order(
-        pickup_site_id=tonnage_pickup_site_id,
-        dropoff_site_id=tonnage_dropoff_site_id,
-        po_line_item_id=tonnage_po_line_item_id,
-        truck_ids=[t["id"] for t in job2_trucks],
-        quantity=350.0  # Request more than will be delivered (realistic variance)
-    )
-    if not closed_job_id:
-        print("❌ Closed job creation failed.")
-    else:
-        print(f"✅ Closed job created: {closed_job_id}")
+        for plan, result in zip(job_state["trip_plans"], results):
+            if isinstance(result, Exception):
+                print(f"❌ Trips failed for {plan['truck']['device_name']}: {result}")
+                job_state["trip_tickets"].append([])
+            else:
+                job_state["trip_tickets"].append(result)
 
-        # Get JO line item for tonnage job
-        closed_tickets, closed_jo_line_item_id, closed_job_uom = create_tickets_for_job_order(closed_job_id, closed_job_data)
+        await _run_blocking(limiter, finish_job, job_state)
+    return job_state
 
-        # Set up multiple trips for each tonnage truck with varied GPS and time offsets
-        if closed_jo_line_item_id:
-            print("\n🚛 Setting up multiple trips for tonnage job trucks...")
-            print(f"   DEBUG: closed_job_uom={closed_job_uom}, closed_jo_line_item_id={closed_jo_line_item_id}")
-            tonnage_pickup_coords = {"lat": tonnage_pickup_site_data.get("latitude", 33.7748), "lng": tonnage_pickup_site_data.get("longitude", -84.2963), "site_id": tonnage_pickup_site_id}
-            tonnage_dropoff_coords = {"lat": tonnage_dropoff_site_data.get("latitude", 33.9304), "lng": tonnage_dropoff_site_data.get("longitude", -84.3733), "site_id": tonnage_dropoff_site_id}
 
-            # Truck 4: 5 trips, final state at dropoff, no offset
-            setup_truck_with_multiple_trips(job2_trucks[0], closed_jo_line_item_id, tonnage_pickup_coords, tonnage_dropoff_coords, closed_job_uom, num_trips=5, final_state='at_dropoff', truck_offset_minutes=0)
+async def run_jobs_async(job_specs, concurrency=SIM_CONCURRENCY):
+    """
+    Run all jobs and trucks concurrently.
 
-            # Truck 5: 3 trips, final state at pickup, 30 min offset
-            setup_truck_with_multiple_trips(job2_trucks[1], closed_jo_line_item_id, tonnage_pickup_coords, tonnage_dropoff_coords, closed_job_uom, num_trips=3, final_state='at_pickup', truck_offset_minutes=30)
+    Each job and each truck timeline is a coroutine. The blocking HTTP calls
+    run on a worker pool sized to `concurrency`, and a semaphore bounds how
+    many workflows are in flight, so wall time follows the longest truck
+    timeline instead of the sum of all of them.
 
-            # Truck 6: 4 trips, final state en route, 60 min offset
-            setup_truck_with_multiple_trips(job2_trucks[2], closed_jo_line_item_id, tonnage_pickup_coords, tonnage_dropoff_coords, closed_job_uom, num_trips=4, final_state='en_route', truck_offset_minutes=60)
+    Returns:
+        dict: Job states keyed by job spec key
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="truck-sim"))
+    limiter = asyncio.Semaphore(concurrency)
 
-        # Wait for all ticket operations to complete before closing job
-        print("⏳ Waiting for all ticket operations to complete...")
-        time.sleep(5)
+    job_states = await asyncio.gather(*(run_job_async(job_spec, limiter) for job_spec in job_specs))
+    return {job_state["spec"]["key"]: job_state for job_state in job_states}
 
-        # Close the job order itself
-        print(f"🔒 Closing job order {closed_job_id}...")
-        close_job_order(closed_job_id)
 
-    # Job 3: Pending Load-based job (no tickets created)
-    # Use truck 6 (575129) - Load-based jobs can only have 0 or 1 truck assigned
-    job3_trucks = TRUCKS[6:7]
-    print("\n3️⃣ Creating PENDING job order (Load-based)...")
-    pending_job_id, pending_job_data, _, _, _ = create_job_order(
-        pickup_site_id=pickup_site_id,
-        dropoff_site_id=dropoff_site_id,
-        po_line_item_id=load_po_line_item_id,
-        truck_ids=[job3_trucks[0]["id"]],
-        quantity=50.0  # Realistic number of loads
-    )
-    if not pending_job_id:
-        print("❌ Pending job creation failed.")
-    else:
-        print(f"✅ Pending job created: {pending_job_id} (no tickets created)")
+def main(run_async=SIM_ASYNC, concurrency=SIM_CONCURRENCY, fleet_source=None, fleet_size=None,
+         trucks_per_job=None, fleet_seed=None, scenario_path=SCENARIO_FILE, resume=CHECKPOINT_RESUME,
+         fleet_link_rate=None):
+    """
+    Main execution function with controlled setup
+
+    Args:
+        run_async: Simulate jobs and trucks concurrently on the asyncio engine
+        concurrency: Maximum number of blocking API workflows in flight (async mode only)
+        fleet_source: "static", "discover" or "synthetic" (see build_fleet)
+        fleet_size: Number of trucks to simulate (0 = whole source)
+        trucks_per_job: Trucks assigned to jobs without their own truck count
+        fleet_seed: Optional seed for generated per-truck params
+        scenario_path: Scenario file to run (None = DEFAULT_SCENARIO)
+        resume: Continue an interrupted run of the same scenario from the checkpoint journal
+        fleet_link_rate: Device links per second while linking the fleet (0 = unlimited)
+
+    Fleet arguments left as None come from the scenario's "fleet" section,
+    then from the TRUCKSIM_FLEET_* environment variables.
+
+    Returns:
+        bool: True if every workflow step and job order completed
+    """
+
+    global AUTH_TOKEN, TRUCKS
+
+    print("🚀 Starting controlled job order and ticket creation process...")
+    request_metrics.start_server()
+
+    # Validate and compile the scenario before touching the API
+    try:
+        scenario = load_scenario(scenario_path)
+        plan = compile_scenario(scenario)
+    except ValueError as e:
+        print(f"❌ Invalid scenario {scenario_path or '(default)'}: {e}")
+        return False
+    for warning in plan["warnings"]:
+        print(f"⚠️ Scenario: {warning}")
+
+    fleet = plan["fleet"]
+    fleet_source = next(v for v in (fleet_source, fleet.get("source"), FLEET_SOURCE) if v is not None)
+    fleet_size = next(v for v in (fleet_size, fleet.get("size"), FLEET_SIZE) if v is not None)
+    trucks_per_job = next(v for v in (trucks_per_job, fleet.get("trucks_per_job"), FLEET_TRUCKS_PER_JOB) if v is not None)
+    fleet_seed = next((v for v in (fleet_seed, fleet.get("seed"), FLEET_SEED) if v is not None), None)
+    fleet_link_rate = next(v for v in (fleet_link_rate, fleet.get("link_rate"), FLEET_LINK_RATE) if v is not None)
+
+    # Journal progress; only a run of the same scenario, fleet, API and day can resume from it
+    run_fingerprint = json.dumps([API_BASE_URL, COMPANY_ID, scenario, fleet_source, fleet_size, trucks_per_job, fleet_seed],
+                                 sort_keys=True, default=str)
+    run_key = f"{datetime.now().date().isoformat()}:{hashlib.sha256(run_fingerprint.encode()).hexdigest()[:16]}"
+    resumable = checkpoint_journal.open(run_key, resume=resume)
+    if resumable:
+        print(f"↩️ Resuming from {checkpoint_journal.path} ({resumable} checkpoint(s))")
+    elif checkpoint_journal.enabled:
+        print(f"📝 Checkpoint journal: {checkpoint_journal.path}")
+
+    # The workflow span covers step 0 (authentication) as well as the step graph
+    workflow_trace = contextlib.ExitStack()
+    workflow_trace.enter_context(tracer.span("workflow", "run", scenario=scenario_path or "(default)", run_async=run_async))
+
+    # 🔐 Step 0: Authenticate WITHOUT device info
+    with tracer.span("auth", "step"):
+        AUTH_TOKEN = set_auth_token(authenticate_without_device())
+    if not AUTH_TOKEN:
+        print("❌ Initial authentication failed. Aborting.")
+        workflow_trace.close()
+        tracer.write()
+        return False
+
+    # Everything else runs as a dependency graph: independent steps (sites,
+    # geofences, POs, prior-day cleanup, region lookups, ...) overlap. Without
+    # --async the graph has one worker, so steps still run one at a time.
+    graph = StepGraph(workers=concurrency if run_async else 1, journal=checkpoint_journal)
+    results = graph.results
+
+    # Read all ticket photos into memory once
+    graph.add("photo_catalog", photo_catalog.load)
+
+    # 🚚 Build the fleet (static demo trucks, discovered company trucks, or synthetic ones)
+    def load_fleet():
+        global TRUCKS
+        # Resumed runs keep the exact fleet (and generated params) of the first attempt
+        journaled_trucks = checkpoint_journal.get("fleet", "trucks").get("trucks")
+        if journaled_trucks:
+            print(f"↩️ Fleet: {len(journaled_trucks)} truck(s) from a previous run")
+            TRUCKS = journaled_trucks
+            return TRUCKS
+        TRUCKS = build_fleet(fleet_source, fleet_size, fleet_seed)
+        if not TRUCKS:
+            print("❌ No trucks to simulate.")
+        checkpoint_journal.record("fleet", "trucks", trucks=TRUCKS)
+        return TRUCKS
+
+    graph.add("fleet", load_fleet, check=bool)
+
+    # 🧹 Step 0.5: Close all active/not started job orders from prior days
+    def close_prior_days():
+        print("\n🧹 Checking for prior day job orders to close...")
+        return close_prior_day_jobs()
+
+    graph.add("close_prior_day_jobs", close_prior_days, resume=True)
+
+    # Steps 1-3: Project, sites (with geofences) and purchase orders of the scenario
+    scenario_steps = add_scenario_steps(graph, plan)
+    required_steps = [name for name in scenario_steps if not name.startswith("geofence:")]
+    geofence_steps = [name for name in scenario_steps if name.startswith("geofence:")]
+
+    # Step 4: Re-authenticate WITH device info for ticket operations, once
+    # nothing is using the initial token any more (skipped if setup failed)
+    def device_auth():
+        global AUTH_TOKEN
+        print("\n📱 Re-authenticating with mobile device for ticket operations...")
+        AUTH_TOKEN = set_auth_token(authenticate_with_device())
+        if not AUTH_TOKEN:
+            print("❌ Device authentication failed. Continuing without ticket start/pause.")
+        return AUTH_TOKEN
+
+    graph.add("device_auth", device_auth, deps=["fleet", *required_steps],
+              after=["close_prior_day_jobs", *geofence_steps], check=bool)
+
+    # Link all trucks to the device; the step only counts as done (and is skipped on
+    # resume) once every truck is linked, otherwise a resumed run relinks the rest.
+    # Links only fan out in async mode, like everything else bounded by --concurrency
+    link_workers = concurrency if run_async else 1
+    graph.add("link_trucks", lambda: link_fleet_to_device(results["fleet"], workers=link_workers, rate=fleet_link_rate),
+              deps=["device_auth", "fleet"], check=lambda failed: not failed, resume=True)
+
+    # Step 5: Get truck regions for activity/GPS data (only needed after the jobs, so this overlaps them)
+    graph.add("truck_regions", lambda: TruckRegionIndex.load(results["fleet"]),
+              deps=["fleet"], after=["device_auth"], check=bool)
+
+    # Step 6: Create the scenario's job orders; partition_fleet decides which trucks run each job
+    def run_jobs():
+        print("\n📦 Creating job orders with different UOMs...")
+        job_specs = build_job_specs(plan, scenario_resources(graph, plan), results["fleet"], trucks_per_job, fleet_seed)
+        if not job_specs:
+            print(f"❌ Fleet of {len(results['fleet'])} truck(s) is too small for the scenario's first job.")
+            return {}
+        if run_async:
+            print(f"\n⚡ Running jobs concurrently (concurrency limit: {concurrency})...")
+            return asyncio.run(run_jobs_async(job_specs, concurrency=concurrency))
+        return run_jobs_sequential(job_specs)
+
+    graph.add("jobs", run_jobs, deps=["fleet", *required_steps],
+              after=["photo_catalog", "close_prior_day_jobs", *geofence_steps, "device_auth", "link_trucks"], check=bool)
+
+    # Per-job follow-ups are journaled per job, so a resumed run only does them for jobs that still need them
+    def for_each_job(flag, action):
+        for job_state in results["jobs"].values():
+            job_spec = job_state["spec"]
+            if not job_state["job_id"] or not job_spec[flag]:
+                continue
+            if checkpoint_journal.get("job", job_spec["key"]).get(flag):
+                print(f"↩️ {flag.replace('_', ' ').capitalize()} for job {job_state['job_id']} done in a previous run")
+                continue
+            action(job_state["job_id"], job_spec)
+            checkpoint_journal.record("job", job_spec["key"], **{flag: True})
 
     # Step 7: Create idle time alerts and activity events
-    print("\n📊 Creating idle time alerts and activity events...")
-    if active_job_id and truck_regions and regions_data:
-        create_idle_time_alerts(active_job_id, truck_regions)
-        # Create activity events for hourly job trucks only
-        create_truck_activity_events(active_job_id, truck_regions, regions_data, trucks_list=job1_trucks)
+    def idle_alerts():
+        print("\n📊 Creating idle time alerts...")
+        for_each_job("idle_alerts", lambda job_id, job_spec: create_idle_time_alerts(job_id, results["truck_regions"]))
+
+    def activity_events():
+        print("\n📊 Creating activity events...")
+        for_each_job("activity_events", lambda job_id, job_spec: create_truck_activity_events(
+            job_id, results["truck_regions"], trucks_list=job_spec["trucks"]))
+
+    graph.add("idle_alerts", idle_alerts, deps=["jobs", "truck_regions"])
+    graph.add("activity_events", activity_events, deps=["jobs", "truck_regions"])
 
-    # Create activity events for tonnage job trucks
-    if closed_job_id and truck_regions and regions_data:
-        create_truck_activity_events(closed_job_id, truck_regions, regions_data, trucks_list=job2_trucks)
+    # Send any buffered OpenSearch documents before moving on
+    graph.add("flush_opensearch", es_bulk_writer.flush, after=["jobs", "idle_alerts", "activity_events"])
 
     # Step 8: Create air tickets (already authenticated with device)
-    if AUTH_TOKEN and active_job_id and pickup_site_id:
-        create_air_tickets_for_trucks(active_job_id, pickup_site_id)
+    def air_tickets():
+        if AUTH_TOKEN:
+            for_each_job("air_tickets", lambda job_id, job_spec: create_air_tickets_for_trucks(job_id, job_spec["pickup_site_id"]))
+
+    graph.add("air_tickets", air_tickets, deps=["jobs"], after=["device_auth"])
+
+    # Wait for background photo uploads to finish
+    graph.add("photo_uploads", photo_upload_queue.drain, after=["jobs", "air_tickets"])
+
+    with workflow_trace:
+        graph.run()
+
+    if lookup_cache.enabled:
+        print(f"\n🗄️ Lookup cache: {lookup_cache.hits} hit(s), {lookup_cache.misses} miss(es) ({lookup_cache.path()})")
+    graph.print_report()
+    request_metrics.print_summary()
+    request_metrics.write_json()
+    tracer.write()
+
+    if not graph.ok("jobs"):
+        print("❌ Setup failed before any jobs ran. Aborting.")
+        checkpoint_journal.close()
+        return False
+    incomplete = [name for name in graph.steps if not graph.ok(name)]
+    incomplete += [f"job:{key}" for key, job_state in results["jobs"].items() if not job_state["job_id"]]
+    if incomplete:
+        checkpoint_journal.close()
+        print(f"ℹ️ Not completed: {', '.join(incomplete)}; rerun with --resume to retry them")
+    else:
+        checkpoint_journal.complete()
+
+    resources = scenario_resources(graph, plan)
+    project_id, _ = resources["project"]
+    job_states = results["jobs"]
 
     # ✅ Summary
     print("\n🎉 PROCESS COMPLETE")
-    print(f"  📁 Project: Demo Script Project - Restricted Customer (ID: {project_id})")
-    print(f"  🏭 Pickup Site: {pickup_site_id}")
-    print(f"  🏗️ Dropoff Site: {dropoff_site_id}")
+    print(f"  📁 Project: {plan['project']['name']} (ID: {project_id})")
+    print(f"  🏭 Sites: " + ", ".join(f"{site['name']} ({resources['sites'][key][0]})" for key, site in plan["sites"].items()))
     print(f"\n  📦 Purchase Orders:")
-    print(f"    ⏰ Hourly PO: {hourly_po_id} (Line Item: {hourly_po_line_item_id})")
-    print(f"    ⚖️  Tonnage PO: {tonnage_po_id} (Line Item: {tonnage_po_line_item_id})")
-    print(f"    🚚 Load-based PO: {load_po_id} (Line Item: {load_po_line_item_id})")
+    for key, po in plan["purchase_orders"].items():
+        po_id, po_line_item_id, _ = resources["purchase_orders"][key]
+        print(f"    {po['po_name']}: {po_id} (Line Item: {po_line_item_id})")
     print(f"\n  📋 Job Orders:")
-    print(f"    ✅ Active Job (Hourly): {active_job_id if active_job_id else 'FAILED'}")
-    print(f"    🔒 Closed Job (Tonnage): {closed_job_id if closed_job_id else 'FAILED'}")
-    print(f"    ⏸️  Pending Job (Load): {pending_job_id if pending_job_id else 'FAILED'}")
-    print(f"\n  🚛 Trucks: {[truck['device_name'] for truck in TRUCKS]}")
+    for job_state in list(job_states.values())[:20]:
+        print(f"    {job_state['spec']['name']}: {job_state['job_id'] if job_state['job_id'] else 'FAILED'}")
+    if len(job_states) > 20:
+        created = sum(1 for job_state in job_states.values() if job_state["job_id"])
+        print(f"    ... {len(job_states) - 20} more ({created}/{len(job_states)} created in total)")
+    if len(TRUCKS) <= 20:
+        print(f"\n  🚛 Trucks: {[truck['device_name'] for truck in TRUCKS]}")
+    else:
+        print(f"\n  🚛 Trucks: {len(TRUCKS)} ({TRUCKS[0]['device_name']} ... {TRUCKS[-1]['device_name']})")
+    return not incomplete
 
 
 
@@ -4284,7 +6519,7 @@ def create_tickets_only(job_order_id):
     # Authenticate if not already done
     if not AUTH_TOKEN:
         print("Authenticating...")
-        AUTH_TOKEN = authenticate()
+        AUTH_TOKEN = set_auth_token(authenticate_without_device())
         if not AUTH_TOKEN:
             print("Authentication failed.")
             return
@@ -4315,7 +6550,7 @@ def create_gps_tracking_only(job_order_id, ticket_ids=None):
     # Authenticate if not already done
     if not AUTH_TOKEN:
         print("Authenticating...")
-        AUTH_TOKEN = authenticate()
+        AUTH_TOKEN = set_auth_token(authenticate_without_device())
         if not AUTH_TOKEN:
             print("Authentication failed.")
             return
@@ -4326,12 +6561,85 @@ def create_gps_tracking_only(job_order_id, ticket_ids=None):
         # Use default region mapping
         truck_regions = {truck["id"]: 0 for truck in TRUCKS}
 
-    # Create GPS tracking data
-    # NOTE: GPS tracking should be done via setup_truck_states_for_job() with correct coords from job order
-    # print(f"Creating GPS tracking data for existing job order {job_order_id}...")
-    # create_truck_gps_tracking_data(job_order_id, truck_regions, ticket_ids)  # OLD - uses hardcoded NC coords
-    print(f"GPS tracking should be handled via setup_truck_states_for_job() - skipping old function")
+    # GPS trails are sent with each truck's trips (setup_truck_with_multiple_trips);
+    # the old create_truck_gps_tracking_data() used hardcoded NC coords
+    print("GPS tracking is handled by setup_truck_with_multiple_trips() - skipping old function")
+
+
+def parse_args(argv=None):
+    """Parse command-line options (defaults come from the TRUCKSIM_* environment variables)"""
+    parser = argparse.ArgumentParser(description="TruckIt demo activity simulator")
+    parser.add_argument("--async", dest="run_async", action="store_true", default=SIM_ASYNC,
+                        help="simulate all jobs and trucks concurrently")
+    parser.add_argument("--concurrency", type=int, default=SIM_CONCURRENCY,
+                        help="maximum concurrent truck workflows in async mode")
+    parser.add_argument("--scenario", default=SCENARIO_FILE,
+                        help="JSON/YAML scenario file to run (default: the built-in demo scenario)")
+    parser.add_argument("--dump-scenario", action="store_true",
+                        help="print the built-in scenario as JSON (a template for new ones) and exit")
+    parser.add_argument("--check-scenario", action="store_true",
+                        help="validate the scenario, print its plan and exit without calling the API")
+    parser.add_argument("--resume", action="store_true", default=CHECKPOINT_RESUME,
+                        help="continue an interrupted run of the same scenario from the checkpoint journal")
+    parser.add_argument("--checkpoint-file", default=CHECKPOINT_FILE,
+                        help="checkpoint journal path (empty string disables checkpointing)")
+    parser.add_argument("--metrics-file", default=METRICS_FILE,
+                        help="write per-endpoint request metrics as JSON to this path at the end of the run")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve Prometheus metrics on this port while the run is in progress (0 = off)")
+    parser.add_argument("--trace-file", default=TRACE_FILE,
+                        help="write a Chrome trace (steps, jobs, trucks, trips, HTTP calls) to this path")
+    parser.add_argument("--fleet-source", choices=["static", "discover", "synthetic"], default=None,
+                        help="where trucks come from: the TRUCKS list, the company's trucks, or generated ones "
+                             f"(default: scenario, then {FLEET_SOURCE})")
+    parser.add_argument("--fleet-size", type=int, default=None,
+                        help=f"number of trucks to simulate, 0 = all trucks of the source (default: scenario, then {FLEET_SIZE})")
+    parser.add_argument("--trucks-per-job", type=int, default=None,
+                        help=f"trucks assigned to jobs without their own count (default: scenario, then {FLEET_TRUCKS_PER_JOB})")
+    parser.add_argument("--fleet-seed", default=None,
+                        help="seed for generated per-truck params (default: scenario, then TRUCKSIM_FLEET_SEED)")
+    parser.add_argument("--fleet-link-rate", type=float, default=None,
+                        help="device links per second before the jobs start, 0 = unlimited; linking takes about "
+                             f"fleet size / rate seconds (default: scenario, then {FLEET_LINK_RATE:g})")
+    return parser.parse_args(argv)
+
+
+def print_scenario_plan(scenario_path=None):
+    """Validate a scenario and print its compiled plan; returns False if it is invalid"""
+    try:
+        plan = compile_scenario(load_scenario(scenario_path))
+    except ValueError as e:
+        print(f"❌ Invalid scenario {scenario_path or '(default)'}: {e}")
+        return False
+
+    for warning in plan["warnings"]:
+        print(f"⚠️ {warning}")
+    print(f"📁 Project: {plan['project']['name']}")
+    print(f"🚚 Fleet: {plan['fleet'] or '(from CLI / environment)'}")
+    print(f"🏭 Sites ({len(plan['sites'])}): {', '.join(site['name'] for site in plan['sites'].values())}")
+    print(f"📦 POs ({len(plan['purchase_orders'])}): "
+          + ", ".join(f"{po['po_name']} (UOM={po['uom']})" for po in plan["purchase_orders"].values()))
+    print(f"📋 Jobs ({len(plan['jobs'])}):")
+    for job in plan["jobs"]:
+        trucks = "trucks_per_job" if job["trucks"] is None else job["trucks"]
+        print(f"    {job['key']}: PO {job['po']}, {trucks} truck(s), {job['pickup']} -> {job['dropoff']}")
+    if plan["repeat_jobs"]:
+        print(f"🔁 Leftover trucks repeat: {', '.join(job['key'] for job in plan['repeat_jobs'])}")
+    return True
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.dump_scenario:
+        print(json.dumps(DEFAULT_SCENARIO, indent=2, ensure_ascii=False))
+    elif args.check_scenario:
+        raise SystemExit(0 if print_scenario_plan(args.scenario) else 1)
+    else:
+        checkpoint_journal.path = Path(args.checkpoint_file) if args.checkpoint_file else None
+        request_metrics.json_path = args.metrics_file
+        request_metrics.port = args.metrics_port
+        tracer.path = args.trace_file
+        completed = main(run_async=args.run_async, concurrency=args.concurrency, fleet_source=args.fleet_source,
+                         fleet_size=args.fleet_size, trucks_per_job=args.trucks_per_job, fleet_seed=args.fleet_seed,
+                         scenario_path=args.scenario, resume=args.resume, fleet_link_rate=args.fleet_link_rate)
+        raise SystemExit(0 if completed else 1)